@@ -1,16 +1,20 @@
 """
 EA Aura Dashboard Data Generator
-Generates realistic wellness KPI data for the EA Aura dashboard.
+Generates realistic wellness KPI data for the EA Aura dashboard: a daily KPI
+workbook, or (with --events) millions of per-user, per-session events across
+the Nova, Kai, Veda and Iris characters, written in chunks.
 """
+import argparse
+import time
 import pandas as pd
 from datetime import datetime, timedelta
-import random
 import numpy as np
 from pathlib import Path
 
+from dashboard_cache import convert
+
 # Configuration
-np.random.seed(42)
-random.seed(42)
+DEFAULT_SEED = 42
 
 # Character/Feature names for the wellness assistants
 FEATURE_NAMES = ['Nova', 'Kai', 'Veda', 'Iris']
@@ -18,15 +22,17 @@ FEATURE_NAMES = ['Nova', 'Kai', 'Veda', 'Iris']
 # Output paths
 DATA_DIR = Path(__file__).parent
 OUTPUT_FILE = DATA_DIR / 'dashboard_dummy_data.xlsx'
+EVENTS_FILE = DATA_DIR / 'dashboard_events.parquet'
 
 
-def generate_wellness_data(days: int = 30, start_date: datetime = None) -> pd.DataFrame:
+def generate_wellness_data(days: int = 30, start_date: datetime = None, seed: int = DEFAULT_SEED) -> pd.DataFrame:
     """
     Generate realistic wellness KPI data with positive growth trends.
     
     Args:
         days: Number of days of data to generate
         start_date: Starting date for the data (defaults to 30 days ago)
+        seed: Random seed; the same seed always yields the same data
     
     Returns:
         DataFrame with wellness metrics
@@ -34,60 +40,209 @@ def generate_wellness_data(days: int = 30, start_date: datetime = None) -> pd.Da
     if start_date is None:
         start_date = datetime.now() - timedelta(days=days)
     
+    rng = np.random.default_rng(seed)
+    i = np.arange(days)
+    dates = pd.Timestamp(start_date) + pd.to_timedelta(i, unit='D')
+    
+    def randint(low, high):
+        """Inclusive random integers, one per day."""
+        return rng.integers(low, high + 1, days)
+    
     data = {
-        'Date': [start_date + timedelta(days=i) for i in range(days)],
+        'Date': dates,
         
         # User metrics with growth trends
-        'Daily Active Users': [int(3000 + i * 150 + random.randint(-100, 100)) for i in range(days)],
-        'Monthly Active Users': [int(28000 + i * 200 + random.randint(-100, 100)) for i in range(days)],
-        'Total Users': [int(50000 + i * 300 + random.randint(-200, 200)) for i in range(days)],
+        'Daily Active Users': 3000 + i * 150 + randint(-100, 100),
+        'Monthly Active Users': 28000 + i * 200 + randint(-100, 100),
+        'Total Users': 50000 + i * 300 + randint(-200, 200),
         
         # Voice feature adoption
-        'Users Adopting Voice Features': [int(8000 + i * 250 + random.randint(-100, 100)) for i in range(days)],
+        'Users Adopting Voice Features': 8000 + i * 250 + randint(-100, 100),
         
         # Feedback metrics
-        'Total Feedback Responses': [random.randint(800, 1200) for _ in range(days)],
-        'Satisfied Responses': [random.randint(700, 1100) for _ in range(days)],
+        'Total Feedback Responses': randint(800, 1200),
+        'Satisfied Responses': randint(700, 1100),
         
         # User interaction metrics
-        'User ID': [f'USER_{1000+i}' for i in range(days)],
-        'Character Interacted': [random.randint(1, 50) for _ in range(days)],
-        'Interaction Count': [random.randint(150, 500) for _ in range(days)],
+        'User ID': 'USER_' + pd.Series(1000 + i).astype(str),
+        'Character Interacted': randint(1, 50),
+        'Interaction Count': randint(150, 500),
         
         # Session metrics
-        'Session ID': [f'SESSION_{5000+i}' for i in range(days)],
-        'Duration (minutes)': [random.randint(20, 120) for _ in range(days)],
-        'Total Sessions': [random.randint(500, 1500) for _ in range(days)],
-        'Sessions with Voice Interaction': [random.randint(300, 1000) for _ in range(days)],
+        'Session ID': 'SESSION_' + pd.Series(5000 + i).astype(str),
+        'Duration (minutes)': randint(20, 120),
+        'Total Sessions': randint(500, 1500),
+        'Sessions with Voice Interaction': randint(300, 1000),
         
         # Retention metrics
-        'New Users (Day 0)': [random.randint(150, 300) for _ in range(days)],
-        'Retained Users (Day 30)': [random.randint(120, 250) for _ in range(days)],
+        'New Users (Day 0)': randint(150, 300),
+        'Retained Users (Day 30)': randint(120, 250),
         
         # Rating metrics
-        'Number of Ratings': [random.randint(300, 800) for _ in range(days)],
-        'Average Rating': [round(random.uniform(4.2, 4.9), 2) for _ in range(days)],
+        'Number of Ratings': randint(300, 800),
+        'Average Rating': rng.uniform(4.2, 4.9, days).round(2),
         
         # Feature tracking
-        'Feature Name': [FEATURE_NAMES[i % len(FEATURE_NAMES)] for i in range(days)],
-        'Planned Start Date': [start_date + timedelta(days=15 + i*2) for i in range(days)],
-        'Planned End Date': [start_date + timedelta(days=20 + i*2) for i in range(days)],
-        'Current Progress': [min(100, 30 + i * 2 + random.randint(-5, 5)) for i in range(days)]
+        'Feature Name': np.array(FEATURE_NAMES)[i % len(FEATURE_NAMES)],
+        'Planned Start Date': pd.Timestamp(start_date) + pd.to_timedelta(15 + i * 2, unit='D'),
+        'Planned End Date': pd.Timestamp(start_date) + pd.to_timedelta(20 + i * 2, unit='D'),
+        'Current Progress': np.minimum(100, 30 + i * 2 + randint(-5, 5))
     }
     
     df = pd.DataFrame(data)
     
     # Ensure data consistency
-    for idx in df.index:
-        if df.loc[idx, 'Satisfied Responses'] > df.loc[idx, 'Total Feedback Responses']:
-            df.loc[idx, 'Satisfied Responses'] = df.loc[idx, 'Total Feedback Responses']
-        
-        if df.loc[idx, 'Retained Users (Day 30)'] > df.loc[idx, 'New Users (Day 0)']:
-            df.loc[idx, 'Retained Users (Day 30)'] = df.loc[idx, 'New Users (Day 0)']
+    df['Satisfied Responses'] = np.minimum(df['Satisfied Responses'], df['Total Feedback Responses'])
+    df['Retained Users (Day 30)'] = np.minimum(df['Retained Users (Day 30)'], df['New Users (Day 0)'])
     
     return df
 
 
+def generate_events(users: int = 10000, days: int = 90, start_date: datetime = None,
+                    seed: int = DEFAULT_SEED, chunk_days: int = 7, sessions_per_active_day: float = 1.6):
+    """
+    Generate per-user, per-session events in the dashboard's column layout.
+    
+    Each user has a signup day, a daily activity propensity, a favourite
+    character and a voice propensity. Every day each signed-up user is active
+    with their propensity and opens 1 + Poisson sessions. Day-level columns
+    (active users, MAU, new/retained users, voice adopters, session counts)
+    are computed from the simulated users and repeated on each of that day's
+    event rows.
+    
+    Args:
+        users: Number of simulated users
+        days: Number of days to simulate
+        start_date: First simulated day (defaults to `days` days ago)
+        seed: Random seed; the same arguments always yield the same events
+        chunk_days: Days simulated per yielded chunk (bounds memory)
+        sessions_per_active_day: Mean sessions for a user on an active day
+    
+    Yields:
+        DataFrame chunks of events, in time order
+    """
+    if start_date is None:
+        start_date = datetime.now() - timedelta(days=days)
+    rng = np.random.default_rng(seed)
+    start_day = np.datetime64(pd.Timestamp(start_date).date(), 'D')
+    characters = np.array(FEATURE_NAMES)
+    
+    # Per-user traits; some users signed up before the simulated window
+    signup_day = rng.integers(-days // 3, days, users)
+    propensity = rng.beta(2, 5, users)
+    favourite = rng.integers(0, len(FEATURE_NAMES), users)
+    voice_propensity = rng.beta(2, 3, users)
+    
+    # Running state across chunks
+    first_active = np.full(users, -1, dtype=np.int64)
+    last_active = np.full(users, -10 ** 9, dtype=np.int64)
+    voice_adopted = np.zeros(users, dtype=bool)
+    session_offset = 0
+    
+    for chunk_start in range(0, days, chunk_days):
+        day_index = np.arange(chunk_start, min(chunk_start + chunk_days, days))
+        n_days = len(day_index)
+        
+        active = (signup_day[None, :] <= day_index[:, None]) & (rng.random((n_days, users)) < propensity)
+        sessions = np.where(active, 1 + rng.poisson(sessions_per_active_day - 1, (n_days, users)), 0)
+        
+        # One row per session: owner cell in the (day, user) grid
+        owner = np.repeat(np.arange(n_days * users), sessions.ravel())
+        rows = len(owner)
+        day_k, user = np.divmod(owner, users)
+        
+        character = np.where(rng.random(rows) < 0.6, favourite[user], rng.integers(0, len(FEATURE_NAMES), rows))
+        voice = rng.random(rows) < voice_propensity[user]
+        duration = np.clip(np.round(rng.lognormal(3.0, 0.6, rows)), 1, 120).astype(np.int64)
+        interactions = 1 + rng.poisson(duration * 0.8)
+        feedback = rng.random(rows) < 0.3
+        satisfied = feedback & (rng.random(rows) < 0.85)
+        rating = np.clip(rng.normal(4.5, 0.35, rows), 1, 5).round(1)
+        seconds = rng.integers(6 * 3600, 23 * 3600, rows)
+        
+        # Day-level metrics from the simulated users, one value per day in the chunk
+        voice_today = (np.bincount(owner, weights=voice, minlength=n_days * users) > 0).reshape(n_days, users)
+        daily = {name: np.zeros(n_days, dtype=np.int64) for name in (
+            'Daily Active Users', 'Monthly Active Users', 'Total Users',
+            'Users Adopting Voice Features', 'New Users (Day 0)', 'Retained Users (Day 30)')}
+        for k, day in enumerate(day_index):
+            today = active[k]
+            new = today & (first_active < 0)
+            first_active[new] = day
+            last_active[today] = day
+            voice_adopted |= voice_today[k]
+            daily['Daily Active Users'][k] = today.sum()
+            daily['Monthly Active Users'][k] = (last_active > day - 30).sum()
+            daily['Total Users'][k] = (first_active >= 0).sum()
+            daily['Users Adopting Voice Features'][k] = voice_adopted.sum()
+            daily['New Users (Day 0)'][k] = new.sum()
+            daily['Retained Users (Day 30)'][k] = (today & (first_active == day - 30)).sum()
+        
+        # Same consistency rules as the daily generator, applied to whole columns
+        daily['Retained Users (Day 30)'] = np.minimum(daily['Retained Users (Day 30)'], daily['New Users (Day 0)'])
+        satisfied &= feedback
+        
+        session_count = np.bincount(day_k, minlength=n_days)
+        voice_sessions = np.bincount(day_k, weights=voice, minlength=n_days).astype(np.int64)
+        ratings = np.bincount(day_k, weights=feedback, minlength=n_days).astype(np.int64)
+        
+        order = np.lexsort((seconds, day_k))
+        day_k, user = day_k[order], user[order]
+        timestamps = (start_day + day_index[day_k]).astype('datetime64[s]') + seconds[order]
+        
+        chunk = pd.DataFrame({
+            'Date': timestamps,
+            **{name: values[day_k] for name, values in daily.items()},
+            'Total Feedback Responses': feedback[order].astype(np.int64),
+            'Satisfied Responses': satisfied[order].astype(np.int64),
+            'User ID': 'USER_' + pd.Series(user).astype(str),
+            'Character Interacted': characters[character[order]],
+            'Interaction Count': interactions[order],
+            'Session ID': 'SESSION_' + pd.Series(session_offset + np.arange(rows)).astype(str),
+            'Duration (minutes)': duration[order],
+            'Total Sessions': session_count[day_k],
+            'Sessions with Voice Interaction': voice_sessions[day_k],
+            'Voice Interaction': voice[order],
+            'Number of Ratings': ratings[day_k],
+            'Average Rating': rating[order],
+            'Feature Name': characters[character[order]],
+        })
+        session_offset += rows
+        yield chunk
+
+
+def write_events(chunks, filepath: Path = EVENTS_FILE) -> int:
+    """
+    Write event chunks to Parquet (one row group per chunk) or CSV, appending
+    as they are generated so the full event set never sits in memory.
+    
+    Returns:
+        Number of rows written
+    """
+    filepath = Path(filepath)
+    tmp_path = filepath.with_name(filepath.name + '.tmp')
+    rows = 0
+    writer = None
+    try:
+        for index, chunk in enumerate(chunks):
+            if filepath.suffix == '.parquet':
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(tmp_path, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    tmp_path.replace(filepath)
+    print(f"Events exported to: {filepath}")
+    return rows
+
+
 def calculate_kpi_summary(df: pd.DataFrame) -> dict:
     """Calculate key performance indicators from the data."""
     return {
@@ -128,11 +283,36 @@ def print_summary(df: pd.DataFrame) -> None:
 
 def main():
     """Main function to generate and export wellness data."""
+    parser = argparse.ArgumentParser(description="Generate EA Aura dashboard data")
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--events', action='store_true',
+                        help="Generate per-user session events instead of the daily workbook")
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--chunk-days', type=int, default=7)
+    parser.add_argument('--output', type=Path, default=None,
+                        help="Output file (.xlsx for daily data; .parquet or .csv for events)")
+    args = parser.parse_args()
+    
+    if args.events:
+        output = args.output or EVENTS_FILE
+        print(f"Generating EA Aura session events ({args.users:,} users x {args.days} days)...")
+        started = time.perf_counter()
+        rows = write_events(generate_events(args.users, args.days, seed=args.seed,
+                                            chunk_days=args.chunk_days), output)
+        print(f"{rows:,} events in {time.perf_counter() - started:.1f}s")
+        print(f"Point the dashboard at them with AURA_DASHBOARD_DATA={output}")
+        return None
+    
     print("Generating EA Aura wellness dashboard data...")
     
-    df = generate_wellness_data(days=30)
+    df = generate_wellness_data(days=args.days, seed=args.seed)
+    
+    output = args.output or OUTPUT_FILE
+    export_to_excel(df, output)
     
-    export_to_excel(df)
+    # Build the dashboard's columnar cache now so its first load skips Excel parsing
+    convert(output)
     
     print_summary(df)
     
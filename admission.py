@@ -0,0 +1,367 @@
+"""
+Admission Control for EA Aura Wellness Assistant
+Token buckets in requests and tokens per minute, per session and for the
+whole process, with a priority queue in front of the process-wide buckets
+so interactive chat is admitted ahead of batch work.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Limits per minute; 0 disables a bucket, and every bucket is off by default.
+# The process-wide limits should be this process's share of the Azure
+# deployment's quota. Clients that omit session_id share one session id.
+AURA_ADMISSION_ENABLED = os.getenv("AURA_ADMISSION_ENABLED", "1") == "1"
+AURA_GLOBAL_RPM = float(os.getenv("AURA_GLOBAL_RPM", "0"))
+AURA_GLOBAL_TPM = float(os.getenv("AURA_GLOBAL_TPM", "0"))
+AURA_SESSION_RPM = float(os.getenv("AURA_SESSION_RPM", "0"))
+AURA_SESSION_TPM = float(os.getenv("AURA_SESSION_TPM", "0"))
+# Seconds of refill a bucket may bank (Azure enforces quota over short windows too)
+AURA_ADMISSION_BURST_SECONDS = float(os.getenv("AURA_ADMISSION_BURST_SECONDS", "10"))
+AURA_ADMISSION_MAX_SESSIONS = int(os.getenv("AURA_ADMISSION_MAX_SESSIONS", "10000"))
+
+# Queue priorities, lowest first
+INTERACTIVE = 0
+BATCH = 1
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a request cannot be admitted before its deadline."""
+
+
+class TokenBucket:
+    """
+    Bucket refilled at `per_minute` units a minute, holding at most
+    `burst_seconds` worth of refill (and never less than one unit).
+
+    A single request larger than the bucket is charged the whole bucket, so
+    it waits for a full refill rather than forever. Not thread-safe; the
+    AdmissionController lock guards every call.
+    """
+
+    __slots__ = ("rate", "capacity", "level", "updated")
+
+    def __init__(self, per_minute: float, burst_seconds: float = AURA_ADMISSION_BURST_SECONDS):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount: float, now: float) -> None:
+        """Return (positive) or charge (negative) units after the fact."""
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+
+def _bucket(per_minute: float, burst_seconds: float):
+    return TokenBucket(per_minute, burst_seconds) if per_minute > 0 else None
+
+
+class _Waiter:
+    """A queued request; woken by an Event (threads) or a Future (asyncio)."""
+
+    __slots__ = ("priority", "seq", "tokens", "event", "loop", "future")
+
+    def __init__(self, priority: int, seq: int, tokens: float, loop=None):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = None
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        elif self.future is not None:
+            future = self.future
+            self.loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+
+class AdmissionController:
+    """
+    Decides when an upstream call may start, or that it cannot in time.
+
+    A request first waits for its session's request and token buckets, then
+    joins a priority queue for the process-wide buckets. Only the head of the
+    queue takes tokens: interactive requests go ahead of batch work, first
+    come first served within a priority. A 429 from Azure pauses the whole
+    queue for its Retry-After. Whenever the wait would run past the request's
+    deadline the request is rejected at once, so the caller can fall back
+    instead of timing out.
+
+    Token costs are estimates (prompt plus max completion tokens); settle()
+    corrects the buckets with the usage Azure reports.
+
+    Args:
+        global_rpm: Process-wide requests per minute (0 for no limit)
+        global_tpm: Process-wide tokens per minute (0 for no limit)
+        session_rpm: Requests per minute per session (0 for no limit)
+        session_tpm: Tokens per minute per session (0 for no limit)
+        burst_seconds: Seconds of refill each bucket may bank
+        max_sessions: Session bucket pairs kept, least recently used dropped
+        enabled: Set False to admit everything immediately
+    """
+
+    def __init__(self, global_rpm: float = AURA_GLOBAL_RPM, global_tpm: float = AURA_GLOBAL_TPM,
+                 session_rpm: float = AURA_SESSION_RPM, session_tpm: float = AURA_SESSION_TPM,
+                 burst_seconds: float = AURA_ADMISSION_BURST_SECONDS,
+                 max_sessions: int = AURA_ADMISSION_MAX_SESSIONS,
+                 enabled: bool = AURA_ADMISSION_ENABLED):
+        self.enabled = enabled
+        self.session_rpm = session_rpm
+        self.session_tpm = session_tpm
+        self.burst_seconds = burst_seconds
+        self.max_sessions = max_sessions
+
+        self._lock = threading.Lock()
+        self._global_requests = _bucket(global_rpm, burst_seconds)
+        self._global_tokens = _bucket(global_tpm, burst_seconds)
+        self._sessions = OrderedDict()
+        self._queue = []
+        self._seq = itertools.count()
+        self._blocked_until = 0.0
+
+        self.admitted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.rejected = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.throttled = 0
+        self.wait_seconds_total = 0.0
+
+    # -- bucket helpers (lock held) --
+
+    def _session_buckets(self, session_id: str):
+        if session_id is None or not (self.session_rpm > 0 or self.session_tpm > 0):
+            return None
+        buckets = self._sessions.get(session_id)
+        if buckets is None:
+            buckets = (_bucket(self.session_rpm, self.burst_seconds), _bucket(self.session_tpm, self.burst_seconds))
+            self._sessions[session_id] = buckets
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return buckets
+
+    @staticmethod
+    def _wait(buckets, tokens: float, now: float) -> float:
+        requests, token_bucket = buckets
+        return max(requests.wait_time(1, now) if requests else 0.0,
+                   token_bucket.wait_time(tokens, now) if token_bucket else 0.0)
+
+    @staticmethod
+    def _take(buckets, tokens: float, now: float) -> None:
+        requests, token_bucket = buckets
+        if requests:
+            requests.take(1, now)
+        if token_bucket:
+            token_bucket.take(tokens, now)
+
+    def _global_wait(self, tokens: float, now: float) -> float:
+        return max(self._blocked_until - now, self._wait((self._global_requests, self._global_tokens), tokens, now))
+
+    def _wake_head(self) -> None:
+        if self._queue:
+            self._queue[0].wake()
+
+    def _leave(self, waiter: _Waiter) -> None:
+        if waiter in self._queue:
+            was_head = self._queue[0] is waiter
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+            if was_head:
+                self._wake_head()
+
+    def _reject(self, priority: int, reason: str):
+        self.rejected[PRIORITY_NAMES[priority]] += 1
+        return AdmissionRejected(reason)
+
+    # -- admission steps shared by the sync and async paths (lock held) --
+
+    def _reserve_session(self, session_id: str, tokens: float, deadline: float, priority: int):
+        """Take the session's share now, or return seconds to wait before retrying."""
+        buckets = self._session_buckets(session_id)
+        if buckets is None:
+            return 0.0
+        now = time.monotonic()
+        wait = self._wait(buckets, tokens, now)
+        if wait == 0:
+            self._take(buckets, tokens, now)
+            return 0.0
+        if now + wait >= deadline:
+            raise self._reject(priority, "Session rate limit: no capacity before the deadline")
+        return wait
+
+    def _refund_session(self, session_id: str, tokens: float) -> None:
+        buckets = self._sessions.get(session_id)
+        if buckets is not None:
+            now = time.monotonic()
+            if buckets[0]:
+                buckets[0].adjust(1, now)
+            if buckets[1]:
+                buckets[1].adjust(tokens, now)
+
+    def _poll(self, waiter: _Waiter, deadline: float):
+        """
+        Admit `waiter` if it heads the queue and the global buckets allow.
+
+        Returns:
+            float or None: 0 once admitted, else seconds to sleep (None: until woken)
+        """
+        now = time.monotonic()
+        if self._queue[0] is waiter:
+            wait = self._global_wait(waiter.tokens, now)
+            if wait == 0:
+                heapq.heappop(self._queue)
+                self._take((self._global_requests, self._global_tokens), waiter.tokens, now)
+                self._wake_head()
+                return 0.0
+        else:
+            # Not our turn yet; a pause for Retry-After is a lower bound on the wait
+            wait = max(0.0, self._blocked_until - now)
+        if now + wait >= deadline:
+            self._leave(waiter)
+            raise self._reject(waiter.priority, "Upstream quota: no capacity before the deadline")
+        return wait if self._queue[0] is waiter else None
+
+    # -- public API --
+
+    def admit(self, session_id: str, tokens: float, deadline: float, priority: int = INTERACTIVE) -> None:
+        """
+        Block until the request may call upstream, then charge its buckets.
+
+        Args:
+            session_id: Session whose buckets are charged (None for none)
+            tokens: Estimated tokens for the call (prompt + max completion)
+            deadline: time.monotonic() deadline of the request
+            priority: INTERACTIVE or BATCH
+
+        Raises:
+            AdmissionRejected: If the request cannot be admitted before `deadline`
+        """
+        if not self.enabled:
+            return
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                wait = self._reserve_session(session_id, tokens, deadline, priority)
+            if wait == 0:
+                break
+            time.sleep(wait)
+
+        waiter = _Waiter(priority, next(self._seq), tokens)
+        with self._lock:
+            heapq.heappush(self._queue, waiter)
+        try:
+            while True:
+                with self._lock:
+                    wait = self._poll(waiter, deadline)
+                    if wait == 0:
+                        self._admitted(priority, started)
+                        return
+                    timeout = deadline - time.monotonic() if wait is None else wait
+                waiter.event.wait(max(0.0, timeout))
+                waiter.event.clear()
+        except BaseException:
+            with self._lock:
+                self._leave(waiter)
+                self._refund_session(session_id, tokens)
+            raise
+
+    async def admit_async(self, session_id: str, tokens: float, deadline: float,
+                          priority: int = INTERACTIVE) -> None:
+        """Async counterpart of admit(); waits without blocking the event loop."""
+        if not self.enabled:
+            return
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                wait = self._reserve_session(session_id, tokens, deadline, priority)
+            if wait == 0:
+                break
+            await asyncio.sleep(wait)
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, next(self._seq), tokens, loop)
+        with self._lock:
+            heapq.heappush(self._queue, waiter)
+        try:
+            while True:
+                with self._lock:
+                    wait = self._poll(waiter, deadline)
+                    if wait == 0:
+                        self._admitted(priority, started)
+                        return
+                    timeout = deadline - time.monotonic() if wait is None else wait
+                    waiter.future = loop.create_future()
+                try:
+                    await asyncio.wait_for(waiter.future, max(0.0, timeout))
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._lock:
+                self._leave(waiter)
+                self._refund_session(session_id, tokens)
+            raise
+
+    def _admitted(self, priority: int, started: float) -> None:
+        self.admitted[PRIORITY_NAMES[priority]] += 1
+        self.wait_seconds_total += time.monotonic() - started
+
+    def settle(self, session_id: str, estimated: float, actual: float) -> None:
+        """Correct the token buckets once Azure reports the call's real usage."""
+        if not self.enabled or actual is None:
+            return
+        delta = estimated - actual
+        with self._lock:
+            now = time.monotonic()
+            if self._global_tokens:
+                self._global_tokens.adjust(delta, now)
+            buckets = self._sessions.get(session_id)
+            if buckets is not None and buckets[1]:
+                buckets[1].adjust(delta, now)
+
+    def throttle(self, seconds: float) -> None:
+        """Pause all admissions for `seconds` (Azure's Retry-After on a 429)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self.throttled += 1
+            self._wake_head()
+
+    def stats(self) -> dict:
+        """Admission counts by priority, queue depth and any Retry-After pause."""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'admitted': dict(self.admitted),
+                'rejected': dict(self.rejected),
+                'queued': len(self._queue),
+                'throttled': self.throttled,
+                'paused_seconds': round(max(0.0, self._blocked_until - time.monotonic()), 3),
+                'wait_seconds_total': round(self.wait_seconds_total, 3),
+                'sessions_tracked': len(self._sessions),
+            }
@@ -2,41 +2,186 @@
 EA Aura Wellness Hub - Flask Backend Application
 Serves the wellness dashboard and provides AI assistant API endpoints.
 """
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Response, abort, g, render_template, request, jsonify, stream_with_context
 from flask_cors import CORS
+from werkzeug.security import safe_join
+import json
 import os
+import random
+import time
 from pathlib import Path
 
-from config_openAI import get_aura_response
+from config_openAI import (AURA_BATCH_CONCURRENCY, AURA_BATCH_MAX_ITEMS, admission, get_aura_response,
+                           get_client_stats, history_summaries, inflight_requests, normalize_batch_item,
+                           prompt_cache_stats, reset_clients, response_cache, run_batch, stream_aura_response,
+                           upstream_breaker)
+from asset_pipeline import DERIVED_DIR, AssetManifest
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry as metrics_registry
+from session_store import create_session_store
+from static_cache import StaticFileCache, is_private
+from telemetry import TelemetryRecorder
+from wellness_store import WellnessStore
 
 app = Flask(__name__, static_folder='.', template_folder='.')
 CORS(app)
 
-conversation_histories = {}
+# In-process by default; AURA_SESSION_BACKEND=sqlite or redis shares histories across workers
+conversation_histories = create_session_store()
+
+# Resized WebP/AVIF image variants generated by `python asset_pipeline.py`
+asset_manifest = AssetManifest.load()
+
+# Daily wellness entries and report rollups synced from the hub page
+wellness_store = WellnessStore()
+
+# One compact event per chat turn, flushed in the background to data/telemetry/
+chat_telemetry = TelemetryRecorder()
+
+# Static files with precompressed bodies and strong ETags; pages are warmed at startup
+BASE_DIR = Path(__file__).parent
+static_files = StaticFileCache()
+for _pattern in ('*.html', 'Aura/*.html', 'games/*.html', 'Aura/games/*.html'):
+    static_files.warm(BASE_DIR, _pattern)
+
+# Request counters and handler latency for /api/metrics
+http_requests = metrics_registry.counter(
+    "aura_http_requests_total", "HTTP requests by endpoint and status code.", labels=("endpoint", "status"))
+http_latency = metrics_registry.histogram(
+    "aura_http_request_duration_seconds", "Handler duration by endpoint (streams: until the first byte).",
+    labels=("endpoint",))
+metrics_registry.gauge_callback(
+    "aura_active_sessions", "Live conversation sessions.", lambda: len(conversation_histories))
+metrics_registry.counter_callback(
+    "aura_static_bytes_sent_total", "Static file body bytes served.", lambda: static_files.bytes_sent)
+metrics_registry.gauge_callback(
+    "aura_upstream_in_flight", "Azure OpenAI requests in flight.", lambda: get_client_stats()['in_flight'])
+metrics_registry.counter_callback(
+    "aura_telemetry_dropped_total", "Chat telemetry events dropped by a full buffer.",
+    lambda: chat_telemetry.dropped)
+metrics_registry.gauge_callback(
+    "aura_admission_queued", "Requests waiting for upstream rate-limit admission.", lambda: admission.stats()['queued'])
+metrics_registry.counter_callback(
+    "aura_admission_rejected_total", "Requests sent to the fallback because rate limits had no room in time.",
+    lambda: sum(admission.stats()['rejected'].values()))
+
+
+def after_fork() -> None:
+    """Reopen per-process handles in a worker forked from a preloaded app (see serve.py)."""
+    metrics_registry.set_worker(os.getpid())
+    reset_clients()
+    wellness_store.reopen()
+    reopen = getattr(conversation_histories, 'reopen', None)
+    if reopen is not None:
+        reopen()
+
+
+def observe_request(endpoint: str, status: int, started: float) -> None:
+    """Count one request and record its handler latency."""
+    endpoint = endpoint or 'unmatched'
+    http_requests.inc(endpoint=endpoint, status=status)
+    http_latency.observe(time.perf_counter() - started, endpoint=endpoint)
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        observe_request(request.endpoint, response.status_code, started)
+    return response
+
+
+WELLNESS_TIPS = {
+    'physical': [
+        "🏃 Take a 5-minute walk every hour to boost circulation and energy",
+        "💧 Drink a glass of water right now - hydration improves focus by 25%",
+        "🧘 Do 3 desk stretches: neck rolls, shoulder shrugs, wrist circles"
+    ],
+    'mental': [
+        "🧠 Practice the 4-7-8 breathing technique for instant calm",
+        "📝 Write down 3 things you're grateful for today",
+        "🎧 Listen to calming music for 5 minutes to reset your mind"
+    ],
+    'productivity': [
+        "🎯 Use the Pomodoro Technique: 25 min work, 5 min break",
+        "📋 Write your top 3 priorities for today",
+        "🚫 Turn off notifications for 1 hour of deep work"
+    ],
+    'social': [
+        "👋 Reach out to a colleague you haven't spoken to recently",
+        "☕ Schedule a virtual coffee chat with a team member",
+        "🙏 Send a thank you message to someone who helped you"
+    ],
+    'purpose': [
+        "🎯 Reflect on one achievement you're proud of this week",
+        "📈 Set one small goal that aligns with your long-term vision",
+        "💡 Learn something new for 10 minutes today"
+    ],
+    'general': [
+        "✨ Take 3 deep breaths and smile - it releases endorphins!",
+        "🌿 Step outside for fresh air and natural light",
+        "🎮 Playing wellness games can improve focus and reduce stress"
+    ]
+}
 
 
 @app.route('/')
 def index():
     """Serve the main landing page."""
-    return send_from_directory('.', 'index.html')
+    return send_static(BASE_DIR, 'index.html')
 
 
 @app.route('/aura')
 def aura_app():
     """Serve the EA Aura Enhanced wellness application."""
-    return send_from_directory('.', 'ea_aura_enhanced.html')
+    return send_static(BASE_DIR, 'ea_aura_enhanced.html')
+
+
+def send_static(directory, filename, mimetype=None, immutable=None):
+    """
+    Serve a file through the static cache: gzip/brotli by Accept-Encoding,
+    304 for matching If-None-Match/If-Modified-Since, 206 for Range requests.
+    """
+    path = None if is_private(filename) else safe_join(str(directory), filename)
+    entry = static_files.get(Path(path).resolve()) if path else None
+    if entry is None:
+        abort(404)
+    status, headers, body = static_files.respond(entry, request.headers, mimetype, immutable)
+    return Response(body, status=status, headers=headers)
+
+
+def _image_variant(rel_path):
+    """
+    Serve a pre-generated image variant (see asset_pipeline.py) if one exists.
+    Picks AVIF/WebP from the Accept header and the width from an optional ?w=.
+    """
+    if rel_path not in asset_manifest.images:
+        return None
+    variant = asset_manifest.pick(rel_path, request.headers.get('Accept', ''), request.args.get('w', type=int))
+    if variant is None:
+        # The original answers this request, but which file is sent still depends on Accept
+        response = send_static(BASE_DIR, rel_path)
+    else:
+        filename, mimetype = variant
+        response = send_static(DERIVED_DIR, filename, mimetype=mimetype, immutable=False)
+    response.vary.add('Accept')
+    return response
 
 
 @app.route('/games/<path:filename>')
 def serve_games(filename):
     """Serve game files from the games directory."""
-    return send_from_directory('games', filename)
+    return _image_variant(f'games/{filename}') or send_static(BASE_DIR / 'games', filename)
 
 
 @app.route('/<path:filename>')
 def serve_static(filename):
     """Serve static files (CSS, JS, images, etc.)."""
-    return send_from_directory('.', filename)
+    return _image_variant(filename) or send_static(BASE_DIR, filename)
 
 
 @app.route('/api/chat', methods=['POST'])
@@ -45,6 +190,8 @@ def chat():
     AI Chat endpoint for Aura assistant.
     Accepts JSON with 'message' and optional 'session_id' for conversation context.
     """
+    started = time.perf_counter()
+    data = None
     try:
         data = request.get_json()
         
@@ -58,36 +205,172 @@ def chat():
         session_id = data.get('session_id', 'default')
         character = data.get('character', 'nova')
         
-        if session_id not in conversation_histories:
-            conversation_histories[session_id] = []
+        history = conversation_histories.get_history(session_id)
         
-        history = conversation_histories[session_id]
+        prompt_stats = {}
+        response = get_aura_response(user_message, history, character=character,
+                                     session_id=session_id, prompt_stats=prompt_stats)
         
-        character_context = get_character_context(character)
-        full_message = f"[Character: {character}] {user_message}" if character else user_message
+        conversation_histories.append_turn(session_id, user_message, response)
         
-        response = get_aura_response(full_message, history)
-        
-        history.append({"role": "user", "content": user_message})
-        history.append({"role": "assistant", "content": response})
-        
-        if len(history) > 20:
-            conversation_histories[session_id] = history[-20:]
+        chat_telemetry.record('chat', character, session_id, (time.perf_counter() - started) * 1000,
+                              prompt_stats.get('source', 'upstream'), len(response),
+                              prompt_stats.get('prompt_tokens'), prompt_stats.get('completion_tokens'))
         
         return jsonify({
             'success': True,
             'response': response,
-            'character': character
+            'character': character,
+            'prompt_tokens': prompt_stats.get('prompt_tokens')
         })
         
     except Exception as e:
         print(f"Chat API Error: {e}")
+        fields = data if isinstance(data, dict) else {}
+        chat_telemetry.record('chat', fields.get('character'), fields.get('session_id', 'default'),
+                              (time.perf_counter() - started) * 1000, 'error', 0)
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 
+def _sse_event(event: str, payload: dict) -> str:
+    """Format a single Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Streaming AI Chat endpoint for Aura assistant (Server-Sent Events).
+    Accepts the same JSON as /api/chat and emits 'token' events as the
+    completion arrives, a 'fallback' event if the upstream stream fails
+    (the client should replace any partial text with it), and a final
+    'done' event carrying the full response.
+    """
+    data = request.get_json(silent=True)
+    
+    if not data or 'message' not in data:
+        return jsonify({
+            'success': False,
+            'error': 'No message provided'
+        }), 400
+    
+    user_message = data['message']
+    session_id = data.get('session_id', 'default')
+    character = data.get('character', 'nova')
+    
+    history = conversation_histories.get_history(session_id)
+    
+    def generate():
+        started = time.perf_counter()
+        parts = []
+        prompt_stats = {}
+        try:
+            for kind, text in stream_aura_response(user_message, history, character=character,
+                                                   session_id=session_id, prompt_stats=prompt_stats):
+                if kind == 'fallback':
+                    parts = [text]
+                else:
+                    parts.append(text)
+                yield _sse_event(kind, {kind: text})
+            
+            response = ''.join(parts)
+            
+            conversation_histories.append_turn(session_id, user_message, response)
+            
+            chat_telemetry.record('chat_stream', character, session_id, (time.perf_counter() - started) * 1000,
+                                  prompt_stats.get('source', 'upstream'), len(response),
+                                  prompt_stats.get('prompt_tokens'), prompt_stats.get('completion_tokens'))
+            
+            yield _sse_event('done', {
+                'success': True,
+                'response': response,
+                'character': character,
+                'prompt_tokens': prompt_stats.get('prompt_tokens')
+            })
+        
+        except Exception as e:
+            print(f"Chat Stream Error: {e}")
+            chat_telemetry.record('chat_stream', character, session_id,
+                                  (time.perf_counter() - started) * 1000, 'error', 0)
+            yield _sse_event('error', {
+                'success': False,
+                'error': str(e)
+            })
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def parse_batch_request(data) -> tuple:
+    """
+    Validate a /api/chat/batch body.
+    
+    Returns:
+        tuple: (normalized items, concurrency capped at AURA_BATCH_CONCURRENCY)
+    
+    Raises:
+        ValueError: With a message for the 400 response
+    """
+    items = data.get('items') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError('No items provided')
+    if len(items) > AURA_BATCH_MAX_ITEMS:
+        raise ValueError(f'At most {AURA_BATCH_MAX_ITEMS} items per batch')
+    try:
+        concurrency = int(data.get('concurrency') or AURA_BATCH_CONCURRENCY)
+    except (TypeError, ValueError):
+        raise ValueError('concurrency must be an integer')
+    return [normalize_batch_item(item) for item in items], max(1, min(concurrency, AURA_BATCH_CONCURRENCY))
+
+
+def finish_batch_result(result: dict, item: dict, histories) -> str:
+    """Store a batch reply in its session, record telemetry, and format the NDJSON line."""
+    session_id = item['session_id']
+    if result['success']:
+        if session_id:
+            histories.append_turn(session_id, item['message'], result['response'])
+        chat_telemetry.record('chat_batch', item['character'], session_id or 'batch', result['latency_ms'],
+                              result['source'], len(result['response']),
+                              result['prompt_tokens'], result['completion_tokens'])
+    else:
+        chat_telemetry.record('chat_batch', item['character'], session_id or 'batch', 0, 'error', 0)
+    return json.dumps(result) + "\n"
+
+
+@app.route('/api/chat/batch', methods=['POST'])
+def chat_batch():
+    """
+    Batch chat endpoint for scheduled nudges.
+    Accepts JSON with 'items' (each with 'message' and optional 'session_id'
+    and 'character') and an optional 'concurrency', and streams one NDJSON
+    line per item as it finishes. Lines arrive in completion order and carry
+    the item's 'index'.
+    """
+    try:
+        items, concurrency = parse_batch_request(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    def generate():
+        for result in run_batch(items, concurrency, conversation_histories.get_history):
+            yield finish_batch_result(result, items[result['index']], conversation_histories)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/chat/clear', methods=['POST'])
 def clear_chat():
     """Clear conversation history for a session."""
@@ -95,8 +378,8 @@ def clear_chat():
         data = request.get_json()
         session_id = data.get('session_id', 'default')
         
-        if session_id in conversation_histories:
-            del conversation_histories[session_id]
+        conversation_histories.clear(session_id)
+        history_summaries.clear(session_id)
         
         return jsonify({
             'success': True,
@@ -115,41 +398,7 @@ def get_wellness_tips():
     """Get daily wellness tips based on category."""
     category = request.args.get('category', 'general')
     
-    tips = {
-        'physical': [
-            "🏃 Take a 5-minute walk every hour to boost circulation and energy",
-            "💧 Drink a glass of water right now - hydration improves focus by 25%",
-            "🧘 Do 3 desk stretches: neck rolls, shoulder shrugs, wrist circles"
-        ],
-        'mental': [
-            "🧠 Practice the 4-7-8 breathing technique for instant calm",
-            "📝 Write down 3 things you're grateful for today",
-            "🎧 Listen to calming music for 5 minutes to reset your mind"
-        ],
-        'productivity': [
-            "🎯 Use the Pomodoro Technique: 25 min work, 5 min break",
-            "📋 Write your top 3 priorities for today",
-            "🚫 Turn off notifications for 1 hour of deep work"
-        ],
-        'social': [
-            "👋 Reach out to a colleague you haven't spoken to recently",
-            "☕ Schedule a virtual coffee chat with a team member",
-            "🙏 Send a thank you message to someone who helped you"
-        ],
-        'purpose': [
-            "🎯 Reflect on one achievement you're proud of this week",
-            "📈 Set one small goal that aligns with your long-term vision",
-            "💡 Learn something new for 10 minutes today"
-        ],
-        'general': [
-            "✨ Take 3 deep breaths and smile - it releases endorphins!",
-            "🌿 Step outside for fresh air and natural light",
-            "🎮 Playing wellness games can improve focus and reduce stress"
-        ]
-    }
-    
-    import random
-    category_tips = tips.get(category, tips['general'])
+    category_tips = WELLNESS_TIPS.get(category, WELLNESS_TIPS['general'])
     
     return jsonify({
         'success': True,
@@ -159,27 +408,94 @@ def get_wellness_tips():
     })
 
 
+@app.route('/api/wellness/history', methods=['POST'])
+def upsert_wellness_history():
+    """
+    Bulk insert or update daily wellness entries.
+    Accepts JSON with 'user_id' and 'entries' (list of {date, steps, sleep, mood, focus, coins}).
+    """
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data.get('entries'), list):
+        return jsonify({
+            'success': False,
+            'error': 'No entries provided'
+        }), 400
+
+    user_id = data.get('user_id', 'default')
+    try:
+        written = wellness_store.upsert(user_id, data['entries'])
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    return jsonify({
+        'success': True,
+        'user_id': user_id,
+        'written': written,
+        'rollups': wellness_store.rollups(user_id)
+    })
+
+
+@app.route('/api/wellness/history', methods=['GET'])
+def get_wellness_history():
+    """Get a user's wellness entries, newest first, optionally between 'start' and 'end' dates."""
+    user_id = request.args.get('user_id', 'default')
+    entries = wellness_store.history(
+        user_id,
+        start=request.args.get('start'),
+        end=request.args.get('end'),
+        limit=request.args.get('limit', type=int)
+    )
+
+    return jsonify({
+        'success': True,
+        'user_id': user_id,
+        'entries': entries
+    })
+
+
+@app.route('/api/wellness/rollups', methods=['GET'])
+def get_wellness_rollups():
+    """Get a user's 7/30/90/365-day report summaries."""
+    user_id = request.args.get('user_id', 'default')
+
+    return jsonify({
+        'success': True,
+        'user_id': user_id,
+        'rollups': wellness_store.rollups(user_id)
+    })
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Counters, gauges and latency histograms in the Prometheus text format."""
+    return Response(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
     return jsonify({
         'status': 'healthy',
         'service': 'EA Aura Wellness Hub',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'worker_pid': os.getpid(),
+        'upstream_pool': get_client_stats(),
+        'response_cache': response_cache.stats(),
+        'sessions': conversation_histories.stats(),
+        'history_summaries': history_summaries.stats(),
+        'circuit_breaker': upstream_breaker.snapshot(),
+        'coalesced_requests': inflight_requests.stats(),
+        'static_files': static_files.stats(),
+        'wellness_history': wellness_store.stats(),
+        'telemetry': chat_telemetry.stats(),
+        'prompt_cache': prompt_cache_stats(),
+        'admission': admission.stats()
     })
 
 
-def get_character_context(character: str) -> str:
-    """Get personality context for different Aura characters."""
-    characters = {
-        'nova': "You are Nova, the habit tracking companion. You're energetic, encouraging, and focused on building consistent wellness routines. Use 🏃‍♀️ emoji occasionally.",
-        'veda': "You are Veda, the focus and energy coach. You're motivating, driven, and help boost productivity. Use 💪 emoji occasionally.",
-        'kai': "You are Kai, the calm and breath guide. You're peaceful, zen-like, and help with mindfulness and stress management. Use 🧘‍♂️ emoji occasionally.",
-        'iris': "You are Iris, the relaxation and recovery specialist. You're gentle, nurturing, and focused on rest and healing. Use 🌿 emoji occasionally."
-    }
-    return characters.get(character, characters['nova'])
-
-
 if __name__ == '__main__':
     print("=" * 50)
     print("🌟 EA Aura Wellness Hub Starting...")
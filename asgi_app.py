@@ -0,0 +1,380 @@
+"""
+EA Aura Wellness Hub - Async (ASGI) Backend Application
+Serves the same routes as app.py on an event loop, so in-flight Azure OpenAI
+calls wait on sockets instead of pinning worker threads.
+
+Run with:
+    hypercorn asgi_app:app --bind 0.0.0.0:5000
+"""
+import asyncio
+import os
+import random
+import time
+from pathlib import Path
+
+from quart import Quart, Response, abort, g, jsonify, request
+from quart_cors import cors
+from werkzeug.security import safe_join
+
+from app import (BASE_DIR, WELLNESS_TIPS, _sse_event, asset_manifest, chat_telemetry, finish_batch_result,
+                 observe_request, parse_batch_request, static_files, wellness_store)
+from asset_pipeline import DERIVED_DIR
+from config_openAI import (admission, get_aura_response_async, get_client_stats, history_summaries,
+                           inflight_requests, prompt_cache_stats, response_cache, run_batch_async,
+                           stream_aura_response_async, upstream_breaker)
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry as metrics_registry
+from session_store import create_session_store
+from static_cache import is_private
+
+app = Quart(__name__, static_folder=None)
+app = cors(app)
+
+conversation_histories = create_session_store()
+
+# Report this server's sessions, not the (unused) Flask app's store
+metrics_registry.gauge_callback(
+    "aura_active_sessions", "Live conversation sessions.", lambda: len(conversation_histories))
+
+
+@app.before_request
+async def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+async def _record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        observe_request(request.endpoint, response.status_code, started)
+    return response
+
+
+@app.route('/')
+async def index():
+    """Serve the main landing page."""
+    return await send_static(BASE_DIR, 'index.html')
+
+
+@app.route('/aura')
+async def aura_app():
+    """Serve the EA Aura Enhanced wellness application."""
+    return await send_static(BASE_DIR, 'ea_aura_enhanced.html')
+
+
+async def send_static(directory, filename, mimetype=None, immutable=None):
+    """Serve a file through the shared static cache (see app.send_static)."""
+    path = None if is_private(filename) else safe_join(str(directory), filename)
+    entry = static_files.get(Path(path).resolve()) if path else None
+    if entry is None:
+        abort(404)
+    status, headers, body = static_files.respond(entry, request.headers, mimetype, immutable)
+    return Response(body, status=status, headers=headers)
+
+
+async def _image_variant(rel_path):
+    """Serve a pre-generated image variant if one exists (see app._image_variant)."""
+    if rel_path not in asset_manifest.images:
+        return None
+    variant = asset_manifest.pick(rel_path, request.headers.get('Accept', ''), request.args.get('w', type=int))
+    if variant is None:
+        response = await send_static(BASE_DIR, rel_path)
+    else:
+        filename, mimetype = variant
+        response = await send_static(DERIVED_DIR, filename, mimetype=mimetype, immutable=False)
+    response.vary.add('Accept')
+    return response
+
+
+@app.route('/games/<path:filename>')
+async def serve_games(filename):
+    """Serve game files from the games directory."""
+    return await _image_variant(f'games/{filename}') or await send_static(BASE_DIR / 'games', filename)
+
+
+@app.route('/<path:filename>')
+async def serve_static(filename):
+    """Serve static files (CSS, JS, images, etc.)."""
+    return await _image_variant(filename) or await send_static(BASE_DIR, filename)
+
+
+@app.route('/api/chat', methods=['POST'])
+async def chat():
+    """
+    AI Chat endpoint for Aura assistant.
+    Accepts JSON with 'message' and optional 'session_id' for conversation context.
+    """
+    started = time.perf_counter()
+    data = None
+    try:
+        data = await request.get_json()
+        
+        if not data or 'message' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'No message provided'
+            }), 400
+        
+        user_message = data['message']
+        session_id = data.get('session_id', 'default')
+        character = data.get('character', 'nova')
+        
+        history = await asyncio.to_thread(conversation_histories.get_history, session_id)
+        
+        prompt_stats = {}
+        response = await get_aura_response_async(user_message, history, character=character,
+                                                 session_id=session_id, prompt_stats=prompt_stats)
+        
+        await asyncio.to_thread(conversation_histories.append_turn, session_id, user_message, response)
+        
+        chat_telemetry.record('chat', character, session_id, (time.perf_counter() - started) * 1000,
+                              prompt_stats.get('source', 'upstream'), len(response),
+                              prompt_stats.get('prompt_tokens'), prompt_stats.get('completion_tokens'))
+        
+        return jsonify({
+            'success': True,
+            'response': response,
+            'character': character,
+            'prompt_tokens': prompt_stats.get('prompt_tokens')
+        })
+    
+    except Exception as e:
+        print(f"Chat API Error: {e}")
+        fields = data if isinstance(data, dict) else {}
+        chat_telemetry.record('chat', fields.get('character'), fields.get('session_id', 'default'),
+                              (time.perf_counter() - started) * 1000, 'error', 0)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/chat/stream', methods=['POST'])
+async def chat_stream():
+    """
+    Streaming AI Chat endpoint for Aura assistant (Server-Sent Events).
+    Same event protocol as the Flask /api/chat/stream route.
+    """
+    data = await request.get_json(silent=True)
+    
+    if not data or 'message' not in data:
+        return jsonify({
+            'success': False,
+            'error': 'No message provided'
+        }), 400
+    
+    user_message = data['message']
+    session_id = data.get('session_id', 'default')
+    character = data.get('character', 'nova')
+    
+    history = await asyncio.to_thread(conversation_histories.get_history, session_id)
+    
+    async def generate():
+        started = time.perf_counter()
+        parts = []
+        prompt_stats = {}
+        try:
+            async for kind, text in stream_aura_response_async(user_message, history, character=character,
+                                                               session_id=session_id, prompt_stats=prompt_stats):
+                if kind == 'fallback':
+                    parts = [text]
+                else:
+                    parts.append(text)
+                yield _sse_event(kind, {kind: text})
+            
+            response = ''.join(parts)
+            
+            await asyncio.to_thread(conversation_histories.append_turn, session_id, user_message, response)
+            
+            chat_telemetry.record('chat_stream', character, session_id, (time.perf_counter() - started) * 1000,
+                                  prompt_stats.get('source', 'upstream'), len(response),
+                                  prompt_stats.get('prompt_tokens'), prompt_stats.get('completion_tokens'))
+            
+            yield _sse_event('done', {
+                'success': True,
+                'response': response,
+                'character': character,
+                'prompt_tokens': prompt_stats.get('prompt_tokens')
+            })
+        
+        except Exception as e:
+            print(f"Chat Stream Error: {e}")
+            chat_telemetry.record('chat_stream', character, session_id,
+                                  (time.perf_counter() - started) * 1000, 'error', 0)
+            yield _sse_event('error', {
+                'success': False,
+                'error': str(e)
+            })
+    
+    response = Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.timeout = None
+    return response
+
+
+@app.route('/api/chat/batch', methods=['POST'])
+async def chat_batch():
+    """
+    Batch chat endpoint for scheduled nudges (NDJSON, completion order).
+    Same request and result lines as the Flask app's /api/chat/batch.
+    """
+    try:
+        items, concurrency = parse_batch_request(await request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    async def generate():
+        # run_batch_async reads history through asyncio.to_thread, so neither
+        # store call blocks the loop
+        async for result in run_batch_async(items, concurrency, conversation_histories.get_history):
+            yield await asyncio.to_thread(finish_batch_result, result, items[result['index']],
+                                          conversation_histories)
+    
+    response = Response(
+        generate(),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.timeout = None
+    return response
+
+
+@app.route('/api/chat/clear', methods=['POST'])
+async def clear_chat():
+    """Clear conversation history for a session."""
+    try:
+        data = await request.get_json()
+        session_id = data.get('session_id', 'default')
+        
+        await asyncio.to_thread(conversation_histories.clear, session_id)
+        history_summaries.clear(session_id)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Conversation history cleared'
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/wellness/tips', methods=['GET'])
+async def get_wellness_tips():
+    """Get daily wellness tips based on category."""
+    category = request.args.get('category', 'general')
+    
+    category_tips = WELLNESS_TIPS.get(category, WELLNESS_TIPS['general'])
+    
+    return jsonify({
+        'success': True,
+        'category': category,
+        'tips': category_tips,
+        'featured_tip': random.choice(category_tips)
+    })
+
+
+@app.route('/api/wellness/history', methods=['POST'])
+async def upsert_wellness_history():
+    """Bulk insert or update daily wellness entries (see app.upsert_wellness_history)."""
+    data = await request.get_json(silent=True)
+    if not data or not isinstance(data.get('entries'), list):
+        return jsonify({
+            'success': False,
+            'error': 'No entries provided'
+        }), 400
+
+    user_id = data.get('user_id', 'default')
+    try:
+        written = await asyncio.to_thread(wellness_store.upsert, user_id, data['entries'])
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    return jsonify({
+        'success': True,
+        'user_id': user_id,
+        'written': written,
+        'rollups': await asyncio.to_thread(wellness_store.rollups, user_id)
+    })
+
+
+@app.route('/api/wellness/history', methods=['GET'])
+async def get_wellness_history():
+    """Get a user's wellness entries, newest first, optionally between 'start' and 'end' dates."""
+    user_id = request.args.get('user_id', 'default')
+    entries = await asyncio.to_thread(
+        wellness_store.history,
+        user_id,
+        start=request.args.get('start'),
+        end=request.args.get('end'),
+        limit=request.args.get('limit', type=int)
+    )
+
+    return jsonify({
+        'success': True,
+        'user_id': user_id,
+        'entries': entries
+    })
+
+
+@app.route('/api/wellness/rollups', methods=['GET'])
+async def get_wellness_rollups():
+    """Get a user's 7/30/90/365-day report summaries."""
+    user_id = request.args.get('user_id', 'default')
+
+    return jsonify({
+        'success': True,
+        'user_id': user_id,
+        'rollups': await asyncio.to_thread(wellness_store.rollups, user_id)
+    })
+
+
+@app.route('/api/metrics', methods=['GET'])
+async def metrics():
+    """Counters, gauges and latency histograms in the Prometheus text format."""
+    # Gauge callbacks count sessions, which queries SQLite or Redis
+    return Response(await asyncio.to_thread(metrics_registry.render), content_type=METRICS_CONTENT_TYPE)
+
+
+@app.route('/api/health', methods=['GET'])
+async def health_check():
+    """Health check endpoint."""
+    return jsonify({
+        'status': 'healthy',
+        'service': 'EA Aura Wellness Hub',
+        'version': '1.0.0',
+        'worker_pid': os.getpid(),
+        'upstream_pool': get_client_stats(),
+        'response_cache': response_cache.stats(),
+        'sessions': await asyncio.to_thread(conversation_histories.stats),
+        'history_summaries': history_summaries.stats(),
+        'circuit_breaker': upstream_breaker.snapshot(),
+        'coalesced_requests': inflight_requests.stats(),
+        'static_files': static_files.stats(),
+        'wellness_history': await asyncio.to_thread(wellness_store.stats),
+        'telemetry': chat_telemetry.stats(),
+        'prompt_cache': prompt_cache_stats(),
+        'admission': admission.stats()
+    })
+
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("🌟 EA Aura Wellness Hub (async) Starting...")
+    print("=" * 50)
+    print("\n📍 Access the application at:")
+    print("   - Landing Page: http://localhost:5000/")
+    print("   - API Health: http://localhost:5000/api/health")
+    print("\n💡 For production use: hypercorn asgi_app:app --bind 0.0.0.0:5000\n")
+    
+    app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,297 @@
+"""
+EA Aura Image Asset Pipeline
+Generates resized WebP/AVIF/PNG derivatives of the character and jar images
+with content-hashed filenames, deduplicating identical files across the root
+and Aura/ trees. Flask serves the best variant for each request's Accept header.
+
+Usage:
+    python asset_pipeline.py [--widths 160 320 640 1024] [--force]
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+DERIVED_DIR = BASE_DIR / 'static' / 'derived'
+MANIFEST_PATH = DERIVED_DIR / 'manifest.json'
+
+# Directories scanned for source images (relative paths are the URL paths)
+SOURCE_DIRS = [BASE_DIR, BASE_DIR / 'Aura']
+SOURCE_EXTENSIONS = {'.png', '.jpg', '.jpeg'}
+
+DEFAULT_WIDTHS = (160, 320, 640, 1024)
+
+# Width served when the request does not ask for one (~2x the on-page size)
+AURA_IMAGE_DEFAULT_WIDTH = int(os.getenv("AURA_IMAGE_DEFAULT_WIDTH", "640"))
+
+# Encoder settings per output format, in order of preference when serving
+FORMAT_OPTIONS = {
+    'avif': {'quality': 60},
+    'webp': {'quality': 80, 'method': 6},
+    'png': {'optimize': True},
+}
+
+MIMETYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+    'png': 'image/png',
+}
+
+MANIFEST_VERSION = 1
+
+
+def parse_accept(header: str) -> dict:
+    """Media ranges of an Accept header mapped to their q-values."""
+    ranges = {}
+    for part in (header or '').lower().split(','):
+        media_range, *params = [piece.strip() for piece in part.split(';')]
+        if not media_range:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranges[media_range] = q
+    return ranges
+
+
+def accept_quality(ranges: dict, mimetype: str, wildcards: bool = True) -> float:
+    """q-value for `mimetype` from the most specific matching media range."""
+    if mimetype in ranges:
+        return ranges[mimetype]
+    if wildcards:
+        for media_range in (mimetype.split('/')[0] + '/*', '*/*'):
+            if media_range in ranges:
+                return ranges[media_range]
+    return 0.0
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def available_formats() -> list:
+    """Output formats the installed Pillow can encode."""
+    from PIL import features
+
+    formats = ['webp', 'png'] if features.check('webp') else ['png']
+    try:
+        if features.check('avif'):
+            formats.insert(0, 'avif')
+    except ValueError:
+        # Pillow < 11.2 has no built-in AVIF; use the plugin if installed
+        try:
+            import pillow_avif  # noqa: F401
+            formats.insert(0, 'avif')
+        except ImportError:
+            pass
+    return formats
+
+
+def discover_sources() -> list:
+    """Source image paths relative to BASE_DIR, in a stable order."""
+    sources = []
+    for directory in SOURCE_DIRS:
+        for path in sorted(directory.iterdir()):
+            if path.is_file() and path.suffix.lower() in SOURCE_EXTENSIONS:
+                sources.append(path.relative_to(BASE_DIR).as_posix())
+    return sources
+
+
+def render_variants(source: Path, widths: tuple, formats: list) -> list:
+    """
+    Encode resized copies of one image and write them to DERIVED_DIR.
+
+    Returns:
+        list: [{"path", "format", "width", "height", "bytes"}, ...]
+    """
+    from PIL import Image
+
+    variants = []
+    with Image.open(source) as original:
+        original.load()
+        image = original if original.mode in ('RGB', 'RGBA') else original.convert('RGBA')
+
+        # Never upscale; always include the original width as the largest size
+        targets = sorted({w for w in widths if w < image.width} | {image.width})
+
+        for width in targets:
+            height = round(image.height * width / image.width)
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+
+            for fmt in formats:
+                buffer = io.BytesIO()
+                resized.save(buffer, format=fmt.upper(), **FORMAT_OPTIONS[fmt])
+                data = buffer.getvalue()
+
+                content_hash = hashlib.sha256(data).hexdigest()[:12]
+                name = f"{source.stem}-{width}w.{content_hash}.{fmt}"
+                target = DERIVED_DIR / name
+                if not target.exists():
+                    target.write_bytes(data)
+
+                variants.append({
+                    'path': name,
+                    'format': fmt,
+                    'width': width,
+                    'height': height,
+                    'bytes': len(data),
+                })
+    return variants
+
+
+def build_assets(widths: tuple = DEFAULT_WIDTHS, force: bool = False) -> dict:
+    """
+    Generate derivatives for every source image and write the manifest.
+
+    Identical files (same SHA-256) are rendered once and every path that holds
+    them points at the same variants. Unchanged sources reuse the previous
+    manifest entry unless `force` is set; unreferenced derived files are removed.
+
+    Returns:
+        dict: The manifest
+    """
+    DERIVED_DIR.mkdir(parents=True, exist_ok=True)
+    previous = AssetManifest.load().images if not force else {}
+    formats = available_formats()
+
+    by_hash = {}
+    for rel_path in discover_sources():
+        by_hash.setdefault(file_sha256(BASE_DIR / rel_path), []).append(rel_path)
+
+    images = {}
+    for digest, rel_paths in by_hash.items():
+        entry = next((previous[p] for p in rel_paths
+                      if p in previous and previous[p]['sha256'] == digest
+                      and set(previous[p]['formats']) == set(formats)
+                      and all((DERIVED_DIR / v['path']).exists() for v in previous[p]['variants'])), None)
+        if entry is None:
+            source = BASE_DIR / rel_paths[0]
+            entry = {
+                'sha256': digest,
+                'bytes': source.stat().st_size,
+                'formats': formats,
+                'variants': render_variants(source, widths, formats),
+            }
+        for rel_path in rel_paths:
+            images[rel_path] = dict(entry, duplicates=[p for p in rel_paths if p != rel_path])
+
+    manifest = {'version': MANIFEST_VERSION, 'images': images}
+    tmp_path = MANIFEST_PATH.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    os.replace(tmp_path, MANIFEST_PATH)
+
+    referenced = {v['path'] for entry in images.values() for v in entry['variants']}
+    for path in DERIVED_DIR.iterdir():
+        if path.name not in referenced and path != MANIFEST_PATH:
+            path.unlink()
+
+    return manifest
+
+
+class AssetManifest:
+    """
+    Lookup of generated image variants by URL path.
+
+    Args:
+        images: Manifest "images" mapping of relative path -> entry
+    """
+
+    def __init__(self, images: dict = None):
+        self.images = images or {}
+
+    @classmethod
+    def load(cls, path: Path = MANIFEST_PATH):
+        """Load the manifest, or an empty one if the pipeline has not run."""
+        try:
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        if manifest.get('version') != MANIFEST_VERSION:
+            return cls()
+        return cls(manifest.get('images', {}))
+
+    def pick(self, rel_path: str, accept: str, width: int = None):
+        """
+        Choose the best variant for a request.
+
+        AVIF and WebP are served only when the Accept header names them with
+        q > 0 (browsers send image/* and */* whether or not they decode
+        them); the higher q wins, then AVIF over WebP. Without either, the
+        resized PNG is used only when `width` was requested, and otherwise the
+        caller serves the source file. The smallest variant at least `width`
+        pixels wide is picked (AURA_IMAGE_DEFAULT_WIDTH when not given).
+
+        Returns:
+            tuple: (filename in DERIVED_DIR, mimetype), or None to serve the
+            source file (no variants, or none suit the request)
+        """
+        entry = self.images.get(rel_path)
+        if entry is None:
+            return None
+
+        ranges = parse_accept(accept)
+        formats = [fmt for fmt in FORMAT_OPTIONS
+                   if fmt != 'png' and accept_quality(ranges, MIMETYPES[fmt], wildcards=False) > 0]
+        formats.sort(key=lambda fmt: -ranges[MIMETYPES[fmt]])
+        if width and width > 0 and (not ranges or accept_quality(ranges, MIMETYPES['png']) > 0):
+            formats.append('png')
+
+        target = width if width and width > 0 else AURA_IMAGE_DEFAULT_WIDTH
+        for fmt in formats:
+            candidates = [v for v in entry['variants'] if v['format'] == fmt]
+            if not candidates:
+                continue
+            wide_enough = [v for v in candidates if v['width'] >= target]
+            variant = (min(wide_enough, key=lambda v: v['width']) if wide_enough
+                       else max(candidates, key=lambda v: v['width']))
+            return variant['path'], MIMETYPES[fmt]
+        return None
+
+    def __len__(self) -> int:
+        return len(self.images)
+
+
+def print_summary(manifest: dict) -> None:
+    """Print original vs derived sizes for the default width."""
+    images = manifest['images']
+    unique = {entry['sha256']: entry for entry in images.values()}
+
+    print("\n" + "=" * 60)
+    print("EA Aura Image Asset Pipeline - Summary")
+    print("=" * 60)
+    print(f"Source images: {len(images)} ({len(unique)} unique, {len(images) - len(unique)} duplicates)")
+    for rel_path, entry in sorted(images.items()):
+        best = AssetManifest(images).pick(rel_path, 'image/avif,image/webp')
+        size = next(v['bytes'] for v in entry['variants'] if v['path'] == best[0])
+        print(f"  {rel_path:<28} {entry['bytes'] / 1024:>8,.0f} KB -> {size / 1024:>6,.0f} KB ({best[0]})")
+    print("=" * 60)
+
+
+def main():
+    """Build image derivatives and the manifest."""
+    parser = argparse.ArgumentParser(description="Generate resized WebP/AVIF image variants")
+    parser.add_argument('--widths', type=int, nargs='+', default=list(DEFAULT_WIDTHS))
+    parser.add_argument('--force', action='store_true', help="Re-encode every image")
+    args = parser.parse_args()
+
+    print("Generating EA Aura image variants...")
+    manifest = build_assets(tuple(args.widths), force=args.force)
+    print_summary(manifest)
+
+
+if __name__ == "__main__":
+    main()
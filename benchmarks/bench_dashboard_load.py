@@ -0,0 +1,114 @@
+"""
+EA Aura Dashboard Load Benchmark
+Compares parsing the Excel workbook against the columnar cache (Feather and
+Parquet, full and selective-column loads) at increasing row counts.
+
+Usage:
+    python benchmarks/bench_dashboard_load.py [--rows 10000 1000000 10000000] [--repeat 3]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dashboard_cache import feather, read_columnar, read_source
+
+# Excel sheets stop at 1,048,576 rows, and openpyxl takes minutes well before that
+EXCEL_ROW_LIMIT = 1_048_575
+
+# Columns the KPI cards read; used for the selective loads
+KPI_COLUMNS = ['Date', 'Daily Active Users', 'Satisfied Responses', 'Total Feedback Responses']
+
+
+def synthetic_frame(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Dashboard-shaped frame with `rows` rows of random data."""
+    rng = np.random.default_rng(seed)
+    index = np.arange(rows)
+    total_feedback = rng.integers(800, 1201, rows)
+    new_users = rng.integers(150, 301, rows)
+    return pd.DataFrame({
+        'Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(index // 1000, unit='D'),
+        'Daily Active Users': 3000 + index % 1000 * 150 + rng.integers(-100, 101, rows),
+        'Monthly Active Users': 28000 + rng.integers(-100, 101, rows),
+        'Total Users': 50000 + rng.integers(-200, 201, rows),
+        'Users Adopting Voice Features': 8000 + rng.integers(-100, 101, rows),
+        'Total Feedback Responses': total_feedback,
+        'Satisfied Responses': np.minimum(rng.integers(700, 1101, rows), total_feedback),
+        'User ID': pd.Series(index + 1000).map('USER_{}'.format),
+        'Interaction Count': rng.integers(150, 501, rows),
+        'Duration (minutes)': rng.integers(20, 121, rows),
+        'New Users (Day 0)': new_users,
+        'Retained Users (Day 30)': np.minimum(rng.integers(120, 251, rows), new_users),
+        'Average Rating': rng.uniform(4.2, 4.9, rows).round(2),
+        'Feature Name': pd.Categorical.from_codes(index % 4, ['Nova', 'Kai', 'Veda', 'Iris']).astype(str),
+    })
+
+
+def best_time(fn, repeat: int) -> float:
+    """Best-of-`repeat` wall time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    """Run the benchmark and print load times per row count."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--excel-max-rows", type=int, default=100_000,
+                        help="Largest row count also written to and parsed from .xlsx")
+    args = parser.parse_args()
+
+    if feather is None:
+        sys.exit("pyarrow is required: pip install pyarrow")
+
+    print("=" * 60)
+    print("EA Aura Dashboard Load Benchmark")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for rows in args.rows:
+            df = synthetic_frame(rows)
+            paths = {'feather': tmp / 'data.feather', 'parquet': tmp / 'data.parquet', 'csv': tmp / 'data.csv'}
+            feather.write_feather(df, paths['feather'], compression='uncompressed')
+            df.to_parquet(paths['parquet'], index=False)
+            df.to_csv(paths['csv'], index=False)
+
+            cases = [("CSV parse", lambda: read_source(paths['csv']))]
+            if rows <= min(args.excel_max_rows, EXCEL_ROW_LIMIT):
+                paths['xlsx'] = tmp / 'data.xlsx'
+                df.to_excel(paths['xlsx'], index=False)
+                cases.insert(0, ("Excel parse (openpyxl)", lambda: read_source(paths['xlsx'])))
+            for fmt in ('feather', 'parquet'):
+                cases.append((f"{fmt.title()} (mmap, all columns)",
+                              lambda fmt=fmt: read_columnar(paths[fmt], None, fmt)))
+                cases.append((f"{fmt.title()} (mmap, {len(KPI_COLUMNS)} columns)",
+                              lambda fmt=fmt: read_columnar(paths[fmt], KPI_COLUMNS, fmt)))
+
+            assert read_columnar(paths['feather'], None, 'feather').equals(df)
+
+            print(f"\n{rows:,} rows:")
+            for label, fn in cases:
+                elapsed = best_time(fn, 1 if label.startswith(("Excel", "CSV")) else args.repeat)
+                print(f"  {label:<32} {elapsed * 1000:>10,.1f} ms")
+            for fmt, path in paths.items():
+                print(f"  {fmt:<8} on disk {path.stat().st_size / 1e6:>10,.1f} MB")
+            for path in paths.values():
+                path.unlink()
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
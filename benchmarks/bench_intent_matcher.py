@@ -0,0 +1,106 @@
+"""
+EA Aura Fallback Intent Matcher Benchmark
+Compares the precompiled IntentMatcher against the original any()-substring chain.
+
+Usage:
+    python benchmarks/bench_intent_matcher.py [--messages 20000] [--repeat 5]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from intent_matcher import DEFAULT_FALLBACK_RESPONSE, FALLBACK_INTENTS, IntentMatcher
+
+SAMPLE_MESSAGES = [
+    "I'm so stressed about the milestone review tomorrow",
+    "I've been exhausted all week and can't sleep well",
+    "How can I stay focused when Slack keeps pinging me?",
+    "I want to hit 10k steps every day this month",
+    "Help me set a goal for this quarter",
+    "What should I eat during a long crunch session?",
+    "Hello! What can you do?",
+    "I feel anxious and distracted before playtests, any tips for the workout too?",
+]
+
+
+def legacy_fallback(user_input: str, intents: list = FALLBACK_INTENTS) -> str:
+    """The original chain of any(word in lower_input) scans, kept as the baseline."""
+    lower_input = user_input.lower()
+    for intent in intents:
+        if any(word in lower_input for word in intent["keywords"]):
+            return intent["response"]
+    return DEFAULT_FALLBACK_RESPONSE
+
+
+def synthetic_intents(count: int, seed: int = 7) -> list:
+    """Data-file sized intent tables: `count` extra intents with made-up keywords."""
+    rng = random.Random(seed)
+    letters = "bcdfghjklmnpqrstvwxz"
+    return [
+        {
+            "name": f"extra_{i}",
+            "keywords": ["".join(rng.choice(letters) for _ in range(rng.randint(5, 9))) for _ in range(4)],
+            "response": f"Extra intent {i}"
+        }
+        for i in range(count)
+    ]
+
+
+def build_corpus(count: int, seed: int = 42) -> list:
+    """Sample messages with random filler so inputs are not all identical."""
+    rng = random.Random(seed)
+    filler = ["today", "at work", "lately", "during crunch", "after standup", "please", "thanks"]
+    return [f"{rng.choice(SAMPLE_MESSAGES)} {rng.choice(filler)}" for _ in range(count)]
+
+
+def time_function(fn, corpus: list, repeat: int) -> float:
+    """Best-of-`repeat` wall time in seconds for one pass over the corpus."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for message in corpus:
+            fn(message)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    """Run the benchmark and print per-message throughput."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--extra-intents", type=int, nargs="*", default=[0, 50, 500],
+                        help="Sizes of synthetic intent tables appended to the built-ins")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.messages)
+    matcher = IntentMatcher(FALLBACK_INTENTS)
+
+    mismatches = [m for m in SAMPLE_MESSAGES if matcher.respond(m) != legacy_fallback(m)]
+
+    print("=" * 60)
+    print("EA Aura Fallback Intent Matcher Benchmark")
+    print("=" * 60)
+    print(f"Messages per pass: {len(corpus):,} (best of {args.repeat})")
+
+    for extra in args.extra_intents:
+        intents = FALLBACK_INTENTS + synthetic_intents(extra)
+        matcher = IntentMatcher(intents)
+        print(f"\n{len(intents)} intents:")
+        for label, fn in (("Legacy any() chain", lambda m: legacy_fallback(m, intents)),
+                          ("IntentMatcher", matcher.respond)):
+            elapsed = time_function(fn, corpus, args.repeat)
+            print(f"  {label:<20} {len(corpus) / elapsed:>12,.0f} msg/s  {elapsed / len(corpus) * 1e6:>8.2f} µs/msg")
+
+    print(f"\nSample messages answered differently: {len(mismatches)}")
+    for message in mismatches:
+        print(f"  - {message}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
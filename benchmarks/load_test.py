@@ -0,0 +1,322 @@
+"""
+EA Aura Load Test
+Starts the mock Azure OpenAI server and the Flask app pointed at it, drives
+/api/chat, /api/chat/stream, the tips endpoint and static routes at each
+concurrency level, and reports throughput and p50/p95/p99 latency. Results
+are saved as JSON and compared against the previous run.
+
+Usage:
+    python benchmarks/load_test.py [--concurrency 1 8 32] [--requests 200]
+                                   [--scenarios chat chat_stream tips static]
+                                   [--mock-latency-ms 400] [--mock-error-rate 0.02]
+                                   [--target http://127.0.0.1:5000] [--baseline previous]
+"""
+import argparse
+import itertools
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_azure_openai import add_mock_arguments, settings_from_args, start_mock_server
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+CHAT_MESSAGES = [
+    "I'm so stressed about the milestone review tomorrow",
+    "I've been exhausted all week and can't sleep well",
+    "How can I stay focused when Slack keeps pinging me?",
+    "I want to hit 10k steps every day this month",
+    "What should I eat during a long crunch session?",
+    "How do I start an emergency fund?",
+]
+CHARACTERS = ["nova", "kai", "veda", "iris"]
+TIP_CATEGORIES = ["physical", "mental", "productivity", "social", "purpose", "general"]
+STATIC_PATHS = ["/", "/Aura/aura_wellness_hub.html", "/Aura_Logo.png", "/Jar.png"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(endpoint: str, port: int, env_overrides: dict):
+    """
+    Run app.py's Flask app (threaded) in a subprocess pointed at the mock.
+
+    Returns:
+        subprocess.Popen: The server process
+    """
+    env = dict(os.environ, AZURE_OPENAI_ENDPOINT=endpoint, AZURE_OPENAI_API_KEY="mock", **env_overrides)
+    code = ("from app import app; "
+            f"app.run(host='127.0.0.1', port={port}, threaded=True, debug=False, use_reloader=False)")
+    return subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_healthy(base_url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not become healthy within {timeout:.0f}s")
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile of an ascending list (q in 0..100)."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def scrape_reply_sources(client: httpx.Client, base_url: str) -> dict:
+    """
+    aura_chat_replies_total by source from /api/metrics, plus the admission
+    rejections as "admission_rejected" (empty if unavailable).
+    """
+    try:
+        text = client.get(f"{base_url}/api/metrics", timeout=5).text
+    except httpx.HTTPError:
+        return {}
+    counters = {source: float(value) for source, value in
+                re.findall(r'^aura_chat_replies_total\{(?:[^}]*,)?source="([^"]+)"[^}]*\} (\S+)$',
+                           text, re.MULTILINE)}
+    rejected = re.search(r'^aura_admission_rejected_total(?:\{[^}]*\})? (\S+)$', text, re.MULTILINE)
+    if rejected:
+        counters["admission_rejected"] = float(rejected.group(1))
+    return counters
+
+
+def make_request(scenario: str, index: int, unique: bool):
+    """(method, path, json body) for request number `index` of a scenario."""
+    if scenario in ("chat", "chat_stream"):
+        message = CHAT_MESSAGES[index % len(CHAT_MESSAGES)]
+        if unique:
+            # A nonce keeps the response cache from answering, so the upstream path is measured
+            message = f"{message} (#{index})"
+        path = "/api/chat" if scenario == "chat" else "/api/chat/stream"
+        return "POST", path, {"message": message, "character": CHARACTERS[index % len(CHARACTERS)],
+                              "session_id": f"load-{index % 64}"}
+    if scenario == "tips":
+        return "GET", f"/api/wellness/tips?category={TIP_CATEGORIES[index % len(TIP_CATEGORIES)]}", None
+    return "GET", STATIC_PATHS[index % len(STATIC_PATHS)], None
+
+
+def run_one(client: httpx.Client, base_url: str, scenario: str, index: int, unique: bool) -> dict:
+    """Send one request; returns latency, time to first byte and success."""
+    method, path, body = make_request(scenario, index, unique)
+    headers = {"Accept": "image/avif,image/webp,*/*", "Accept-Encoding": "gzip, br"} if scenario == "static" else {}
+    started = time.perf_counter()
+    first_byte = None
+    ok = False
+    try:
+        with client.stream(method, base_url + path, json=body, headers=headers) as response:
+            for _ in response.iter_raw():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+            ok = response.status_code < 400
+    except httpx.HTTPError:
+        pass
+    latency = time.perf_counter() - started
+    return {"latency": latency, "ttfb": first_byte if first_byte is not None else latency, "ok": ok}
+
+
+def run_scenario(base_url: str, scenario: str, concurrency: int, total: int, unique: bool, offset: int) -> dict:
+    """Issue `total` requests from `concurrency` worker threads and summarize them."""
+    counter = itertools.count(offset)
+    lock = threading.Lock()
+    samples = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    with httpx.Client(limits=limits, timeout=60) as client:
+        sources_before = scrape_reply_sources(client, base_url)
+
+        def worker():
+            while True:
+                with lock:
+                    index = next(counter)
+                if index >= offset + total:
+                    return
+                result = run_one(client, base_url, scenario, index, unique)
+                with lock:
+                    samples.append(result)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(worker)
+        elapsed = time.perf_counter() - started
+        sources_after = scrape_reply_sources(client, base_url)
+
+    latencies = sorted(s["latency"] for s in samples)
+    ttfbs = sorted(s["ttfb"] for s in samples)
+    result = {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if not s["ok"]),
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "ttfb_p50_ms": round(percentile(ttfbs, 50) * 1000, 2),
+        "ttfb_p95_ms": round(percentile(ttfbs, 95) * 1000, 2),
+    }
+    if scenario in ("chat", "chat_stream") and sources_after:
+        # Admission rejections are answered by the fallback, so they show up there too
+        result["admission_rejected"] = int(sources_after.pop("admission_rejected", 0)
+                                           - sources_before.pop("admission_rejected", 0))
+        result["reply_sources"] = {source: int(sources_after.get(source, 0) - sources_before.get(source, 0))
+                                   for source in sources_after}
+    return result
+
+
+def latest_result(exclude: Path = None) -> Path:
+    runs = sorted(p for p in RESULTS_DIR.glob("load-*.json") if p != exclude)
+    return runs[-1] if runs else None
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(current: dict, baseline: dict, threshold_pct: float) -> list:
+    """
+    Print per-case deltas against a baseline run.
+
+    Returns:
+        list: Cases whose p95 got worse by more than `threshold_pct` percent
+    """
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\nCompared with {baseline['started_at']} ({baseline.get('git_revision') or 'unknown revision'}):")
+    for result in current["results"]:
+        key = (result["scenario"], result["concurrency"])
+        before = previous.get(key)
+        if before is None:
+            continue
+        deltas = []
+        for field in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            if before.get(field):
+                deltas.append(f"{field} {(result[field] - before[field]) / before[field] * 100:+.1f}%")
+        print(f"  {key[0]:<12} c={key[1]:<4} " + "  ".join(deltas))
+        if before.get("p95_ms") and (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 > threshold_pct:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    """Run every scenario at every concurrency level and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", default=["chat", "chat_stream", "tips", "static"],
+                        choices=["chat", "chat_stream", "tips", "static"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and concurrency level")
+    parser.add_argument("--repeat-messages", action="store_true",
+                        help="Reuse chat messages so the response cache can answer")
+    parser.add_argument("--target", help="Base URL of an already running server (skips starting the app)")
+    parser.add_argument("--env", nargs="*", default=[], metavar="NAME=VALUE",
+                        help="Extra environment for the started app, e.g. AURA_CACHE_ENABLED=0")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/load-<time>.json)")
+    parser.add_argument("--baseline", default="previous",
+                        help="Results file to compare with, 'previous' for the latest run, or 'none'")
+    parser.add_argument("--fail-on-regression", type=float, metavar="PCT",
+                        help="Exit non-zero if any p95 is more than PCT percent worse than the baseline")
+    add_mock_arguments(parser, prefix="mock-")
+    args = parser.parse_args()
+
+    mock_settings = settings_from_args(args, prefix="mock-")
+    mock_server = app_process = None
+    if args.target:
+        base_url = args.target.rstrip("/")
+    else:
+        mock_server, endpoint = start_mock_server(mock_settings)
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        env = dict(item.split("=", 1) for item in args.env)
+        env.setdefault("AURA_TELEMETRY_DIR", str(RESULTS_DIR / "telemetry"))
+        app_process = start_app(endpoint, port, env)
+
+    print("=" * 60)
+    print("EA Aura Load Test")
+    print("=" * 60)
+    run = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "target": args.target or "app.py (Flask, threaded)",
+        "mock": None if args.target else mock_settings.config(),
+        "requests_per_case": args.requests,
+        "results": [],
+    }
+
+    try:
+        wait_until_healthy(base_url)
+        offset = 0
+        for scenario in args.scenarios:
+            for concurrency in args.concurrency:
+                result = run_scenario(base_url, scenario, concurrency, args.requests,
+                                      not args.repeat_messages, offset)
+                offset += args.requests
+                run["results"].append(result)
+                sources = result.get("reply_sources")
+                rejected = result.get("admission_rejected")
+                print(f"  {scenario:<12} c={concurrency:<4} {result['throughput_rps']:>8.1f} req/s  "
+                      f"p50 {result['p50_ms']:>8.1f}  p95 {result['p95_ms']:>8.1f}  p99 {result['p99_ms']:>8.1f} ms  "
+                      f"errors {result['errors']}" + (f"  sources {sources}" if sources else "")
+                      + (f"  rate-limited {rejected}" if rejected else ""))
+    finally:
+        if app_process is not None:
+            app_process.terminate()
+            app_process.wait(timeout=10)
+        if mock_server is not None:
+            mock_server.shutdown()
+            print(f"\nMock upstream: {mock_settings.requests} requests, {mock_settings.errors} errors, "
+                  f"{mock_settings.throttled} throttled")
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = args.output or RESULTS_DIR / f"load-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    baseline_path = None
+    if args.baseline == "previous":
+        baseline_path = latest_result(exclude=output)
+    elif args.baseline != "none":
+        baseline_path = Path(args.baseline)
+    output.write_text(json.dumps(run, indent=2), encoding="utf-8")
+    print(f"\nResults saved to {output}")
+
+    regressions = []
+    if baseline_path is not None and baseline_path.exists():
+        regressions = compare(run, json.loads(baseline_path.read_text(encoding="utf-8")),
+                              args.fail_on_regression if args.fail_on_regression is not None else float("inf"))
+    print("=" * 60)
+    if regressions:
+        sys.exit(f"p95 regressed by more than {args.fail_on_regression}% for: "
+                 + ", ".join(f"{s} c={c}" for s, c in regressions))
+
+
+if __name__ == "__main__":
+    main()
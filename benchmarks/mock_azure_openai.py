@@ -0,0 +1,284 @@
+"""
+Mock Azure OpenAI Chat Completions Server
+A local stand-in for the Azure deployment with configurable latency,
+streaming speed and error injection, for offline load tests.
+
+Usage:
+    python benchmarks/mock_azure_openai.py [--port 8011] [--latency-ms 400] [--error-rate 0.02]
+
+Then point the app at it:
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8011/ AZURE_OPENAI_API_KEY=mock python app.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY_SENTENCES = [
+    "That sounds like a lot to carry this week, and it makes sense you feel stretched.",
+    "Try a two-minute box breathing break: in for four, hold for four, out for four, hold for four.",
+    "A short walk after lunch is one of the easiest ways to lift energy for the afternoon.",
+    "Pick one priority for the next hour and park the rest in a list you can come back to.",
+    "Protecting seven hours of sleep will do more for your focus than another late push.",
+    "Drink a glass of water now and set a reminder to stand and stretch every hour.",
+    "Small, consistent habits add up, so celebrate the streak you already have going.",
+    "If the stress keeps building, the EAP counselling line is free and confidential.",
+]
+
+
+class MockSettings:
+    """
+    Behaviour of the mock upstream, shared by all handler threads.
+
+    Args:
+        latency_ms: Mean time before the response (or first stream chunk)
+        jitter_ms: Uniform +/- jitter on the latency
+        token_ms: Delay between streamed chunks
+        reply_words: Approximate words per reply
+        error_rate: Share of requests answered with HTTP 500
+        throttle_rate: Share of requests answered with HTTP 429 and Retry-After
+        seed: Random seed for reply text, latency and injected errors
+        cache_min_tokens: Shortest repeated prompt prefix reported as cached
+    """
+
+    # Prompt prefixes remembered for cached-token reporting
+    MAX_PREFIXES = 100_000
+
+    def __init__(self, latency_ms: float = 400, jitter_ms: float = 100, token_ms: float = 15,
+                 reply_words: int = 60, error_rate: float = 0.0, throttle_rate: float = 0.0, seed: int = 42,
+                 cache_min_tokens: int = 1024):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.token_ms = token_ms
+        self.reply_words = reply_words
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.cache_min_tokens = cache_min_tokens
+        self._rng = random.Random(seed)
+        self._prefixes = set()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+
+    def config(self) -> dict:
+        """The configured behaviour, for recording alongside results."""
+        return {name: getattr(self, name) for name in
+                ("latency_ms", "jitter_ms", "token_ms", "reply_words", "error_rate", "throttle_rate",
+                 "cache_min_tokens")}
+
+    def draw(self):
+        """Latency in seconds, injected status (None for success) and reply text for one request."""
+        with self._lock:
+            self.requests += 1
+            latency = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            roll = self._rng.random()
+            status = None
+            if roll < self.error_rate:
+                status = 500
+                self.errors += 1
+            elif roll < self.error_rate + self.throttle_rate:
+                status = 429
+                self.throttled += 1
+            words = []
+            while len(words) < self.reply_words:
+                words.extend(self._rng.choice(REPLY_SENTENCES).split())
+        return latency, status, " ".join(words[:self.reply_words])
+
+    def cached_tokens(self, messages: list) -> int:
+        """
+        Prompt tokens a prefix cache would serve, like Azure prompt caching:
+        the longest run of leading messages sent before, counted in 128-token
+        steps once it reaches cache_min_tokens.
+        """
+        digest = hashlib.sha1()
+        total = cached = 0
+        with self._lock:
+            if len(self._prefixes) > self.MAX_PREFIXES:
+                self._prefixes.clear()
+            for message in messages:
+                digest.update(json.dumps(message, sort_keys=True).encode("utf-8"))
+                total += _estimate_tokens(str(message.get("content", "")))
+                key = digest.hexdigest()
+                if key in self._prefixes:
+                    cached = total
+                else:
+                    self._prefixes.add(key)
+        if cached < self.cache_min_tokens:
+            return 0
+        return cached - cached % 128
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Answers POST .../chat/completions like Azure OpenAI; everything else is 404."""
+
+    protocol_version = "HTTP/1.1"
+    settings = MockSettings()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if not self.path.split("?", 1)[0].endswith("/chat/completions"):
+            self._send_json(404, {"error": {"code": "404", "message": "Resource not found"}})
+            return
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"code": "400", "message": "Invalid JSON"}})
+            return
+
+        latency, status, reply = self.settings.draw()
+        time.sleep(latency)
+        if status == 429:
+            self._send_json(429, {"error": {"code": "429", "message": "Rate limit is exceeded (mock)"}},
+                            {"Retry-After": "1"})
+            return
+        if status == 500:
+            self._send_json(500, {"error": {"code": "500", "message": "Injected upstream failure (mock)"}})
+            return
+
+        messages = payload.get("messages", [])
+        prompt_tokens = sum(_estimate_tokens(str(m.get("content", ""))) for m in messages)
+        cached_tokens = self.settings.cached_tokens(messages)
+        model = payload.get("model", "gpt-4o")
+        completion_tokens = _estimate_tokens(reply)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens,
+                 "prompt_tokens_details": {"cached_tokens": cached_tokens}}
+        if payload.get("stream"):
+            include_usage = (payload.get("stream_options") or {}).get("include_usage")
+            self._stream(model, reply, usage if include_usage else None)
+        else:
+            self._send_json(200, {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": reply}}],
+                "usage": usage,
+            })
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, model: str, reply: str, usage: dict = None) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(choices, **extra):
+            event = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": choices, **extra}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n")
+
+        # Azure opens with a content-filter chunk that has no choices
+        chunk([])
+        words = reply.split(" ")
+        for i, word in enumerate(words):
+            chunk([{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}])
+            if self.settings.token_ms:
+                time.sleep(self.settings.token_ms / 1000)
+        chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if usage is not None:
+            # stream_options.include_usage adds a last chunk with usage and no choices
+            chunk([], usage=usage)
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class MockServer(ThreadingHTTPServer):
+    """Threaded server that ignores clients closing pooled connections."""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+def start_mock_server(settings: MockSettings, host: str = "127.0.0.1", port: int = 0):
+    """
+    Serve the mock in a background thread.
+
+    Returns:
+        tuple: (server, endpoint URL); call server.shutdown() to stop it
+    """
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"settings": settings})
+    server = MockServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="mock-azure-openai", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/"
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser, prefix: str = "") -> None:
+    """Add the MockSettings options to an argument parser."""
+    parser.add_argument(f"--{prefix}latency-ms", type=float, default=400)
+    parser.add_argument(f"--{prefix}jitter-ms", type=float, default=100)
+    parser.add_argument(f"--{prefix}token-ms", type=float, default=15, help="Delay between streamed chunks")
+    parser.add_argument(f"--{prefix}reply-words", type=int, default=60)
+    parser.add_argument(f"--{prefix}error-rate", type=float, default=0.0, help="Share of HTTP 500 replies")
+    parser.add_argument(f"--{prefix}throttle-rate", type=float, default=0.0, help="Share of HTTP 429 replies")
+    parser.add_argument(f"--{prefix}cache-min-tokens", type=int, default=1024,
+                        help="Shortest repeated prompt prefix reported as cached tokens")
+
+
+def settings_from_args(args, prefix: str = "") -> MockSettings:
+    """Build MockSettings from options added by add_mock_arguments()."""
+    prefix = prefix.replace("-", "_")
+    return MockSettings(
+        latency_ms=getattr(args, f"{prefix}latency_ms"),
+        jitter_ms=getattr(args, f"{prefix}jitter_ms"),
+        token_ms=getattr(args, f"{prefix}token_ms"),
+        reply_words=getattr(args, f"{prefix}reply_words"),
+        error_rate=getattr(args, f"{prefix}error_rate"),
+        throttle_rate=getattr(args, f"{prefix}throttle_rate"),
+        cache_min_tokens=getattr(args, f"{prefix}cache_min_tokens"),
+    )
+
+
+def main():
+    """Run the mock server in the foreground."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8011)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    settings = settings_from_args(args)
+    server, endpoint = start_mock_server(settings, args.host, args.port)
+    print(f"Mock Azure OpenAI listening on {endpoint} (latency {args.latency_ms:.0f}ms, "
+          f"errors {args.error_rate:.0%}, throttled {args.throttle_rate:.0%})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n{settings.requests} requests, {settings.errors} errors, {settings.throttled} throttled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Circuit Breaker for EA Aura Wellness Assistant
+Trips on upstream error rate or tail latency so requests go straight to the
+fallback while Azure OpenAI is struggling, then probes for recovery.
+"""
+import math
+import threading
+import time
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when the breaker rejects an upstream call."""
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of `values` (0.0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # pct * n before dividing keeps exact ranks exact (0.07 * 100 is 7.000000000000001)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[rank]
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker over a sliding window of recent calls.
+
+    The breaker opens when, over at least `min_requests` calls in the window,
+    the error rate reaches `error_rate_threshold` or the p95 latency reaches
+    `latency_threshold` seconds. After `open_seconds` it lets up to
+    `half_open_probes` calls through; that many consecutive successes close it,
+    and any failure re-opens it.
+
+    Every transition starts a new generation. allow_request() hands out a
+    ticket naming the generation the call started in, and results carrying a
+    ticket from an earlier generation are ignored: a slow call admitted while
+    closed cannot count as a half-open probe, or re-open a breaker that has
+    since recovered.
+
+    Args:
+        window_size: Number of recent calls considered
+        min_requests: Calls required in the window before the breaker can trip
+        error_rate_threshold: Failure fraction that opens the breaker
+        latency_threshold: p95 latency in seconds that opens the breaker
+        open_seconds: Cooldown before half-open probes are allowed
+        half_open_probes: Concurrent probes allowed (and successes needed to close)
+    """
+
+    def __init__(self, window_size: int = 50, min_requests: int = 10,
+                 error_rate_threshold: float = 0.5, latency_threshold: float = 8.0,
+                 open_seconds: float = 30.0, half_open_probes: int = 2):
+        self.window_size = window_size
+        self.min_requests = min_requests
+        self.error_rate_threshold = error_rate_threshold
+        self.latency_threshold = latency_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._lock = threading.Lock()
+        self._calls = deque(maxlen=window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._generation = 0
+        self._transitions = deque(maxlen=20)
+        self.rejected = 0
+        self.stale_results = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def allow_request(self):
+        """
+        Return a ticket if a call may go upstream now, else None.
+
+        A ticket must be passed to exactly one of record_success(),
+        record_failure() or release().
+        """
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            if self._state == CLOSED:
+                return self._generation
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return self._generation
+            self.rejected += 1
+            return None
+
+    def _is_stale(self, ticket: int) -> bool:
+        """True (and counted) if the call started before the latest transition."""
+        if ticket == self._generation:
+            return False
+        self.stale_results += 1
+        return True
+
+    def record_success(self, ticket: int, latency: float) -> None:
+        """Record a completed upstream call."""
+        with self._lock:
+            if self._is_stale(ticket):
+                return
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if latency >= self.latency_threshold:
+                    self._transition(OPEN, f"slow probe ({latency:.2f}s)")
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(CLOSED, f"{self._probe_successes} probes succeeded")
+                return
+            self._calls.append((True, latency))
+            self._evaluate()
+
+    def record_failure(self, ticket: int, latency: float) -> None:
+        """Record a failed or timed-out upstream call."""
+        with self._lock:
+            if self._is_stale(ticket):
+                return
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._transition(OPEN, "probe failed")
+                return
+            self._calls.append((False, latency))
+            self._evaluate()
+
+    def release(self, ticket: int) -> None:
+        """Return an allowed call that never reached upstream (e.g. cancelled)."""
+        with self._lock:
+            if ticket == self._generation and self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def snapshot(self) -> dict:
+        """Current state, window statistics and recent transitions."""
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            latencies = [latency for _, latency in self._calls]
+            failures = sum(1 for ok, _ in self._calls if not ok)
+            return {
+                'state': self._state,
+                'window_requests': len(self._calls),
+                'error_rate': round(failures / len(self._calls), 3) if self._calls else 0.0,
+                'latency_p50': round(percentile(latencies, 50), 3),
+                'latency_p95': round(percentile(latencies, 95), 3),
+                'latency_p99': round(percentile(latencies, 99), 3),
+                'rejected': self.rejected,
+                'stale_results': self.stale_results,
+                'open_for_seconds': round(time.monotonic() - self._opened_at, 1) if self._state != CLOSED else 0.0,
+                'transitions': list(self._transitions),
+            }
+
+    def _evaluate(self) -> None:
+        """Open the breaker if the closed-state window breaches a threshold."""
+        if self._state != CLOSED or len(self._calls) < self.min_requests:
+            return
+        failures = sum(1 for ok, _ in self._calls if not ok)
+        error_rate = failures / len(self._calls)
+        if error_rate >= self.error_rate_threshold:
+            self._transition(OPEN, f"error rate {error_rate:.0%}")
+            return
+        p95 = percentile([latency for _, latency in self._calls], 95)
+        if p95 >= self.latency_threshold:
+            self._transition(OPEN, f"p95 latency {p95:.2f}s")
+
+    def _maybe_half_open(self, now: float) -> None:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN, "cooldown elapsed")
+
+    def _transition(self, state: str, reason: str) -> None:
+        self._transitions.append({
+            'from': self._state,
+            'to': state,
+            'reason': reason,
+            'at': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        })
+        self._state = state
+        self._generation += 1
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state in (OPEN, CLOSED):
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        if state == CLOSED:
+            self._calls.clear()
+        elif state == HALF_OPEN:
+            self._probe_successes = 0
@@ -1,8 +1,30 @@
 """
 Azure OpenAI Configuration Module for EA Aura Wellness Assistant
 """
+import argparse
+import asyncio
+import json
 import os
-from openai import AzureOpenAI
+import random
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager, contextmanager
+
+import httpx
+from openai import APIStatusError, AsyncAzureOpenAI, AzureOpenAI
+
+from admission import BATCH, INTERACTIVE, AdmissionController
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+from intent_matcher import IntentMatcher
+from knowledge_index import load_knowledge_index
+from metrics import character_prompt_tokens, chat_replies, tokens, upstream_latency
+from prompt_budget import (AURA_PROMPT_TOKEN_BUDGET, AURA_SUMMARY_TOKEN_BUDGET, SummaryCache,
+                           count_message_tokens, select_history)
+from response_cache import ResponseCache
+from single_flight import SingleFlight
 
 # Load .env file if present (for local development)
 try:
@@ -21,7 +43,51 @@ AZURE_OPENAI_DEPLOYMENT = os.getenv(
     "AZURE_OPENAI_DEPLOYMENT",
     "gpt-4o"
 )
-AZURE_OPENAI_API_VERSION = "2024-02-15-preview"
+# Cached prompt tokens (usage.prompt_tokens_details) are only reported from 2024-10-01-preview on
+AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21")
+
+# Upstream connection pool settings (shared by every chat turn in the process)
+AZURE_OPENAI_CONNECT_TIMEOUT = float(os.getenv("AZURE_OPENAI_CONNECT_TIMEOUT", "5"))
+AZURE_OPENAI_READ_TIMEOUT = float(os.getenv("AZURE_OPENAI_READ_TIMEOUT", "30"))
+AZURE_OPENAI_MAX_CONNECTIONS = int(os.getenv("AZURE_OPENAI_MAX_CONNECTIONS", "20"))
+AZURE_OPENAI_MAX_KEEPALIVE = int(os.getenv("AZURE_OPENAI_MAX_KEEPALIVE", "10"))
+AZURE_OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("AZURE_OPENAI_KEEPALIVE_EXPIRY", "60"))
+AZURE_OPENAI_MAX_IN_FLIGHT = int(os.getenv("AZURE_OPENAI_MAX_IN_FLIGHT", "16"))
+# SDK-level retries would multiply time spent past the request deadline
+AZURE_OPENAI_MAX_RETRIES = int(os.getenv("AZURE_OPENAI_MAX_RETRIES", "0"))
+
+# Total upstream time allowed per chat turn before falling back
+AURA_REQUEST_DEADLINE_SECONDS = float(os.getenv("AURA_REQUEST_DEADLINE_SECONDS", "12"))
+
+# Batch turns (/api/chat/batch and `python config_openAI.py --batch`): items
+# in flight per batch, attempts per item, and the retry backoff base and cap
+AURA_BATCH_CONCURRENCY = int(os.getenv("AURA_BATCH_CONCURRENCY", "8"))
+AURA_BATCH_MAX_ITEMS = int(os.getenv("AURA_BATCH_MAX_ITEMS", "5000"))
+AURA_BATCH_MAX_ATTEMPTS = int(os.getenv("AURA_BATCH_MAX_ATTEMPTS", "4"))
+AURA_BATCH_BACKOFF_SECONDS = float(os.getenv("AURA_BATCH_BACKOFF_SECONDS", "0.5"))
+AURA_BATCH_BACKOFF_MAX_SECONDS = float(os.getenv("AURA_BATCH_BACKOFF_MAX_SECONDS", "20"))
+
+# Circuit breaker around the Azure call (see circuit_breaker.py)
+AURA_BREAKER_WINDOW = int(os.getenv("AURA_BREAKER_WINDOW", "50"))
+AURA_BREAKER_MIN_REQUESTS = int(os.getenv("AURA_BREAKER_MIN_REQUESTS", "10"))
+AURA_BREAKER_ERROR_RATE = float(os.getenv("AURA_BREAKER_ERROR_RATE", "0.5"))
+AURA_BREAKER_LATENCY_P95 = float(os.getenv("AURA_BREAKER_LATENCY_P95", "8"))
+AURA_BREAKER_OPEN_SECONDS = float(os.getenv("AURA_BREAKER_OPEN_SECONDS", "30"))
+AURA_BREAKER_PROBES = int(os.getenv("AURA_BREAKER_PROBES", "2"))
+
+# Response cache settings. By default only turns without history context are
+# cached; set AURA_CACHE_WITH_HISTORY=1 to also cache on the history window.
+AURA_CACHE_ENABLED = os.getenv("AURA_CACHE_ENABLED", "1") == "1"
+AURA_CACHE_MAX_ENTRIES = int(os.getenv("AURA_CACHE_MAX_ENTRIES", "512"))
+AURA_CACHE_TTL_SECONDS = float(os.getenv("AURA_CACHE_TTL_SECONDS", "3600"))
+AURA_CACHE_WITH_HISTORY = os.getenv("AURA_CACHE_WITH_HISTORY", "0") == "1"
+
+# Retrieval over AI_Coaching_Pillars_Guide.md (see knowledge_index.py)
+AURA_RAG_ENABLED = os.getenv("AURA_RAG_ENABLED", "1") == "1"
+AURA_RAG_TOP_K = int(os.getenv("AURA_RAG_TOP_K", "3"))
+AURA_RAG_TOKEN_BUDGET = int(os.getenv("AURA_RAG_TOKEN_BUDGET", "300"))
+AURA_RAG_MIN_SCORE = float(os.getenv("AURA_RAG_MIN_SCORE", "1.5"))
+AURA_RAG_FALLBACK_MIN_SCORE = float(os.getenv("AURA_RAG_FALLBACK_MIN_SCORE", "3.0"))
 
 # System prompt for Aura Wellness Assistant
 AURA_SYSTEM_PROMPT = """You are Aura, an AI wellness assistant for EA employees. You are warm, supportive, and knowledgeable about the EA Wellness Pillars.
@@ -43,79 +109,1162 @@ Guidelines:
 
 Remember: You help EA employees achieve better wellbeing through personalized guidance and support."""
 
+# Persona added after AURA_SYSTEM_PROMPT for each Aura character
+CHARACTER_PERSONAS = {
+    'nova': "You are Nova, the habit tracking companion. You're energetic, encouraging, and focused on building consistent wellness routines. Use 🏃‍♀️ emoji occasionally.",
+    'veda': "You are Veda, the focus and energy coach. You're motivating, driven, and help boost productivity. Use 💪 emoji occasionally.",
+    'kai': "You are Kai, the calm and breath guide. You're peaceful, zen-like, and help with mindfulness and stress management. Use 🧘‍♂️ emoji occasionally.",
+    'iris': "You are Iris, the relaxation and recovery specialist. You're gentle, nurturing, and focused on rest and healing. Use 🌿 emoji occasionally."
+}
+DEFAULT_CHARACTER = 'nova'
+
+# System messages built once, so every turn for a character starts with the
+# same bytes and Azure's prompt-prefix cache can reuse them (None: no persona)
+SYSTEM_MESSAGES = {
+    name: {"role": "system", "content": f"{AURA_SYSTEM_PROMPT}\n\n{persona}"}
+    for name, persona in CHARACTER_PERSONAS.items()
+}
+SYSTEM_MESSAGES[None] = {"role": "system", "content": AURA_SYSTEM_PROMPT}
+
+
+def resolve_character(character: str = None):
+    """Known character names (any case) as-is, None for no character, anything else the default."""
+    if character is None:
+        return None
+    name = str(character).strip().lower()
+    return name if name in CHARACTER_PERSONAS else DEFAULT_CHARACTER
+
+
+_client = None
+_client_lock = threading.Lock()
+_in_flight_slots = threading.BoundedSemaphore(AZURE_OPENAI_MAX_IN_FLIGHT)
+_pool_stats_lock = threading.Lock()
+_pool_stats = {
+    'requests_total': 0,
+    'in_flight': 0,
+    'peak_in_flight': 0,
+    'rejected_total': 0,
+    'wait_seconds_total': 0.0,
+}
+
 
 def get_openai_client():
-    """Create and return an Azure OpenAI client instance."""
-    return AzureOpenAI(
-        azure_endpoint=AZURE_OPENAI_ENDPOINT,
-        api_key=AZURE_OPENAI_API_KEY,
-        api_version=AZURE_OPENAI_API_VERSION
-    )
+    """
+    Return the process-wide Azure OpenAI client.
+    
+    The client is created once and reuses a keep-alive HTTP connection pool,
+    so chat turns after the first skip the TCP/TLS handshake.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=AZURE_OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=AZURE_OPENAI_MAX_KEEPALIVE,
+                        keepalive_expiry=AZURE_OPENAI_KEEPALIVE_EXPIRY
+                    ),
+                    timeout=httpx.Timeout(
+                        AZURE_OPENAI_READ_TIMEOUT,
+                        connect=AZURE_OPENAI_CONNECT_TIMEOUT
+                    )
+                )
+                _client = AzureOpenAI(
+                    azure_endpoint=AZURE_OPENAI_ENDPOINT,
+                    api_key=AZURE_OPENAI_API_KEY,
+                    api_version=AZURE_OPENAI_API_VERSION,
+                    max_retries=AZURE_OPENAI_MAX_RETRIES,
+                    http_client=http_client
+                )
+    return _client
+
+
+def warm_up_client() -> bool:
+    """
+    Create the pooled client and open one keep-alive connection to the
+    endpoint, so a new worker's first chat turn skips the TCP/TLS handshake.
+    
+    Returns:
+        bool: True if the endpoint answered (any HTTP status counts)
+    """
+    if not AZURE_OPENAI_API_KEY:
+        return False
+    client = get_openai_client()
+    try:
+        # The SDK's httpx client owns the pool the chat calls will reuse
+        client._client.head(AZURE_OPENAI_ENDPOINT, timeout=AZURE_OPENAI_CONNECT_TIMEOUT)
+    except httpx.HTTPError as e:
+        print(f"Azure OpenAI warm-up failed: {e}")
+        return False
+    return True
+
+
+def reset_clients() -> None:
+    """Forget clients inherited across a fork; their pooled sockets belong to the parent."""
+    global _client, _async_client
+    with _client_lock:
+        _client = None
+        _async_client = None
+
+
+@contextmanager
+def upstream_slot(timeout: float = AZURE_OPENAI_CONNECT_TIMEOUT):
+    """
+    Hold one of the AZURE_OPENAI_MAX_IN_FLIGHT upstream request slots.
+    
+    Raises:
+        RuntimeError: If no slot frees up within `timeout` seconds
+    """
+    started = time.monotonic()
+    acquired = _in_flight_slots.acquire(timeout=timeout)
+    waited = time.monotonic() - started
+    
+    with _pool_stats_lock:
+        _pool_stats['wait_seconds_total'] += waited
+        if not acquired:
+            _pool_stats['rejected_total'] += 1
+        else:
+            _pool_stats['requests_total'] += 1
+            _pool_stats['in_flight'] += 1
+            _pool_stats['peak_in_flight'] = max(_pool_stats['peak_in_flight'], _pool_stats['in_flight'])
+    
+    if not acquired:
+        raise RuntimeError(f"Upstream concurrency limit ({AZURE_OPENAI_MAX_IN_FLIGHT}) reached")
+    
+    try:
+        yield
+    finally:
+        with _pool_stats_lock:
+            _pool_stats['in_flight'] -= 1
+        _in_flight_slots.release()
+
+
+upstream_breaker = CircuitBreaker(
+    window_size=AURA_BREAKER_WINDOW,
+    min_requests=AURA_BREAKER_MIN_REQUESTS,
+    error_rate_threshold=AURA_BREAKER_ERROR_RATE,
+    latency_threshold=AURA_BREAKER_LATENCY_P95,
+    open_seconds=AURA_BREAKER_OPEN_SECONDS,
+    half_open_probes=AURA_BREAKER_PROBES
+)
+
+
+# Per-session and process-wide rate limits in front of every upstream call
+admission = AdmissionController()
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a chat turn has no upstream time left."""
+
+
+def new_deadline(seconds: float = AURA_REQUEST_DEADLINE_SECONDS) -> float:
+    """Absolute time.monotonic() deadline `seconds` from now."""
+    return time.monotonic() + seconds
+
+
+def remaining_time(deadline: float) -> float:
+    """
+    Seconds left before `deadline`.
+    
+    Raises:
+        DeadlineExceeded: If the deadline has passed
+    """
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return remaining
+
+
+def is_upstream_fault(error: Exception) -> bool:
+    """True for errors that say Azure is unhealthy (not e.g. a rejected prompt)."""
+    if isinstance(error, APIStatusError):
+        return error.status_code >= 500 or error.status_code in (408, 429)
+    return True
+
+
+def retry_delay(error: Exception, attempt: int, base: float = AURA_BATCH_BACKOFF_SECONDS,
+                cap: float = AURA_BATCH_BACKOFF_MAX_SECONDS) -> float:
+    """
+    Seconds to wait before retrying after failed attempt number `attempt`.
+    
+    Honours Azure's retry-after-ms / Retry-After headers when present,
+    otherwise exponential backoff with full jitter, capped at `cap`.
+    """
+    delay = retry_after(error)
+    if delay is not None:
+        return min(cap, delay)
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def retry_after(error: Exception):
+    """Seconds from an Azure error's retry-after-ms or Retry-After header, else None."""
+    if not isinstance(error, APIStatusError):
+        return None
+    headers = error.response.headers
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return max(0.0, float(headers[name]) * scale)
+        except (KeyError, TypeError, ValueError):
+            pass
+    return None
+
+
+def note_throttling(error: Exception) -> None:
+    """On a 429, pause admissions for Azure's Retry-After (or a short backoff)."""
+    if isinstance(error, APIStatusError) and error.status_code == 429:
+        admission.throttle(retry_delay(error, 1))
+
+
+@contextmanager
+def upstream_call(deadline: float):
+    """
+    Guard one upstream call with the deadline, circuit breaker and slot limit.
+    
+    Yields:
+        float: Seconds left before the deadline, to use as the request timeout
+    
+    Raises:
+        DeadlineExceeded: If no time is left
+        CircuitOpenError: If the breaker is open
+        RuntimeError: If no in-flight slot frees up in time
+    """
+    remaining_time(deadline)
+    ticket = upstream_breaker.allow_request()
+    if ticket is None:
+        raise CircuitOpenError("Upstream circuit breaker is open")
+    
+    started = time.monotonic()
+    outcome = None
+    try:
+        with upstream_slot(min(AZURE_OPENAI_CONNECT_TIMEOUT, remaining_time(deadline))):
+            timeout = remaining_time(deadline)
+            started = time.monotonic()
+            try:
+                yield timeout
+                outcome = True
+            except Exception as e:
+                outcome = not is_upstream_fault(e)
+                note_throttling(e)
+                raise
+    finally:
+        elapsed = time.monotonic() - started
+        if outcome is True:
+            upstream_breaker.record_success(ticket, elapsed)
+            upstream_latency.observe(elapsed, outcome='success')
+        elif outcome is False:
+            upstream_breaker.record_failure(ticket, elapsed)
+            upstream_latency.observe(elapsed, outcome='failure')
+        else:
+            # Never reached upstream (no slot, no time left, or cancelled)
+            upstream_breaker.release(ticket)
 
 
-def get_aura_response(user_message: str, conversation_history: list = None) -> str:
+def get_client_stats() -> dict:
+    """
+    Snapshot of upstream client and connection pool utilization.
+    
+    Returns:
+        dict: In-flight request counts and limits, plus open/idle connection
+        counts when the HTTP transport exposes them
+    """
+    with _pool_stats_lock:
+        stats = dict(_pool_stats)
+    
+    stats['max_in_flight'] = AZURE_OPENAI_MAX_IN_FLIGHT
+    stats['max_connections'] = AZURE_OPENAI_MAX_CONNECTIONS
+    stats['utilization'] = round(stats['in_flight'] / AZURE_OPENAI_MAX_IN_FLIGHT, 3)
+    stats['client_initialized'] = _client is not None
+    
+    # httpx does not publish pool internals; read them best-effort from httpcore
+    pool = getattr(getattr(getattr(_client, '_client', None), '_transport', None), '_pool', None)
+    connections = getattr(pool, 'connections', None)
+    if connections is not None:
+        stats['connections_open'] = len(connections)
+        stats['connections_idle'] = sum(1 for conn in connections if conn.is_idle())
+    
+    return stats
+
+
+# Sampling parameters shared by every chat completion request
+COMPLETION_PARAMS = {
+    "temperature": 0.7,
+    "max_tokens": 300,
+    "top_p": 0.9,
+}
+
+
+# Built once at import; later processes reuse the on-disk cache
+knowledge_index = load_knowledge_index() if AURA_RAG_ENABLED else None
+
+
+def get_knowledge_snippets(user_message: str, min_score: float = AURA_RAG_MIN_SCORE,
+                           k: int = AURA_RAG_TOP_K, token_budget: int = AURA_RAG_TOKEN_BUDGET) -> list:
+    """Top guide snippets for a message within the retrieval token budget."""
+    if knowledge_index is None:
+        return []
+    return knowledge_index.retrieve(user_message, k=k, token_budget=token_budget, min_score=min_score)
+
+
+KNOWLEDGE_NOTES_HEADER = "Relevant notes from the EA Aura coaching guide:"
+SUMMARY_HEADER = "Summary of earlier conversation:"
+
+# Rolling summaries of turns that no longer fit the prompt budget
+history_summaries = SummaryCache()
+
+
+def build_messages(user_message: str, conversation_history: list = None,
+                   session_id: str = None, prompt_stats: dict = None,
+                   character: str = None) -> list:
+    """
+    Assemble the chat completion messages for one turn within the token budget.
+    
+    History is taken newest-first until AURA_PROMPT_TOKEN_BUDGET is reached;
+    older turns are folded into the session's rolling summary. The order is
+    system prompt with persona, summary, history, guide notes, user message,
+    so the most stable content forms the prompt prefix. Once history
+    overflows the budget, every turn changes both the summary and the head
+    of the window, so only the system prompt stays cacheable wherever the
+    summary sits; it is kept ahead of the window to read in order.
+    
+    Args:
+        user_message: The user's input message
+        conversation_history: Optional list of previous messages for context
+        session_id: Optional session key for reusing the rolling summary
+        prompt_stats: Optional dict filled with prompt_tokens, history_messages
+            and summarized_messages
+        character: Resolved character name selecting the system message
+    
+    Returns:
+        list: Chat completion messages
+    """
+    system_message = SYSTEM_MESSAGES.get(character, SYSTEM_MESSAGES[DEFAULT_CHARACTER])
+    user_entry = {"role": "user", "content": user_message}
+    
+    notes_message = None
+    snippets = get_knowledge_snippets(user_message)
+    if snippets:
+        notes = "\n\n".join(snippet["text"] for snippet in snippets)
+        notes_message = {"role": "system", "content": f"{KNOWLEDGE_NOTES_HEADER}\n{notes}"}
+    
+    fixed = [system_message, user_entry] + ([notes_message] if notes_message else [])
+    history_budget = max(0, AURA_PROMPT_TOKEN_BUDGET - count_message_tokens(fixed))
+    
+    history = conversation_history or []
+    window, dropped = select_history(history, history_budget)
+    if dropped:
+        # Leave room for the whole summary message of whatever did not fit:
+        # its header, message overhead and one token for the newline joining them
+        summary_budget = (AURA_SUMMARY_TOKEN_BUDGET + 1
+                          + count_message_tokens([{"role": "system", "content": SUMMARY_HEADER}]))
+        window, dropped = select_history(history, max(0, history_budget - summary_budget))
+    
+    messages = [system_message]
+    
+    summary = history_summaries.summarize(session_id, dropped)
+    if summary:
+        messages.append({"role": "system", "content": f"{SUMMARY_HEADER}\n{summary}"})
+    
+    messages.extend(window)
+    
+    # Snippets go after the history so the system prompt + history prefix stays stable
+    if notes_message:
+        messages.append(notes_message)
+    
+    messages.append(user_entry)
+    
+    if prompt_stats is not None:
+        prompt_stats.update({
+            'prompt_tokens': count_message_tokens(messages),
+            'history_messages': len(window),
+            'summarized_messages': len(dropped),
+        })
+    
+    return messages
+
+
+response_cache = ResponseCache(
+    max_entries=AURA_CACHE_MAX_ENTRIES,
+    ttl_seconds=AURA_CACHE_TTL_SECONDS
+)
+
+
+def history_context(messages: list) -> list:
+    """The history-derived part of a prompt: summary and window, not guide notes."""
+    return [m for m in messages[1:-1] if not m["content"].startswith(KNOWLEDGE_NOTES_HEADER)]
+
+
+def get_cache_key(user_message: str, messages: list, character: str = None, use_cache: bool = True):
+    """
+    Return the response cache key for a turn, or None if it must not be cached.
+    
+    The key covers the history actually sent (summary and window, not the
+    guide notes, which follow from the message). Turns that carry history
+    context are only cached when AURA_CACHE_WITH_HISTORY is enabled, since the
+    same question can deserve a different answer mid-conversation.
+    """
+    if not (use_cache and AURA_CACHE_ENABLED):
+        return None
+    
+    context = history_context(messages)
+    if context and not AURA_CACHE_WITH_HISTORY:
+        return None
+    
+    return response_cache.make_key(user_message, character, context)
+
+
+# Concurrent identical first-turn requests share one upstream call
+inflight_requests = SingleFlight()
+
+
+def get_flight_key(user_message: str, messages: list, character: str = None):
+    """Coalescing key for turns without history context, otherwise None."""
+    if history_context(messages):
+        return None
+    return response_cache.make_key(user_message, character)
+
+
+def record_usage(prompt_stats: dict, usage, character: str = None) -> None:
+    """
+    Count upstream token usage (when reported) and copy it into prompt_stats.
+    
+    Prompt tokens served from Azure's prompt-prefix cache are counted per
+    character, for the cached-token ratios in prompt_cache_stats().
+    """
+    if usage is None:
+        return
+    details = getattr(usage, 'prompt_tokens_details', None)
+    cached = getattr(details, 'cached_tokens', None) or 0
+    tokens.inc(usage.prompt_tokens or 0, kind='prompt')
+    tokens.inc(usage.completion_tokens or 0, kind='completion')
+    tokens.inc(cached, kind='cached')
+    label = character or 'none'
+    character_prompt_tokens.inc(usage.prompt_tokens or 0, character=label, kind='prompt')
+    character_prompt_tokens.inc(cached, character=label, kind='cached')
+    if prompt_stats is None:
+        return
+    prompt_stats['upstream_prompt_tokens'] = usage.prompt_tokens
+    prompt_stats['completion_tokens'] = usage.completion_tokens
+    prompt_stats['cached_tokens'] = cached
+
+
+def prompt_cache_stats() -> dict:
+    """Per-character prompt tokens, cached prompt tokens and their ratio since start."""
+    stats = {}
+    for character in (*CHARACTER_PERSONAS, 'none'):
+        prompt = character_prompt_tokens.value(character=character, kind='prompt')
+        cached = character_prompt_tokens.value(character=character, kind='cached')
+        if prompt:
+            stats[character] = {'prompt_tokens': prompt, 'cached_tokens': cached,
+                                'cached_ratio': round(cached / prompt, 3)}
+    return stats
+
+
+def record_attempts(prompt_stats: dict, attempts: int) -> None:
+    """Note how many upstream attempts a turn took."""
+    if prompt_stats is not None:
+        prompt_stats['attempts'] = attempts
+
+
+def record_source(prompt_stats: dict, source: str) -> None:
+    """Count and note where a turn's reply came from: "cache", "upstream" or "fallback"."""
+    chat_replies.inc(source=source)
+    if prompt_stats is not None:
+        prompt_stats['source'] = source
+
+
+def estimate_call_tokens(messages: list, prompt_stats: dict = None) -> int:
+    """Tokens a call is charged at admission: the prompt plus the completion limit."""
+    prompt_tokens = (prompt_stats or {}).get('prompt_tokens')
+    if prompt_tokens is None:
+        prompt_tokens = count_message_tokens(messages)
+    return prompt_tokens + COMPLETION_PARAMS["max_tokens"]
+
+
+def settle_usage(session_id: str, estimate: int, usage) -> None:
+    """Correct the admission token buckets with the usage Azure reported."""
+    if usage is not None and usage.total_tokens is not None:
+        admission.settle(session_id, estimate, usage.total_tokens)
+
+
+def request_completion(messages: list, deadline: float, prompt_stats: dict = None,
+                       character: str = None, session_id: str = None,
+                       priority: int = INTERACTIVE) -> str:
+    """
+    Run one chat completion under the admission, deadline, breaker and slot guards.
+    
+    Raises:
+        Exception: Any upstream or guard error (AdmissionRejected when the
+            rate limits leave no room before the deadline); callers choose
+            the fallback
+    """
+    estimate = estimate_call_tokens(messages, prompt_stats)
+    admission.admit(session_id, estimate, deadline, priority)
+    client = get_openai_client()
+    
+    with upstream_call(deadline) as timeout:
+        completion = client.chat.completions.create(
+            model=AZURE_OPENAI_DEPLOYMENT,
+            messages=messages,
+            timeout=timeout,
+            **COMPLETION_PARAMS
+        )
+    
+    record_usage(prompt_stats, completion.usage, character)
+    settle_usage(session_id, estimate, completion.usage)
+    return completion.choices[0].message.content
+
+
+def get_aura_response(user_message: str, conversation_history: list = None,
+                      character: str = None, use_cache: bool = True,
+                      session_id: str = None, prompt_stats: dict = None,
+                      deadline: float = None, max_attempts: int = 1,
+                      priority: int = INTERACTIVE) -> str:
     """
     Get a response from Aura AI assistant.
     
     Args:
         user_message: The user's input message
         conversation_history: Optional list of previous messages for context
+        character: Optional Aura character name; selects the persona system
+            prompt and is part of the cache key
+        use_cache: Set False to bypass the response cache for this turn
+        session_id: Optional session key for the rolling history summary
+        prompt_stats: Optional dict filled with prompt token counts, the
+            reply's source ("cache", "upstream" or "fallback") and attempts
+        deadline: Optional time.monotonic() deadline for the upstream call
+            (defaults to AURA_REQUEST_DEADLINE_SECONDS from now per attempt)
+        max_attempts: Upstream attempts before falling back; transient
+            failures are retried after retry_delay()
+        priority: INTERACTIVE or BATCH place in the admission queue
     
     Returns:
         str: Aura's response message
     """
+    character = resolve_character(character)
+    messages = build_messages(user_message, conversation_history, session_id, prompt_stats, character)
+    cache_key = get_cache_key(user_message, messages, character, use_cache)
+    if cache_key is not None:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            record_source(prompt_stats, 'cache')
+            return cached
+    
+    flight_key = get_flight_key(user_message, messages, character)
+    attempt = 0
+    while True:
+        attempt += 1
+        attempt_deadline = deadline if deadline is not None else new_deadline()
+        try:
+            if flight_key is None:
+                response = request_completion(messages, attempt_deadline, prompt_stats,
+                                              character, session_id, priority)
+            else:
+                response = inflight_requests.do(
+                    flight_key,
+                    lambda: request_completion(messages, attempt_deadline, prompt_stats,
+                                               character, session_id, priority),
+                    timeout=remaining_time(attempt_deadline)
+                )
+            break
+        
+        except Exception as e:
+            delay = retry_delay(e, attempt)
+            if attempt < max_attempts and is_upstream_fault(e) and (
+                    deadline is None or delay < deadline - time.monotonic()):
+                time.sleep(delay)
+                continue
+            print(f"OpenAI API Error: {e}")
+            record_attempts(prompt_stats, attempt)
+            record_source(prompt_stats, 'fallback')
+            return get_fallback_response(user_message)
+    
+    record_attempts(prompt_stats, attempt)
+    record_source(prompt_stats, 'upstream')
+    if cache_key is not None and response:
+        response_cache.set(cache_key, response)
+    
+    return response
+
+
+def stream_aura_response(user_message: str, conversation_history: list = None,
+                         character: str = None, use_cache: bool = True,
+                         session_id: str = None, prompt_stats: dict = None,
+                         deadline: float = None):
+    """
+    Stream a response from Aura AI assistant token by token.
+    
+    Args:
+        user_message: The user's input message
+        conversation_history: Optional list of previous messages for context
+        character: Optional Aura character name; selects the persona system
+            prompt and is part of the cache key
+        use_cache: Set False to bypass the response cache for this turn
+        session_id: Optional session key for the rolling history summary
+        prompt_stats: Optional dict filled with prompt token counts and the
+            reply's source ("cache", "upstream" or "fallback")
+        deadline: Optional time.monotonic() deadline for the whole stream
+    
+    Yields:
+        tuple: ("token", text) for each content delta as it arrives, or a
+        single ("fallback", text) if the upstream stream fails. A fallback
+        replaces any tokens already yielded for this turn. A cache hit is
+        yielded as one token.
+    """
+    character = resolve_character(character)
+    messages = build_messages(user_message, conversation_history, session_id, prompt_stats, character)
+    cache_key = get_cache_key(user_message, messages, character, use_cache)
+    if cache_key is not None:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            record_source(prompt_stats, 'cache')
+            yield "token", cached
+            return
+    
+    if deadline is None:
+        deadline = new_deadline()
+    
+    parts = []
+    usage = None
     try:
+        estimate = estimate_call_tokens(messages, prompt_stats)
+        admission.admit(session_id, estimate, deadline)
         client = get_openai_client()
         
-        messages = [{"role": "system", "content": AURA_SYSTEM_PROMPT}]
-        
-        if conversation_history:
-            messages.extend(conversation_history[-6:])
-        
-        messages.append({"role": "user", "content": user_message})
+        with upstream_call(deadline) as timeout:
+            stream = client.chat.completions.create(
+                model=AZURE_OPENAI_DEPLOYMENT,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=timeout,
+                **COMPLETION_PARAMS
+            )
+            
+            # Closing releases the pooled connection when the client
+            # disconnects mid-stream (GeneratorExit at a yield)
+            try:
+                for chunk in stream:
+                    remaining_time(deadline)
+                    # The last chunk carries usage and no choices
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    # Azure sends an initial chunk with content filter results and no choices
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield "token", delta
+            finally:
+                stream.close()
         
-        completion = client.chat.completions.create(
+    except Exception as e:
+        print(f"OpenAI Streaming Error: {e}")
+        record_source(prompt_stats, 'fallback')
+        yield "fallback", get_fallback_response(user_message)
+        return
+    
+    record_source(prompt_stats, 'upstream')
+    record_usage(prompt_stats, usage, character)
+    settle_usage(session_id, estimate, usage)
+    if cache_key is not None and parts:
+        response_cache.set(cache_key, ''.join(parts))
+
+
+_async_client = None
+_async_in_flight_slots = None
+
+
+def get_async_openai_client():
+    """
+    Return the process-wide async Azure OpenAI client for the ASGI server.
+    
+    Uses the same pool limits and timeouts as get_openai_client().
+    """
+    global _async_client
+    if _async_client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=AZURE_OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=AZURE_OPENAI_MAX_KEEPALIVE,
+                keepalive_expiry=AZURE_OPENAI_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(
+                AZURE_OPENAI_READ_TIMEOUT,
+                connect=AZURE_OPENAI_CONNECT_TIMEOUT
+            )
+        )
+        _async_client = AsyncAzureOpenAI(
+            azure_endpoint=AZURE_OPENAI_ENDPOINT,
+            api_key=AZURE_OPENAI_API_KEY,
+            api_version=AZURE_OPENAI_API_VERSION,
+            max_retries=AZURE_OPENAI_MAX_RETRIES,
+            http_client=http_client
+        )
+    return _async_client
+
+
+@asynccontextmanager
+async def async_upstream_call(deadline: float):
+    """Async counterpart of upstream_call() for the event-loop server."""
+    remaining_time(deadline)
+    ticket = upstream_breaker.allow_request()
+    if ticket is None:
+        raise CircuitOpenError("Upstream circuit breaker is open")
+    
+    started = time.monotonic()
+    outcome = None
+    try:
+        async with async_upstream_slot(min(AZURE_OPENAI_CONNECT_TIMEOUT, remaining_time(deadline))):
+            timeout = remaining_time(deadline)
+            started = time.monotonic()
+            try:
+                yield timeout
+                outcome = True
+            except Exception as e:
+                outcome = not is_upstream_fault(e)
+                note_throttling(e)
+                raise
+    finally:
+        elapsed = time.monotonic() - started
+        if outcome is True:
+            upstream_breaker.record_success(ticket, elapsed)
+            upstream_latency.observe(elapsed, outcome='success')
+        elif outcome is False:
+            upstream_breaker.record_failure(ticket, elapsed)
+            upstream_latency.observe(elapsed, outcome='failure')
+        else:
+            upstream_breaker.release(ticket)
+
+
+async def _acquire_within(semaphore: asyncio.Semaphore, timeout: float) -> bool:
+    """
+    Acquire `semaphore` within `timeout` seconds; False if it timed out.
+    
+    asyncio.wait_for() before Python 3.12 can time out just as acquire()
+    succeeds and leak the permit, so it is not used here.
+    """
+    if hasattr(asyncio, 'timeout'):
+        try:
+            async with asyncio.timeout(timeout):
+                await semaphore.acquire()
+            return True
+        except TimeoutError:
+            return False
+    
+    acquire = asyncio.ensure_future(semaphore.acquire())
+    done, _ = await asyncio.wait({acquire}, timeout=timeout)
+    if not done:
+        acquire.cancel()
+        try:
+            # acquire() may have won the race with cancel(); then the permit is ours
+            await acquire
+        except asyncio.CancelledError:
+            return False
+    return True
+
+
+@asynccontextmanager
+async def async_upstream_slot(timeout: float = AZURE_OPENAI_CONNECT_TIMEOUT):
+    """
+    Async counterpart of upstream_slot() for the event-loop server.
+    
+    Raises:
+        RuntimeError: If no slot frees up within `timeout` seconds
+    """
+    global _async_in_flight_slots
+    if _async_in_flight_slots is None:
+        _async_in_flight_slots = asyncio.Semaphore(AZURE_OPENAI_MAX_IN_FLIGHT)
+    
+    started = time.monotonic()
+    if not await _acquire_within(_async_in_flight_slots, timeout):
+        with _pool_stats_lock:
+            _pool_stats['wait_seconds_total'] += time.monotonic() - started
+            _pool_stats['rejected_total'] += 1
+        raise RuntimeError(f"Upstream concurrency limit ({AZURE_OPENAI_MAX_IN_FLIGHT}) reached")
+    
+    with _pool_stats_lock:
+        _pool_stats['wait_seconds_total'] += time.monotonic() - started
+        _pool_stats['requests_total'] += 1
+        _pool_stats['in_flight'] += 1
+        _pool_stats['peak_in_flight'] = max(_pool_stats['peak_in_flight'], _pool_stats['in_flight'])
+    
+    try:
+        yield
+    finally:
+        with _pool_stats_lock:
+            _pool_stats['in_flight'] -= 1
+        _async_in_flight_slots.release()
+
+
+async def request_completion_async(messages: list, deadline: float, prompt_stats: dict = None,
+                                   character: str = None, session_id: str = None,
+                                   priority: int = INTERACTIVE) -> str:
+    """Async counterpart of request_completion()."""
+    estimate = estimate_call_tokens(messages, prompt_stats)
+    await admission.admit_async(session_id, estimate, deadline, priority)
+    client = get_async_openai_client()
+    
+    async with async_upstream_call(deadline) as timeout:
+        completion = await client.chat.completions.create(
             model=AZURE_OPENAI_DEPLOYMENT,
             messages=messages,
-            temperature=0.7,
-            max_tokens=300,
-            top_p=0.9
+            timeout=timeout,
+            **COMPLETION_PARAMS
         )
+    
+    record_usage(prompt_stats, completion.usage, character)
+    settle_usage(session_id, estimate, completion.usage)
+    return completion.choices[0].message.content
+
+
+async def get_aura_response_async(user_message: str, conversation_history: list = None,
+                                  character: str = None, use_cache: bool = True,
+                                  session_id: str = None, prompt_stats: dict = None,
+                                  deadline: float = None, max_attempts: int = 1,
+                                  priority: int = INTERACTIVE) -> str:
+    """
+    Async variant of get_aura_response() used by the ASGI server.
+    
+    Args:
+        user_message: The user's input message
+        conversation_history: Optional list of previous messages for context
+        character: Optional Aura character name; selects the persona system
+            prompt and is part of the cache key
+        use_cache: Set False to bypass the response cache for this turn
+        session_id: Optional session key for the rolling history summary
+        prompt_stats: Optional dict filled with prompt token counts, the
+            reply's source ("cache", "upstream" or "fallback") and attempts
+        deadline: Optional time.monotonic() deadline for the upstream call
+        max_attempts: Upstream attempts before falling back
+        priority: INTERACTIVE or BATCH place in the admission queue
+    
+    Returns:
+        str: Aura's response message
+    """
+    character = resolve_character(character)
+    messages = build_messages(user_message, conversation_history, session_id, prompt_stats, character)
+    cache_key = get_cache_key(user_message, messages, character, use_cache)
+    if cache_key is not None:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            record_source(prompt_stats, 'cache')
+            return cached
+    
+    flight_key = get_flight_key(user_message, messages, character)
+    attempt = 0
+    while True:
+        attempt += 1
+        attempt_deadline = deadline if deadline is not None else new_deadline()
+        try:
+            if flight_key is None:
+                response = await request_completion_async(messages, attempt_deadline, prompt_stats,
+                                                          character, session_id, priority)
+            else:
+                response = await inflight_requests.do_async(
+                    flight_key,
+                    lambda: request_completion_async(messages, attempt_deadline, prompt_stats,
+                                                     character, session_id, priority),
+                    timeout=remaining_time(attempt_deadline)
+                )
+            break
+        
+        except Exception as e:
+            delay = retry_delay(e, attempt)
+            if attempt < max_attempts and is_upstream_fault(e) and (
+                    deadline is None or delay < deadline - time.monotonic()):
+                await asyncio.sleep(delay)
+                continue
+            print(f"OpenAI API Error: {e}")
+            record_attempts(prompt_stats, attempt)
+            record_source(prompt_stats, 'fallback')
+            return get_fallback_response(user_message)
+    
+    record_attempts(prompt_stats, attempt)
+    record_source(prompt_stats, 'upstream')
+    if cache_key is not None and response:
+        response_cache.set(cache_key, response)
+    
+    return response
+
+
+async def stream_aura_response_async(user_message: str, conversation_history: list = None,
+                                     character: str = None, use_cache: bool = True,
+                                     session_id: str = None, prompt_stats: dict = None,
+                                     deadline: float = None):
+    """
+    Async variant of stream_aura_response() used by the ASGI server.
+    
+    Yields:
+        tuple: ("token", text) per content delta, or ("fallback", text)
+    """
+    character = resolve_character(character)
+    messages = build_messages(user_message, conversation_history, session_id, prompt_stats, character)
+    cache_key = get_cache_key(user_message, messages, character, use_cache)
+    if cache_key is not None:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            record_source(prompt_stats, 'cache')
+            yield "token", cached
+            return
+    
+    if deadline is None:
+        deadline = new_deadline()
+    
+    parts = []
+    usage = None
+    try:
+        estimate = estimate_call_tokens(messages, prompt_stats)
+        await admission.admit_async(session_id, estimate, deadline)
+        client = get_async_openai_client()
         
-        return completion.choices[0].message.content
+        async with async_upstream_call(deadline) as timeout:
+            stream = await client.chat.completions.create(
+                model=AZURE_OPENAI_DEPLOYMENT,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=timeout,
+                **COMPLETION_PARAMS
+            )
+            
+            try:
+                async for chunk in stream:
+                    remaining_time(deadline)
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield "token", delta
+            finally:
+                await stream.close()
         
     except Exception as e:
-        print(f"OpenAI API Error: {e}")
-        return get_fallback_response(user_message)
+        print(f"OpenAI Streaming Error: {e}")
+        record_source(prompt_stats, 'fallback')
+        yield "fallback", get_fallback_response(user_message)
+        return
+    
+    record_source(prompt_stats, 'upstream')
+    record_usage(prompt_stats, usage, character)
+    settle_usage(session_id, estimate, usage)
+    if cache_key is not None and parts:
+        response_cache.set(cache_key, ''.join(parts))
 
 
-def get_fallback_response(user_input: str) -> str:
-    """Fallback responses when API is unavailable."""
-    lower_input = user_input.lower()
+def normalize_batch_item(item) -> dict:
+    """
+    Validate one batch item: {"message": ..., "session_id": ..., "character": ...}.
+    
+    Raises:
+        ValueError: If the item is not an object with a non-empty message
+    """
+    if not isinstance(item, dict) or not isinstance(item.get('message'), str) or not item['message'].strip():
+        raise ValueError("Each item needs a non-empty 'message'")
+    return {
+        'session_id': item.get('session_id'),
+        'character': item.get('character') or 'nova',
+        'message': item['message'],
+    }
+
+
+def _batch_result(index: int, item: dict, response: str, prompt_stats: dict, started: float) -> dict:
+    return {
+        'index': index,
+        'session_id': item['session_id'],
+        'character': item['character'],
+        'success': True,
+        'response': response,
+        'source': prompt_stats.get('source'),
+        'attempts': prompt_stats.get('attempts', 0),
+        'prompt_tokens': prompt_stats.get('prompt_tokens'),
+        'completion_tokens': prompt_stats.get('completion_tokens'),
+        'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def get_batch_response(index: int, item: dict, get_history=None,
+                       max_attempts: int = AURA_BATCH_MAX_ATTEMPTS) -> dict:
+    """
+    Answer one normalized batch item, retrying transient upstream failures.
+    
+    Args:
+        index: Position of the item in its batch, echoed in the result
+        item: Output of normalize_batch_item()
+        get_history: Optional callable returning a session_id's history
+        max_attempts: Upstream attempts before the local fallback
+    
+    Returns:
+        dict: The result line: index, session_id, character, response,
+        source, attempts, token counts and latency_ms
+    """
+    started = time.perf_counter()
+    session_id = item['session_id']
+    history = get_history(session_id) if get_history and session_id else None
+    prompt_stats = {}
+    response = get_aura_response(item['message'], history, character=item['character'],
+                                 session_id=session_id, prompt_stats=prompt_stats, max_attempts=max_attempts,
+                                 priority=BATCH)
+    return _batch_result(index, item, response, prompt_stats, started)
+
+
+async def get_batch_response_async(index: int, item: dict, get_history=None,
+                                   max_attempts: int = AURA_BATCH_MAX_ATTEMPTS) -> dict:
+    """
+    Async counterpart of get_batch_response(). `get_history` is a blocking
+    session store lookup and runs in a worker thread.
+    """
+    started = time.perf_counter()
+    session_id = item['session_id']
+    history = await asyncio.to_thread(get_history, session_id) if get_history and session_id else None
+    prompt_stats = {}
+    response = await get_aura_response_async(item['message'], history, character=item['character'],
+                                             session_id=session_id, prompt_stats=prompt_stats,
+                                             max_attempts=max_attempts, priority=BATCH)
+    return _batch_result(index, item, response, prompt_stats, started)
+
+
+def _batch_error(index: int, item: dict, error: Exception) -> dict:
+    print(f"Batch item {index} error: {error}")
+    return {'index': index, 'session_id': item['session_id'], 'character': item['character'],
+            'success': False, 'error': str(error)}
+
+
+def run_batch(items: list, concurrency: int = AURA_BATCH_CONCURRENCY, get_history=None):
+    """
+    Answer normalized batch items with at most `concurrency` in flight.
+    
+    Items are submitted as earlier ones finish, so a large batch never
+    queues more than `concurrency` turns, and identical prompts (same
+    character and message, no history) share one upstream call through
+    the response cache and single-flight. Closing the generator stops
+    new submissions.
+    
+    Yields:
+        dict: One result per item, in completion order (see get_batch_response())
+    """
+    concurrency = max(1, min(concurrency, len(items) or 1))
+    pending = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="aura-batch") as pool:
+        queue = iter(enumerate(items))
+        try:
+            while True:
+                for index, item in queue:
+                    pending[pool.submit(get_batch_response, index, item, get_history)] = (index, item)
+                    if len(pending) >= concurrency:
+                        break
+                if not pending:
+                    return
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, item = pending.pop(future)
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        yield _batch_error(index, item, e)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def run_batch_async(items: list, concurrency: int = AURA_BATCH_CONCURRENCY, get_history=None):
+    """Async counterpart of run_batch(): `concurrency` tasks pull items from a shared iterator."""
+    results = asyncio.Queue()
+    queue = iter(enumerate(items))
     
-    if any(word in lower_input for word in ['stress', 'anxious', 'anxiety', 'worried']):
-        return "🧘 I understand you're feeling stressed. Try the 4-7-8 breathing technique: inhale for 4 counts, hold for 7, exhale for 8. This activates your parasympathetic nervous system for instant calm."
+    async def worker():
+        for index, item in queue:
+            try:
+                await results.put(await get_batch_response_async(index, item, get_history))
+            except Exception as e:
+                await results.put(_batch_error(index, item, e))
     
-    elif any(word in lower_input for word in ['sleep', 'tired', 'exhausted', 'fatigue']):
-        return "😴 Sleep is crucial for recovery! Aim for 7-9 hours. Try creating a wind-down ritual: dim lights 1 hour before bed, no screens 30 minutes prior, and practice gratitude breathing."
+    tasks = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, len(items) or 1)))]
+    try:
+        for _ in range(len(items)):
+            yield await results.get()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def run_batch_file(source, output, concurrency: int = AURA_BATCH_CONCURRENCY) -> dict:
+    """
+    Offline batch job: read JSON Lines items from `source`, write one NDJSON
+    result line to `output` as each finishes.
     
-    elif any(word in lower_input for word in ['focus', 'concentrate', 'distracted']):
-        return "🎯 Let's optimize your focus! Try the Pomodoro Technique: 25-minute deep work blocks with 5-minute breaks. Eliminate distractions and single-task for better quality output."
+    Returns:
+        dict: Item counts by reply source, plus invalid lines skipped
+    """
+    items = []
+    counts = {'items': 0, 'invalid': 0}
+    for line_number, line in enumerate(source, 1):
+        if not line.strip():
+            continue
+        try:
+            items.append(normalize_batch_item(json.loads(line)))
+        except ValueError as e:
+            counts['invalid'] += 1
+            print(f"Skipping line {line_number}: {e}", file=sys.stderr)
     
-    elif any(word in lower_input for word in ['exercise', 'movement', 'workout', 'steps']):
-        return "🏃 Movement is medicine! Aim for 8,000-10,000 steps daily. For game developers, take desk breaks every 30 minutes and try the 20-20-20 rule for eye health."
+    for result in run_batch(items, concurrency):
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        key = result.get('source') or 'error'
+        counts[key] = counts.get(key, 0) + 1
+        counts['items'] += 1
+    return counts
+
+
+fallback_matcher = IntentMatcher.from_file()
+
+
+def get_fallback_response(user_input: str) -> str:
+    """
+    Fallback responses when API is unavailable.
     
-    elif any(word in lower_input for word in ['goal', 'motivation', 'motivated']):
-        return "🎯 Let's set SMART goals! Make them Specific, Measurable, Achievable, Relevant, and Time-bound. Break big goals into daily actions and celebrate small wins!"
+    Tries the keyword intents first, then the best-matching coaching guide
+    snippet, then the generic prompt.
+    """
+    intent = fallback_matcher.match(user_input)
+    if intent:
+        return intent["response"]
     
-    elif any(word in lower_input for word in ['food', 'nutrition', 'eat', 'diet']):
-        return "🥗 Fuel your body right! Aim for 50% vegetables/fruits, 25% lean proteins, 25% whole grains. Stay hydrated with 8-10 glasses of water daily!"
+    snippets = get_knowledge_snippets(user_input, min_score=AURA_RAG_FALLBACK_MIN_SCORE,
+                                      k=1, token_budget=120)
+    if snippets:
+        title, _, body = snippets[0]["text"].partition("\n")
+        return f"📘 From the EA Aura coaching guide ({title}):\n{body}"
     
-    else:
-        return "✨ I'm here to support your wellness journey! What specific area would you like to focus on - physical health, mental wellness, productivity, social connections, or finding purpose?"
+    return fallback_matcher.default_response
 
 
-if __name__ == "__main__":
+def main():
+    """Test the connection, or run a batch job with --batch."""
+    parser = argparse.ArgumentParser(description="EA Aura Azure OpenAI client")
+    parser.add_argument("--batch", metavar="ITEMS.jsonl",
+                        help="Answer one item per line ('-' for stdin) and print NDJSON results")
+    parser.add_argument("--concurrency", type=int, default=AURA_BATCH_CONCURRENCY)
+    args = parser.parse_args()
+    
+    if args.batch:
+        started = time.perf_counter()
+        if args.batch == "-":
+            counts = run_batch_file(sys.stdin, sys.stdout, args.concurrency)
+        else:
+            with open(args.batch, encoding="utf-8") as source:
+                counts = run_batch_file(source, sys.stdout, args.concurrency)
+        print(f"{counts} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        return
+    
     print("Testing Aura AI connection...")
     response = get_aura_response("Hello! Can you help me manage stress?")
     print(f"Aura: {response}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime
 import numpy as np
-from pathlib import Path
+
+from dashboard_cache import DATA_PATH, load_frame
+from dashboard_charts import AURA_DASHBOARD_MAX_POINTS, build_figures, telemetry_figures
+from dashboard_export import (FORMATS as EXPORT_FORMATS, available_formats, daily_rollup, export_file,
+                              export_rows_file, write_export_source)
+from kpi_cube import KPICube
+from telemetry import TelemetryAggregator
 
 # Set page config
 st.set_page_config(
@@ -18,8 +22,8 @@ st.set_page_config(
 @st.cache_data
 def load_data():
     try:
-        data_path = Path(__file__).parent / 'dashboard_dummy_data.xlsx'
-        df = pd.read_excel(data_path)
+        # Columnar cache of the workbook, rebuilt only when the workbook changes
+        df = load_frame(DATA_PATH)
         df = df.sort_values('Date').reset_index(drop=True)
         df['Daily Active Users'] = df['Daily Active Users'] * (1 + np.arange(len(df)) * 0.02)
         return df.astype({'Daily Active Users': 'int64'})
@@ -27,11 +31,42 @@ def load_data():
         st.error(f"Error loading data: {e}. Run `python Hackathon_Dashboard.py` first to generate data.")
         return pd.DataFrame()
 
+
+@st.cache_resource
+def load_cube():
+    """Cumulative day/week/month rollups for O(log n) date-range KPIs."""
+    return KPICube(load_data())
+
+
+@st.cache_resource(max_entries=32)
+def load_figures(range_start, range_end, max_points):
+    """All chart figures for one filter state, reused across reruns and tab switches."""
+    df = load_data()
+    cube = load_cube()
+    row_start, row_end = cube.row_span(range_start, range_end)
+    return build_figures(df.iloc[row_start:row_end], cube, cube.kpis(range_start, range_end),
+                         range_start, range_end, max_points)
+
+
+@st.cache_resource
+def load_export_source():
+    """Columnar copy of the loaded rows that row exports stream from (None without pyarrow)."""
+    return write_export_source(load_data(), DATA_PATH.stem)
+
+
+@st.cache_resource
+def load_telemetry():
+    """Chat telemetry rollup; each rerun reads only newly flushed events."""
+    return TelemetryAggregator()
+
+
 df = load_data()
 
 if df.empty:
     st.stop()
 
+cube = load_cube()
+
 # Sidebar Filters
 st.sidebar.title("🔍 Filters")
 st.sidebar.markdown("---")
@@ -43,9 +78,22 @@ date_range = st.sidebar.date_input(
 )
 
 if len(date_range) == 2:
-    df_filtered = df[(df['Date'].dt.date >= date_range[0]) & (df['Date'].dt.date <= date_range[1])]
+    range_start, range_end = date_range
 else:
-    df_filtered = df
+    range_start, range_end = df['Date'].min().date(), df['Date'].max().date()
+
+downsample_charts = st.sidebar.checkbox("Downsample large charts", value=AURA_DASHBOARD_MAX_POINTS > 0)
+max_points = st.sidebar.number_input(
+    "Max points per chart",
+    min_value=100, max_value=100000, step=100,
+    value=AURA_DASHBOARD_MAX_POINTS or 1000,
+    disabled=not downsample_charts
+)
+max_points = int(max_points) if downsample_charts else 0
+
+# df is sorted by Date, so the range is a contiguous slice found by binary search
+row_start, row_end = cube.row_span(range_start, range_end)
+df_filtered = df.iloc[row_start:row_end]
 
 # Header
 st.markdown("""
@@ -62,13 +110,14 @@ st.markdown("""
 
 st.markdown("---")
 
-# Calculate metrics
-avg_dau = df_filtered['Daily Active Users'].mean() if len(df_filtered) > 0 else 0
-dau_change = ((df_filtered['Daily Active Users'].iloc[-1] - df_filtered['Daily Active Users'].iloc[0]) / df_filtered['Daily Active Users'].iloc[0] * 100) if len(df_filtered) > 1 else 0
-avg_mau = df_filtered['Monthly Active Users'].mean() if 'Monthly Active Users' in df_filtered.columns else 0
-satisfaction_rate = (df_filtered['Satisfied Responses'].sum() / df_filtered['Total Feedback Responses'].sum() * 100) if df_filtered['Total Feedback Responses'].sum() > 0 else 0
-voice_adoption = (df_filtered['Users Adopting Voice Features'].mean() / df_filtered['Total Users'].mean() * 100) if df_filtered['Total Users'].mean() > 0 else 0
-avg_rating = df_filtered['Average Rating'].mean() if 'Average Rating' in df_filtered.columns else 0
+# Calculate metrics from the cube's cumulative sums instead of rescanning rows
+kpis = cube.kpis(range_start, range_end)
+avg_dau = kpis['avg_dau']
+dau_change = kpis['dau_change']
+avg_mau = kpis['avg_mau']
+satisfaction_rate = kpis['satisfaction_rate']
+voice_adoption = kpis['voice_adoption']
+avg_rating = kpis['avg_rating']
 
 # KPI Cards Row
 col1, col2, col3, col4, col5 = st.columns(5)
@@ -91,7 +140,9 @@ with col5:
 st.markdown("---")
 
 # Tabs
-tab1, tab2, tab3, tab4 = st.tabs(["📈 Overview", "👥 User Metrics", "💬 Feedback", "📚 About"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Overview", "👥 User Metrics", "💬 Feedback", "🔴 Live Chat", "📚 About"])
+
+figures = load_figures(range_start, range_end, max_points)
 
 with tab1:
     st.subheader("Performance Trends")
@@ -99,40 +150,18 @@ with tab1:
     col1, col2 = st.columns(2)
     
     with col1:
-        fig1 = px.area(df_filtered, x='Date', y='Daily Active Users',
-                      title='Daily Active Users',
-                      color_discrete_sequence=['#667eea'])
-        fig1.update_layout(height=400, template='plotly_white')
-        st.plotly_chart(fig1, use_container_width=True)
+        st.plotly_chart(figures['fig1'], use_container_width=True)
     
     with col2:
-        fig2 = px.area(df_filtered, x='Date', y='Monthly Active Users',
-                      title='Monthly Active Users',
-                      color_discrete_sequence=['#764ba2'])
-        fig2.update_layout(height=400, template='plotly_white')
-        st.plotly_chart(fig2, use_container_width=True)
+        st.plotly_chart(figures['fig2'], use_container_width=True)
     
     col1, col2 = st.columns(2)
     
     with col1:
-        fig3 = px.line(df_filtered, x='Date',
-                      y=['Total Sessions', 'Sessions with Voice Interaction'],
-                      title='Session Activity', markers=True)
-        fig3.update_layout(height=400, template='plotly_white')
-        st.plotly_chart(fig3, use_container_width=True)
+        st.plotly_chart(figures['fig3'], use_container_width=True)
     
     with col2:
-        df_copy = df_filtered.copy()
-        df_copy['Duration_Bucket'] = pd.cut(df_copy['Duration (minutes)'],
-                                           bins=[0, 30, 60, 120],
-                                           labels=['0-30min', '30-60min', '60+min'])
-        duration_count = df_copy['Duration_Bucket'].value_counts()
-        fig4 = go.Figure(data=[
-            go.Bar(x=duration_count.index, y=duration_count.values,
-                  marker_color=['#667eea', '#764ba2', '#f093fb'])
-        ])
-        fig4.update_layout(title='Session Duration', height=400, template='plotly_white')
-        st.plotly_chart(fig4, use_container_width=True)
+        st.plotly_chart(figures['fig4'], use_container_width=True)
 
 with tab2:
     st.subheader("User Engagement")
@@ -140,44 +169,19 @@ with tab2:
     col1, col2 = st.columns(2)
     
     with col1:
-        retention_data = df_filtered[['New Users (Day 0)', 'Retained Users (Day 30)']].mean()
-        retention_pct = (retention_data['Retained Users (Day 30)'] / retention_data['New Users (Day 0)'] * 100)
-        
-        fig5 = go.Figure(data=[
-            go.Funnel(
-                y=['New Users', 'Retained (30 days)'],
-                x=[retention_data['New Users (Day 0)'], retention_data['Retained Users (Day 30)']],
-                marker=dict(color=['#667eea', '#764ba2'])
-            )
-        ])
-        fig5.update_layout(title=f'Retention Funnel ({retention_pct:.1f}%)', height=400, template='plotly_white')
-        st.plotly_chart(fig5, use_container_width=True)
+        st.plotly_chart(figures['fig5'], use_container_width=True)
     
     with col2:
-        fig6 = px.histogram(df_filtered, x='Interaction Count', nbins=20,
-                           title='Interaction Distribution',
-                           color_discrete_sequence=['#764ba2'])
-        fig6.update_layout(height=400, template='plotly_white')
-        st.plotly_chart(fig6, use_container_width=True)
+        st.plotly_chart(figures['fig6'], use_container_width=True)
     
     col1, col2 = st.columns(2)
     
     with col1:
-        if 'Character Interacted' in df_filtered.columns:
-            fig7 = px.bar(df_filtered, x='Character Interacted', y='Interaction Count',
-                         title='Character Interactions',
-                         color='Interaction Count', color_continuous_scale='Purples')
-            fig7.update_layout(height=400, template='plotly_white')
-            st.plotly_chart(fig7, use_container_width=True)
+        if 'fig7' in figures:
+            st.plotly_chart(figures['fig7'], use_container_width=True)
     
     with col2:
-        voice_trend = df_filtered.copy()
-        voice_trend['Voice_Pct'] = (voice_trend['Users Adopting Voice Features'] / voice_trend['Total Users'] * 100)
-        fig8 = px.area(voice_trend, x='Date', y='Voice_Pct',
-                      title='Voice Feature Adoption %',
-                      color_discrete_sequence=['#f093fb'])
-        fig8.update_layout(height=400, template='plotly_white')
-        st.plotly_chart(fig8, use_container_width=True)
+        st.plotly_chart(figures['fig8'], use_container_width=True)
 
 with tab3:
     st.subheader("Feedback & Ratings")
@@ -185,48 +189,63 @@ with tab3:
     col1, col2 = st.columns(2)
     
     with col1:
-        fig9 = px.bar(df_filtered, x='Date',
-                     y=['Total Feedback Responses', 'Satisfied Responses'],
-                     title='Feedback Responses', barmode='group')
-        fig9.update_layout(height=400, template='plotly_white')
-        st.plotly_chart(fig9, use_container_width=True)
+        st.plotly_chart(figures['fig9'], use_container_width=True)
     
     with col2:
-        fig10 = go.Figure(data=[go.Indicator(
-            mode="gauge+number",
-            value=satisfaction_rate,
-            title={'text': "Satisfaction Rate (%)"},
-            gauge={'axis': {'range': [0, 100]},
-                  'bar': {'color': "#667eea"},
-                  'steps': [
-                      {'range': [0, 50], 'color': "#ffcccb"},
-                      {'range': [50, 80], 'color': "#fffacd"},
-                      {'range': [80, 100], 'color': "#90EE90"}],
-                  'threshold': {
-                      'line': {'color': "green", 'width': 4},
-                      'thickness': 0.75,
-                      'value': 85}}
-        )])
-        fig10.update_layout(height=400, template='plotly_white')
-        st.plotly_chart(fig10, use_container_width=True)
+        st.plotly_chart(figures['fig10'], use_container_width=True)
     
     col1, col2 = st.columns(2)
     
     with col1:
-        fig11 = px.histogram(df_filtered, x='Average Rating', nbins=10,
-                            title='Rating Distribution',
-                            color_discrete_sequence=['#667eea'])
-        fig11.update_layout(height=400, template='plotly_white')
-        st.plotly_chart(fig11, use_container_width=True)
+        st.plotly_chart(figures['fig11'], use_container_width=True)
     
     with col2:
-        fig12 = px.scatter(df_filtered, x='Number of Ratings', y='Average Rating',
-                          size='Interaction Count', title='Ratings vs Interactions',
-                          color='Average Rating', color_continuous_scale='Purples')
-        fig12.update_layout(height=400, template='plotly_white')
-        st.plotly_chart(fig12, use_container_width=True)
+        st.plotly_chart(figures['fig12'], use_container_width=True)
 
 with tab4:
+    st.subheader("Live Chat Telemetry")
+    
+    telemetry = load_telemetry()
+    telemetry.refresh()
+    chat_daily = telemetry.daily()
+    if not chat_daily.empty:
+        chat_daily = chat_daily[(chat_daily['date'].dt.date >= range_start)
+                                & (chat_daily['date'].dt.date <= range_end)]
+    
+    if chat_daily.empty:
+        st.info("No chat telemetry in this date range yet. Events from /api/chat are flushed to "
+                "data/telemetry/ every few seconds while the server runs.")
+    else:
+        turns = chat_daily['turns'].sum()
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Chat Turns", f"{int(turns):,}")
+        
+        with col2:
+            st.metric("Avg Latency", f"{chat_daily['latency_ms'].sum() / turns:,.0f} ms")
+        
+        with col3:
+            st.metric("Fallback Rate", f"{chat_daily['fallback'].sum() / turns * 100:.1f}%")
+        
+        with col4:
+            st.metric("Cache Hit Rate", f"{chat_daily['cache'].sum() / turns * 100:.1f}%")
+        
+        chat_figures = telemetry_figures(chat_daily)
+        st.plotly_chart(chat_figures['turns'], use_container_width=True)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.plotly_chart(chat_figures['latency'], use_container_width=True)
+        
+        with col2:
+            st.plotly_chart(chat_figures['sources'], use_container_width=True)
+        
+        st.dataframe(chat_daily[['date', 'character', 'turns', 'sessions', 'avg_latency_ms', 'p95_latency_ms',
+                                 'fallback_rate', 'cache_rate']], use_container_width=True)
+
+with tab5:
     st.subheader("About EA Aura")
     
     st.markdown("""
@@ -263,6 +282,40 @@ with tab4:
 # Data Export
 st.markdown("---")
 with st.expander("📥 Export Data"):
-    st.dataframe(df_filtered, use_container_width=True)
-    csv = df_filtered.to_csv(index=False)
-    st.download_button("Download CSV", csv, "ea_aura_kpi_data.csv", "text/csv")
+    # One page of rows at a time instead of the whole range
+    total_rows = len(df_filtered)
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        page_size = st.selectbox("Rows per page", [25, 100, 500], key="export_page_size")
+    
+    pages = max(1, -(-total_rows // page_size))
+    
+    with col2:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, key="export_page")
+    
+    first_row = (int(page) - 1) * page_size
+    st.dataframe(df_filtered.iloc[first_row:first_row + page_size], use_container_width=True)
+    st.caption(f"Rows {min(first_row + 1, total_rows):,}–{min(first_row + page_size, total_rows):,} "
+               f"of {total_rows:,} · page {int(page)} of {pages}")
+    
+    export_rows = st.radio("Export", ["Rows", "Daily totals"], horizontal=True, key="export_rows")
+    
+    def export_data(fmt):
+        if export_rows == "Daily totals":
+            return export_file(daily_rollup(cube, range_start, range_end), fmt)
+        # Rows are sliced from the memory-mapped columnar copy of the loaded frame
+        source = load_export_source()
+        if source is None:
+            return export_file(df_filtered, fmt)
+        return export_rows_file(source, row_start, row_end, fmt)
+    
+    # Files are written chunk by chunk, and only when a button is clicked
+    export_name = "ea_aura_kpi_data" if export_rows == "Rows" else "ea_aura_kpi_daily"
+    columns = st.columns(len(available_formats()))
+    for column, fmt in zip(columns, available_formats()):
+        with column:
+            st.download_button(f"Download {fmt.upper() if fmt == 'csv' else fmt.title()}",
+                               lambda fmt=fmt: export_data(fmt),
+                               f"{export_name}.{fmt}", EXPORT_FORMATS[fmt],
+                               on_click="ignore", key=f"export_{fmt}")
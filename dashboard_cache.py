@@ -0,0 +1,177 @@
+"""
+Dashboard Data Cache for EA Aura KPI Dashboard
+Converts the Excel workbook once to a columnar file (Feather or Parquet) and
+serves later loads from it, memory-mapped, with optional column selection.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    feather = pq = None
+
+# Source data: the generated workbook, or an events file (CSV/Parquet) for load tests
+DATA_PATH = Path(os.getenv(
+    "AURA_DASHBOARD_DATA",
+    str(Path(__file__).parent / 'dashboard_dummy_data.xlsx')
+))
+CACHE_DIR = Path(os.getenv(
+    "AURA_DASHBOARD_CACHE_DIR",
+    str(Path(__file__).parent / ".cache" / "dashboard")
+))
+
+# "feather" (uncompressed, zero-copy memory map) or "parquet" (smaller on disk)
+AURA_DASHBOARD_CACHE_FORMAT = os.getenv("AURA_DASHBOARD_CACHE_FORMAT", "feather")
+
+# Bump when the conversion changes so stale caches are rebuilt
+CACHE_VERSION = 1
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_paths(source: Path, fmt: str = AURA_DASHBOARD_CACHE_FORMAT):
+    """Columnar data file and its metadata sidecar for a source workbook."""
+    data_path = CACHE_DIR / f"{source.stem}.{fmt}"
+    return data_path, data_path.with_name(data_path.name + ".json")
+
+
+def read_source(source: Path, columns: list = None) -> pd.DataFrame:
+    """Parse the original workbook (or CSV/Parquet events file) without the cache."""
+    if source.suffix.lower() == '.parquet':
+        return pd.read_parquet(source, columns=columns)
+    if source.suffix.lower() == '.csv':
+        return pd.read_csv(source, usecols=columns, parse_dates=['Date'])
+    return pd.read_excel(source, usecols=columns)
+
+
+def _source_state(source: Path) -> dict:
+    stat = source.stat()
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def _is_fresh(source: Path, data_path: Path, meta_path: Path, fmt: str) -> bool:
+    """
+    True if the cached file matches the source.
+
+    A matching mtime and size is trusted as-is. Otherwise the source is hashed,
+    so a touched but unchanged workbook only refreshes the metadata.
+    """
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if meta.get('version') != CACHE_VERSION or meta.get('format') != fmt or not data_path.exists():
+        return False
+
+    state = _source_state(source)
+    if meta.get('mtime_ns') == state['mtime_ns'] and meta.get('size') == state['size']:
+        return True
+    if meta.get('sha256') != file_sha256(source):
+        return False
+    _write_meta(meta_path, dict(meta, **state))
+    return True
+
+
+def _write_meta(meta_path: Path, meta: dict) -> None:
+    tmp_path = meta_path.with_name(meta_path.name + '.tmp')
+    tmp_path.write_text(json.dumps(meta), encoding='utf-8')
+    os.replace(tmp_path, meta_path)
+
+
+def convert(source: Path = DATA_PATH, fmt: str = AURA_DASHBOARD_CACHE_FORMAT) -> Path:
+    """
+    Parse the workbook once and write it in columnar form.
+
+    Returns:
+        Path: The columnar file, or None if pyarrow is not installed
+    """
+    if feather is None:
+        return None
+    data_path, meta_path = cache_paths(source, fmt)
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+
+    state = _source_state(source)
+    df = read_source(source)
+    write_columnar(df, data_path, fmt)
+
+    _write_meta(meta_path, {
+        'version': CACHE_VERSION,
+        'format': fmt,
+        'sha256': file_sha256(source),
+        'rows': len(df),
+        **state,
+    })
+    return data_path
+
+
+def write_columnar(df: pd.DataFrame, data_path: Path, fmt: str = AURA_DASHBOARD_CACHE_FORMAT) -> None:
+    """Write a frame to a columnar file, replacing any existing file atomically."""
+    tmp_path = data_path.with_name(data_path.name + '.tmp')
+    if fmt == 'parquet':
+        df.to_parquet(tmp_path, index=False)
+    else:
+        feather.write_feather(df, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, data_path)
+
+
+def iter_columnar(data_path: Path, row_start: int, row_end: int, chunk_rows: int,
+                  fmt: str = AURA_DASHBOARD_CACHE_FORMAT, columns: list = None):
+    """
+    Rows row_start..row_end of a columnar file as DataFrames of at most
+    chunk_rows rows. Feather slices are read straight from the memory map;
+    an empty range yields one empty frame, so the columns are still known.
+    """
+    if fmt == 'parquet':
+        table = pq.read_table(data_path, columns=columns, memory_map=True)
+    else:
+        table = feather.read_table(data_path, columns=columns, memory_map=True)
+    table = table.slice(row_start, max(0, row_end - row_start))
+    if table.num_rows == 0:
+        yield table.to_pandas()
+        return
+    for offset in range(0, table.num_rows, chunk_rows):
+        yield table.slice(offset, chunk_rows).to_pandas()
+
+
+def read_columnar(data_path: Path, columns: list = None, fmt: str = AURA_DASHBOARD_CACHE_FORMAT) -> pd.DataFrame:
+    """Read selected columns from a columnar file through a memory map."""
+    if fmt == 'parquet':
+        table = pq.read_table(data_path, columns=columns, memory_map=True)
+    else:
+        table = feather.read_table(data_path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def load_frame(source: Path = DATA_PATH, columns: list = None,
+               fmt: str = AURA_DASHBOARD_CACHE_FORMAT) -> pd.DataFrame:
+    """
+    Load dashboard data, converting the workbook to the columnar cache first
+    if it is missing or stale. Falls back to parsing the workbook directly
+    when pyarrow is not installed.
+
+    Args:
+        source: Excel workbook (or CSV/Parquet) the cache is built from
+        columns: Columns to load (default: all)
+        fmt: "feather" or "parquet"
+    """
+    if feather is None:
+        return read_source(source, columns)
+
+    data_path, meta_path = cache_paths(source, fmt)
+    if not _is_fresh(source, data_path, meta_path, fmt):
+        convert(source, fmt)
+    return read_columnar(data_path, columns, fmt)
@@ -0,0 +1,230 @@
+"""
+Dashboard Charts for EA Aura KPI Dashboard
+Builds the dashboard's Plotly figures with a bounded number of points per
+chart: LTTB-downsampled time series, server-side histogram bins and
+period-aggregated bars.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Default cap on points sent per chart (0 disables downsampling)
+AURA_DASHBOARD_MAX_POINTS = int(os.getenv("AURA_DASHBOARD_MAX_POINTS", "1000"))
+
+CHART_HEIGHT = 400
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each of `threshold - 2` equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the average of the next bucket. Peaks and
+    troughs survive, unlike with stride sampling.
+
+    Args:
+        x: Sorted x values (numeric or datetime64)
+        y: y values
+        threshold: Number of points to keep
+
+    Returns:
+        np.ndarray: Indices of the kept points, ascending
+    """
+    n = len(x)
+    if threshold <= 0 or threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = x.astype('datetime64[ns]').astype(np.int64).astype(np.float64) if np.issubdtype(x.dtype, np.datetime64) \
+        else x.astype(np.float64)
+    y = np.nan_to_num(y.astype(np.float64))
+
+    every = (n - 2) / (threshold - 2)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def downsample(df: pd.DataFrame, x: str, y: str, max_points: int) -> pd.DataFrame:
+    """Rows of `df` kept by LTTB on (x, y), or `df` itself if it is small enough."""
+    if not max_points or len(df) <= max_points:
+        return df
+    return df.iloc[lttb_indices(df[x].to_numpy(), df[y].to_numpy(), max_points)]
+
+
+def downsample_long(df: pd.DataFrame, x: str, ys: list, max_points: int) -> pd.DataFrame:
+    """Each y column downsampled on its own, stacked long-form as (x, variable, value)."""
+    parts = []
+    for y in ys:
+        part = downsample(df[[x, y]], x, y, max_points).rename(columns={y: 'value'})
+        parts.append(part.assign(variable=y))
+    return pd.concat(parts, ignore_index=True)
+
+
+def histogram_figure(values: pd.Series, nbins: int, title: str, color: str) -> go.Figure:
+    """Histogram binned here (np.histogram) so only `nbins` bars are sent."""
+    name = values.name
+    values = values.dropna().to_numpy()
+    counts, edges = np.histogram(values, bins=nbins) if len(values) else (np.array([]), np.array([0.0]))
+    figure = go.Figure(data=[go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color=color,
+    )])
+    figure.update_layout(title=title, xaxis_title=name, yaxis_title='count', bargap=0.02)
+    return figure
+
+
+def period_sums(cube, start, end, columns: list, max_points: int) -> pd.DataFrame:
+    """Per-period sums from the cube at the finest level (day, week, month) within the cap."""
+    for level in ('day', 'week', 'month'):
+        frame = cube.period_sums(columns, start, end, level)
+        if not max_points or len(frame) <= max_points:
+            break
+    return frame
+
+
+def build_figures(df: pd.DataFrame, cube, kpis: dict, start, end,
+                  max_points: int = AURA_DASHBOARD_MAX_POINTS) -> dict:
+    """
+    Build all dashboard figures for the filtered frame.
+
+    Args:
+        df: Rows in the selected date range, sorted by 'Date'
+        cube: KPICube over the full frame
+        kpis: cube.kpis(start, end)
+        start, end: Selected date range (inclusive)
+        max_points: Cap on points per chart (0 sends every row)
+
+    Returns:
+        dict: {"fig1": Figure, ..., "fig12": Figure}; "fig7" is omitted when
+        the frame has no 'Character Interacted' column
+    """
+    figures = {}
+
+    figures['fig1'] = px.area(downsample(df, 'Date', 'Daily Active Users', max_points),
+                              x='Date', y='Daily Active Users',
+                              title='Daily Active Users',
+                              color_discrete_sequence=['#667eea'])
+
+    figures['fig2'] = px.area(downsample(df, 'Date', 'Monthly Active Users', max_points),
+                              x='Date', y='Monthly Active Users',
+                              title='Monthly Active Users',
+                              color_discrete_sequence=['#764ba2'])
+
+    figures['fig3'] = px.line(downsample_long(df, 'Date', ['Total Sessions', 'Sessions with Voice Interaction'],
+                                              max_points),
+                              x='Date', y='value', color='variable',
+                              title='Session Activity', markers=True)
+
+    duration_count = pd.cut(df['Duration (minutes)'],
+                            bins=[0, 30, 60, 120],
+                            labels=['0-30min', '30-60min', '60+min']).value_counts()
+    figures['fig4'] = go.Figure(data=[
+        go.Bar(x=duration_count.index, y=duration_count.values,
+               marker_color=['#667eea', '#764ba2', '#f093fb'])
+    ])
+    figures['fig4'].update_layout(title='Session Duration')
+
+    figures['fig5'] = go.Figure(data=[
+        go.Funnel(
+            y=['New Users', 'Retained (30 days)'],
+            x=[kpis['new_users'], kpis['retained_users']],
+            marker=dict(color=['#667eea', '#764ba2'])
+        )
+    ])
+    figures['fig5'].update_layout(title=f"Retention Funnel ({kpis['retention_pct']:.1f}%)")
+
+    figures['fig6'] = histogram_figure(df['Interaction Count'], 20, 'Interaction Distribution', '#764ba2')
+
+    if 'Character Interacted' in df.columns:
+        # Bars for the same x stack, so per-value totals draw the same heights
+        interactions = df.groupby('Character Interacted', as_index=False)['Interaction Count'].sum()
+        figures['fig7'] = px.bar(interactions, x='Character Interacted', y='Interaction Count',
+                                 title='Character Interactions',
+                                 color='Interaction Count', color_continuous_scale='Purples')
+
+    voice_trend = df[['Date']].assign(
+        Voice_Pct=df['Users Adopting Voice Features'] / df['Total Users'] * 100
+    )
+    figures['fig8'] = px.area(downsample(voice_trend, 'Date', 'Voice_Pct', max_points),
+                              x='Date', y='Voice_Pct',
+                              title='Voice Feature Adoption %',
+                              color_discrete_sequence=['#f093fb'])
+
+    feedback = period_sums(cube, start, end, ['Total Feedback Responses', 'Satisfied Responses'], max_points)
+    figures['fig9'] = px.bar(feedback, x='Date',
+                             y=['Total Feedback Responses', 'Satisfied Responses'],
+                             title='Feedback Responses', barmode='group')
+
+    figures['fig10'] = go.Figure(data=[go.Indicator(
+        mode="gauge+number",
+        value=kpis['satisfaction_rate'],
+        title={'text': "Satisfaction Rate (%)"},
+        gauge={'axis': {'range': [0, 100]},
+               'bar': {'color': "#667eea"},
+               'steps': [
+                   {'range': [0, 50], 'color': "#ffcccb"},
+                   {'range': [50, 80], 'color': "#fffacd"},
+                   {'range': [80, 100], 'color': "#90EE90"}],
+               'threshold': {
+                   'line': {'color': "green", 'width': 4},
+                   'thickness': 0.75,
+                   'value': 85}}
+    )])
+
+    figures['fig11'] = histogram_figure(df['Average Rating'], 10, 'Rating Distribution', '#667eea')
+
+    # A scatter has no x order to preserve; a fixed-seed sample keeps reruns stable
+    scatter = df.sample(n=max_points, random_state=0) if max_points and len(df) > max_points else df
+    figures['fig12'] = px.scatter(scatter, x='Number of Ratings', y='Average Rating',
+                                  size='Interaction Count', title='Ratings vs Interactions',
+                                  color='Average Rating', color_continuous_scale='Purples')
+
+    for figure in figures.values():
+        figure.update_layout(height=CHART_HEIGHT, template='plotly_white')
+    return figures
+
+
+def telemetry_figures(daily: pd.DataFrame) -> dict:
+    """
+    Figures for the live chat telemetry tab.
+
+    Args:
+        daily: TelemetryAggregator.daily() output
+
+    Returns:
+        dict: {"turns": Figure, "latency": Figure, "sources": Figure}
+    """
+    figures = {}
+    figures['turns'] = px.bar(daily, x='date', y='turns', color='character',
+                              title='Chat Turns per Day by Character')
+
+    by_day = daily.groupby('date', as_index=False)[['turns', 'latency_ms']].sum()
+    by_day['avg_latency_ms'] = by_day['latency_ms'] / by_day['turns']
+    figures['latency'] = px.line(by_day, x='date', y='avg_latency_ms', markers=True,
+                                 title='Average Turn Latency (ms)',
+                                 color_discrete_sequence=['#764ba2'])
+
+    sources = daily.groupby('character')[['upstream', 'cache', 'fallback', 'error']].sum().reset_index()
+    figures['sources'] = px.bar(sources, x='character', y=['upstream', 'cache', 'fallback', 'error'],
+                                title='Reply Source by Character', barmode='stack')
+
+    for figure in figures.values():
+        figure.update_layout(height=CHART_HEIGHT, template='plotly_white')
+    return figures
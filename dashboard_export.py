@@ -0,0 +1,221 @@
+"""
+Dashboard Export for EA Aura KPI Dashboard
+Writes the selected rows (or per-day rollups) to CSV or Parquet in fixed-size
+chunks. CSV is produced lazily, chunk by chunk, from the memory-mapped
+columnar copy of the dashboard rows.
+"""
+import io
+import itertools
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard_cache import AURA_DASHBOARD_CACHE_FORMAT, CACHE_DIR, iter_columnar, write_columnar
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Rows converted and written per chunk
+AURA_DASHBOARD_EXPORT_CHUNK_ROWS = int(os.getenv("AURA_DASHBOARD_EXPORT_CHUNK_ROWS", "100000"))
+
+FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def available_formats() -> list:
+    """Export formats usable here (Parquet needs pyarrow)."""
+    return [fmt for fmt in FORMATS if fmt != 'parquet' or pq is not None]
+
+
+def iter_chunks(df: pd.DataFrame, chunk_rows: int = AURA_DASHBOARD_EXPORT_CHUNK_ROWS):
+    """Consecutive row slices of `df` (views, not copies); an empty frame is yielded as is."""
+    if len(df) == 0:
+        yield df
+        return
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+# strftime formats matching how to_csv() prints a datetime column of each resolution
+_DATETIME_FORMATS = {
+    'day': '%Y-%m-%d',
+    'millisecond': '%Y-%m-%d %H:%M:%S.%f',
+    'microsecond': '%Y-%m-%d %H:%M:%S.%f',
+    'nanosecond': '%Y-%m-%d %H:%M:%S.%f',
+}
+
+
+def datetime_resolutions(df: pd.DataFrame) -> dict:
+    """Resolution ("day", "second", "millisecond", ...) of each timezone-naive datetime column."""
+    return {
+        column: pd.DatetimeIndex(values).resolution
+        for column, values in df.items()
+        if pd.api.types.is_datetime64_dtype(values.dtype)
+    }
+
+
+def _format_datetimes(values: pd.Series, resolution: str) -> pd.Series:
+    text = values.dt.strftime(_DATETIME_FORMATS.get(resolution, '%Y-%m-%d %H:%M:%S'))
+    if resolution == 'millisecond':
+        return text.str[:-3]
+    if resolution == 'nanosecond':
+        return text + values.dt.nanosecond.astype(str).str.zfill(3)
+    return text
+
+
+def iter_csv(chunks, resolutions: dict = None):
+    """
+    Encoded CSV for a sequence of frames, one piece per frame, with the header
+    on the first piece only.
+
+    to_csv() picks a datetime column's format from the values it is given, so
+    a chunk of midnight timestamps would print bare dates. Pass the columns'
+    resolutions over the whole export (datetime_resolutions()) and every chunk
+    is printed in that one format; the pieces then join to the bytes of
+    pd.concat(chunks).to_csv(index=False).
+    """
+    for index, chunk in enumerate(chunks):
+        if resolutions:
+            chunk = chunk.assign(**{column: _format_datetimes(chunk[column], resolution)
+                                    for column, resolution in resolutions.items()})
+        yield chunk.to_csv(index=False, header=index == 0).encode('utf-8')
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    Read-only file object over an iterator of byte chunks, so the download
+    button can consume a generator. Chunks are pulled only as they are read.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = b''
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        # Streamlit rewinds before reading; only a no-op rewind is possible
+        if offset == 0 and whence == io.SEEK_SET and self._position == 0:
+            return 0
+        raise io.UnsupportedOperation("ChunkReader can only be read forward")
+
+    def tell(self) -> int:
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b''
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        self._position += size
+        return size
+
+
+def write_export(df: pd.DataFrame, fmt: str, buffer, chunk_rows: int = AURA_DASHBOARD_EXPORT_CHUNK_ROWS) -> int:
+    """
+    Write `df` to a binary file object chunk by chunk.
+
+    CSV chunks are appended with the header on the first one only, matching
+    df.to_csv(index=False). Parquet chunks become row groups of one file.
+
+    Returns:
+        int: Rows written
+
+    Raises:
+        ValueError: For an unknown or unavailable format
+    """
+    if fmt not in available_formats():
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    rows = 0
+    if fmt == 'csv':
+        for piece in iter_csv(iter_chunks(df, chunk_rows), datetime_resolutions(df)):
+            buffer.write(piece)
+        return len(df)
+
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(buffer, schema) as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    return rows
+
+
+def export_file(df: pd.DataFrame, fmt: str, chunk_rows: int = AURA_DASHBOARD_EXPORT_CHUNK_ROWS):
+    """
+    The export as a file object for st.download_button.
+
+    CSV is a ChunkReader that converts one chunk at a time as it is read.
+    Parquet writes its footer only when the file is closed, so it is built in
+    a BytesIO, one row group per chunk, and rewound to the start.
+    """
+    if fmt == 'csv':
+        return ChunkReader(iter_csv(iter_chunks(df, chunk_rows), datetime_resolutions(df)))
+    buffer = io.BytesIO()
+    write_export(df, fmt, buffer, chunk_rows)
+    buffer.seek(0)
+    return buffer
+
+
+def write_export_source(df: pd.DataFrame, name: str, fmt: str = AURA_DASHBOARD_CACHE_FORMAT) -> Path:
+    """
+    Write the dashboard rows, as loaded and prepared, to a columnar file that
+    row exports read back in slices.
+
+    Returns:
+        Path: The columnar file, or None if pyarrow is not installed
+    """
+    if pq is None:
+        return None
+    data_path = CACHE_DIR / f"{name}.export.{fmt}"
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    write_columnar(df, data_path, fmt)
+    return data_path
+
+
+def export_rows_file(source: Path, row_start: int, row_end: int, fmt: str,
+                     chunk_rows: int = AURA_DASHBOARD_EXPORT_CHUNK_ROWS,
+                     source_fmt: str = AURA_DASHBOARD_CACHE_FORMAT):
+    """
+    Rows row_start..row_end of a columnar export source as a download file
+    object; CSV streams straight from the file's memory map.
+    """
+    if fmt not in available_formats():
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if fmt == 'csv':
+        # Only the datetime columns of the range are read up front, for their resolutions
+        empty = next(iter_columnar(source, row_start, row_start, chunk_rows, source_fmt))
+        dates = list(datetime_resolutions(empty))
+        span = max(1, row_end - row_start)
+        resolutions = datetime_resolutions(next(iter_columnar(source, row_start, row_end, span, source_fmt, dates)))
+        return ChunkReader(iter_csv(iter_columnar(source, row_start, row_end, chunk_rows, source_fmt), resolutions))
+    chunks = iter_columnar(source, row_start, row_end, chunk_rows, source_fmt)
+    first = next(chunks)
+    schema = pa.Schema.from_pandas(first, preserve_index=False)
+    buffer = io.BytesIO()
+    with pq.ParquetWriter(buffer, schema) as writer:
+        for chunk in itertools.chain([first], chunks):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    buffer.seek(0)
+    return buffer
+
+
+def daily_rollup(cube, start, end) -> pd.DataFrame:
+    """Per-day row counts and column sums for start..end, straight from the KPI cube."""
+    frame = cube.period_sums(cube.columns, start, end, 'day')
+    i, j = cube.day_span(start, end)
+    counts = cube.levels['day']['count']
+    frame.insert(1, 'Rows', counts[i + 1:j + 1] - counts[i:j])
+    return frame
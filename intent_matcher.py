@@ -0,0 +1,206 @@
+"""
+Intent Matcher for EA Aura Wellness Assistant
+Precompiled single-pass keyword matcher behind the offline fallback responses.
+"""
+import json
+import os
+import re
+from pathlib import Path
+
+# Extra intents are loaded from this JSON file when it exists
+AURA_INTENTS_FILE = os.getenv(
+    "AURA_INTENTS_FILE",
+    str(Path(__file__).parent / "data" / "intents.json")
+)
+
+# Built-in intents, in priority order (the first intent that matches wins).
+# "substring" keeps the original chain's matching: a keyword may appear
+# anywhere in the text ("unmotivated" -> goals, "ate" -> nutrition).
+FALLBACK_INTENTS = [
+    {
+        "name": "stress",
+        "keywords": ["stress", "anxious", "anxiety", "worried"],
+        "substring": True,
+        "response": "🧘 I understand you're feeling stressed. Try the 4-7-8 breathing technique: inhale for 4 counts, hold for 7, exhale for 8. This activates your parasympathetic nervous system for instant calm."
+    },
+    {
+        "name": "sleep",
+        "keywords": ["sleep", "tired", "exhausted", "fatigue"],
+        "substring": True,
+        "response": "😴 Sleep is crucial for recovery! Aim for 7-9 hours. Try creating a wind-down ritual: dim lights 1 hour before bed, no screens 30 minutes prior, and practice gratitude breathing."
+    },
+    {
+        "name": "focus",
+        "keywords": ["focus", "concentrate", "distracted"],
+        "substring": True,
+        "response": "🎯 Let's optimize your focus! Try the Pomodoro Technique: 25-minute deep work blocks with 5-minute breaks. Eliminate distractions and single-task for better quality output."
+    },
+    {
+        "name": "movement",
+        "keywords": ["exercise", "movement", "workout", "steps"],
+        "substring": True,
+        "response": "🏃 Movement is medicine! Aim for 8,000-10,000 steps daily. For game developers, take desk breaks every 30 minutes and try the 20-20-20 rule for eye health."
+    },
+    {
+        "name": "goals",
+        "keywords": ["goal", "motivation", "motivated"],
+        "substring": True,
+        "response": "🎯 Let's set SMART goals! Make them Specific, Measurable, Achievable, Relevant, and Time-bound. Break big goals into daily actions and celebrate small wins!"
+    },
+    {
+        "name": "nutrition",
+        "keywords": ["food", "nutrition", "eat", "diet"],
+        "substring": True,
+        "response": "🥗 Fuel your body right! Aim for 50% vegetables/fruits, 25% lean proteins, 25% whole grains. Stay hydrated with 8-10 glasses of water daily!"
+    },
+]
+
+DEFAULT_FALLBACK_RESPONSE = "✨ I'm here to support your wellness journey! What specific area would you like to focus on - physical health, mental wellness, productivity, social connections, or finding purpose?"
+
+
+_WORD = re.compile(r"\w+")
+
+# Upper bound on the per-matcher word -> intents memo before it is reset
+_WORD_MEMO_LIMIT = 20000
+
+
+class IntentMatcher:
+    """
+    Matches every intent in one pass over the words of the input text.
+
+    Each distinct word is resolved once to the intents whose keywords it
+    contains and memoized, so a message costs a dict lookup per word however
+    many intents are loaded. Intents marked "substring" (the built-ins) match
+    a keyword anywhere inside a word, exactly like the original any() chain.
+    Other intents match at a word start and may carry a suffix, so "lonely"
+    matches "loneliness" but not "unlonely". Keywords containing spaces or
+    punctuation are matched as plain substrings of the whole message.
+
+    The first matching intent in priority order wins, as in the original
+    chain; scores() reports every intent that matched.
+
+    Args:
+        intents: List of {"name", "keywords", "response"[, "substring"]} dicts in priority order
+        default_response: Returned when no intent matches
+    """
+
+    def __init__(self, intents: list, default_response: str = DEFAULT_FALLBACK_RESPONSE):
+        self.intents = intents
+        self.default_response = default_response
+        self._substrings, self._prefixes, self._lengths, self._phrases = self._compile(intents)
+        self._word_memo = {}
+
+    @staticmethod
+    def _compile(intents: list):
+        """
+        Split the keywords into (keyword, index) substring pairs, a word-start
+        prefix table of keyword -> indices with its sorted lengths, and
+        (phrase, index) pairs for keywords that span several words.
+        """
+        substrings, prefixes, phrases = [], {}, []
+        for index, intent in enumerate(intents):
+            for keyword in intent["keywords"]:
+                keyword = keyword.lower()
+                if _WORD.fullmatch(keyword) is None:
+                    phrases.append((keyword, index))
+                elif intent.get("substring"):
+                    substrings.append((keyword, index))
+                else:
+                    prefixes.setdefault(keyword, set()).add(index)
+        return substrings, prefixes, sorted({len(k) for k in prefixes}), phrases
+
+    def _word_intents(self, word: str) -> tuple:
+        """Sorted indices of the intents with a keyword in `word`."""
+        found = self._word_memo.get(word)
+        if found is not None:
+            return found
+
+        matched = {index for keyword, index in self._substrings if keyword in word}
+        for length in self._lengths:
+            if length > len(word):
+                break
+            matched.update(self._prefixes.get(word[:length], ()))
+
+        found = tuple(sorted(matched))
+        if len(self._word_memo) >= _WORD_MEMO_LIMIT:
+            self._word_memo.clear()
+        self._word_memo[word] = found
+        return found
+
+    def _hits(self, text: str) -> dict:
+        """Return {intent_index: matching_word_count} from a single scan of `text`."""
+        text = text.lower()
+        hits = {}
+        for word in _WORD.findall(text):
+            for index in self._word_intents(word):
+                hits[index] = hits.get(index, 0) + 1
+        for phrase, index in self._phrases:
+            if phrase in text:
+                hits[index] = hits.get(index, 0) + 1
+        return hits
+
+    def scores(self, text: str) -> dict:
+        """Return {intent_name: keyword_hit_count} for every intent that matched."""
+        hits = self._hits(text)
+        return {self.intents[index]["name"]: count for index, count in sorted(hits.items())}
+
+    def match(self, text: str):
+        """Return the first intent in priority order that matched, or None."""
+        text = text.lower()
+        best = len(self.intents)
+        memo = self._word_memo
+        for word in _WORD.findall(text):
+            found = memo.get(word)
+            if found is None:
+                found = self._word_intents(word)
+            if found and found[0] < best:
+                best = found[0]
+                if best == 0:
+                    break
+        for phrase, index in self._phrases:
+            if index < best and phrase in text:
+                best = index
+        return self.intents[best] if best < len(self.intents) else None
+
+    def respond(self, text: str) -> str:
+        """Return the matching intent's response, or the default response."""
+        intent = self.match(text)
+        return intent["response"] if intent else self.default_response
+
+    @classmethod
+    def from_file(cls, path: str = AURA_INTENTS_FILE, base_intents: list = None):
+        """
+        Build a matcher from the built-in intents plus those in a JSON file.
+
+        The file holds a list of intents in the same shape as FALLBACK_INTENTS.
+        An entry whose name matches a built-in intent adds keywords to it (and
+        replaces its response if one is given), matched the way that intent
+        already matches; new names are appended after the built-ins and match
+        at word starts unless they set "substring": true.
+        """
+        intents = [dict(intent, keywords=list(intent["keywords"]))
+                   for intent in (base_intents if base_intents is not None else FALLBACK_INTENTS)]
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                extra = json.load(f)
+        except FileNotFoundError:
+            extra = []
+        except (OSError, ValueError) as e:
+            print(f"Intent file error ({path}): {e}")
+            extra = []
+
+        by_name = {intent["name"]: intent for intent in intents}
+        for entry in extra:
+            existing = by_name.get(entry["name"])
+            if existing is None:
+                intent = {"name": entry["name"], "keywords": list(entry["keywords"]), "response": entry["response"],
+                          "substring": bool(entry.get("substring"))}
+                intents.append(intent)
+                by_name[intent["name"]] = intent
+            else:
+                existing["keywords"].extend(entry.get("keywords", []))
+                if entry.get("response"):
+                    existing["response"] = entry["response"]
+
+        return cls(intents)
@@ -0,0 +1,210 @@
+"""
+Knowledge Index for EA Aura Wellness Assistant
+In-process BM25 retrieval over AI_Coaching_Pillars_Guide.md, chunked by pillar
+and section, so prompts carry only the few snippets relevant to each message.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+from pathlib import Path
+
+GUIDE_PATH = Path(__file__).parent / "AI_Coaching_Pillars_Guide.md"
+INDEX_CACHE_PATH = Path(os.getenv(
+    "AURA_KNOWLEDGE_CACHE",
+    str(Path(__file__).parent / ".cache" / "knowledge_index.json")
+))
+
+# Bump when chunking or tokenization changes so stale caches are rebuilt
+INDEX_VERSION = 1
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_HEADING = re.compile(r"^(#{2,4})\s+(.*)$")
+_TOKEN = re.compile(r"[a-z0-9]+")
+_HEADING_NOISE = re.compile(r"[^\w\s&()\-:,'/.]")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do for from has have how i if in into is it its
+me my of on or so that the their them then there these this to was we what when
+which who will with you your just about any some more most very
+""".split())
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)."""
+    return max(1, len(text) // 4)
+
+
+def _stem(word: str) -> str:
+    """Very light suffix stripping so 'stressed'/'stressful' meet 'stress'."""
+    for suffix in ("ment", "ing", "ful", "ed", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> list:
+    """Lowercase, split into words, drop stopwords and stem."""
+    return [_stem(t) for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _clean_heading(heading: str) -> str:
+    """Strip markdown emphasis, emoji and pillar numbering from a heading."""
+    text = _HEADING_NOISE.sub("", heading.replace("**", ""))
+    return re.sub(r"^\d+\s*", "", text).strip()
+
+
+def chunk_guide(text: str) -> list:
+    """
+    Split the guide into one chunk per pillar/section heading.
+
+    Returns:
+        list: [{"title": "Physical Wellness Pillar › Sleep Optimization", "text": ...}, ...]
+        where the title is the chunk's heading and its parent heading
+    """
+    chunks = []
+    path = {}
+    body = []
+
+    def flush():
+        content = "\n".join(line for line in body if line.strip() and line.strip() != "---")
+        if content:
+            title = " › ".join(path[level] for level in sorted(path)[-2:])
+            chunks.append({"title": title, "text": content.replace("**", "")})
+        body.clear()
+
+    for line in text.splitlines():
+        match = _HEADING.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            path = {lvl: name for lvl, name in path.items() if lvl < level}
+            path[level] = _clean_heading(match.group(2))
+        elif path:
+            body.append(line.rstrip())
+
+    flush()
+    return chunks
+
+
+class KnowledgeIndex:
+    """
+    BM25 index over guide chunks with an inverted posting list per term.
+
+    Args:
+        chunks: Chunk dicts with "title", "text" and "tf" (term -> frequency)
+    """
+
+    def __init__(self, chunks: list):
+        self.chunks = chunks
+        self.doc_lengths = [sum(chunk["tf"].values()) for chunk in chunks]
+        self.avg_length = (sum(self.doc_lengths) / len(chunks)) if chunks else 0.0
+
+        self.postings = {}
+        for doc_id, chunk in enumerate(chunks):
+            for term, freq in chunk["tf"].items():
+                self.postings.setdefault(term, []).append((doc_id, freq))
+
+        n = len(chunks)
+        self.idf = {
+            term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    @classmethod
+    def from_text(cls, text: str):
+        """Chunk and tokenize guide text into a new index."""
+        chunks = []
+        for chunk in chunk_guide(text):
+            tf = {}
+            for term in tokenize(chunk["title"] + " " + chunk["text"]):
+                tf[term] = tf.get(term, 0) + 1
+            chunks.append(dict(chunk, tf=tf))
+        return cls(chunks)
+
+    def search(self, query: str, k: int = 3) -> list:
+        """
+        Rank chunks against a query with BM25.
+
+        Returns:
+            list: Up to k (score, chunk) tuples, best first
+        """
+        scores = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, freq in self.postings[term]:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / self.avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (BM25_K1 + 1) / (freq + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(score, self.chunks[doc_id]) for doc_id, score in ranked]
+
+    def retrieve(self, query: str, k: int = 3, token_budget: int = 300, min_score: float = 1.0) -> list:
+        """
+        Return the top-k chunks that fit within `token_budget` estimated tokens.
+
+        The best chunk is truncated to the budget if it alone exceeds it; later
+        chunks that do not fit are skipped.
+        """
+        selected = []
+        remaining = token_budget
+        for score, chunk in self.search(query, k):
+            if score < min_score:
+                break
+            snippet = f"{chunk['title']}\n{chunk['text']}"
+            cost = estimate_tokens(snippet)
+            if cost > remaining:
+                if selected:
+                    continue
+                snippet = snippet[:remaining * 4].rsplit("\n", 1)[0]
+                cost = estimate_tokens(snippet)
+            selected.append({"title": chunk["title"], "text": snippet, "score": round(score, 3)})
+            remaining -= cost
+            if remaining <= 0:
+                break
+        return selected
+
+    def to_dict(self, source_hash: str) -> dict:
+        """Serializable form for the on-disk cache."""
+        return {"version": INDEX_VERSION, "source_sha256": source_hash, "chunks": self.chunks}
+
+
+def load_knowledge_index(guide_path: Path = GUIDE_PATH, cache_path: Path = INDEX_CACHE_PATH):
+    """
+    Load the index from the disk cache, rebuilding it if the guide changed.
+
+    Returns:
+        KnowledgeIndex, or None if the guide is missing
+    """
+    try:
+        text = guide_path.read_text(encoding="utf-8")
+    except OSError as e:
+        print(f"Knowledge guide unavailable ({guide_path}): {e}")
+        return None
+
+    source_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("version") == INDEX_VERSION and cached.get("source_sha256") == source_hash:
+            return KnowledgeIndex(cached["chunks"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = KnowledgeIndex.from_text(text)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index.to_dict(source_hash), f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Knowledge index cache not written ({cache_path}): {e}")
+    return index
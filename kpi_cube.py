@@ -0,0 +1,224 @@
+"""
+KPI Cube for EA Aura KPI Dashboard
+Day/week/month cumulative sums over the dashboard frame, so any date-range
+KPI query is two binary searches and a handful of subtractions.
+"""
+import numpy as np
+import pandas as pd
+
+# Columns summed into the cube (missing optional columns are skipped)
+SUM_COLUMNS = (
+    'Daily Active Users',
+    'Monthly Active Users',
+    'Total Users',
+    'Users Adopting Voice Features',
+    'Total Feedback Responses',
+    'Satisfied Responses',
+    'New Users (Day 0)',
+    'Retained Users (Day 30)',
+    'Average Rating',
+)
+
+LEVELS = ('day', 'week', 'month')
+
+
+def _exact_values(values: np.ndarray):
+    """
+    Values in a form whose cumulative sums are exact.
+
+    Integer columns stay int64. Float columns with at most two decimals (e.g.
+    ratings) are summed as int64 hundredths; other floats are summed as-is.
+
+    Returns:
+        tuple: (array to sum, scale to divide sums by)
+    """
+    if np.issubdtype(values.dtype, np.integer):
+        return values.astype(np.int64), 1
+    cents = np.round(values * 100)
+    if np.all(np.isfinite(values)) and np.array_equal(cents / 100, values):
+        return cents.astype(np.int64), 100
+    return values.astype(np.float64), 1
+
+
+class KPICube:
+    """
+    Precomputed rollups of the dashboard frame for O(log n) range queries.
+
+    The frame must be sorted by 'Date'. Rows are grouped by calendar day; each
+    level (day, week starting Monday, month) stores its period start dates and
+    cumulative row counts and column sums, so the total over any span of
+    periods is cum[end] - cum[start]. Range queries use the day level; the
+    coarser levels back weekly and monthly trend series.
+
+    Args:
+        df: Dashboard frame sorted by 'Date'
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        row_days = df['Date'].values.astype('datetime64[D]')
+        self.days, self._day_first_row, day_counts = np.unique(row_days, return_index=True, return_counts=True)
+        self._day_last_row = self._day_first_row + day_counts - 1
+        self.rows = len(df)
+
+        self.columns = [c for c in SUM_COLUMNS if c in df.columns]
+        self._scale = {}
+        # Float columns: means come from pandas over the row span, since its
+        # summation order (not the exact sum) decides the last digit shown
+        self._float_columns = {c: df[c].reset_index(drop=True) for c in self.columns
+                               if not np.issubdtype(df[c].dtype, np.integer)}
+        day_sums = {}
+        for column in self.columns:
+            values, self._scale[column] = _exact_values(df[column].to_numpy())
+            day_sums[column] = (np.add.reduceat(values, self._day_first_row) if len(values)
+                                else values[:0])
+
+        # First/last row values for period-over-period change
+        dau = df['Daily Active Users'].to_numpy()
+        self._dau_first = dau[self._day_first_row]
+        self._dau_last = dau[self._day_last_row]
+
+        self.levels = {}
+        for level in LEVELS:
+            starts, first_day = np.unique(self._period_keys(self.days, level), return_index=True)
+            self.levels[level] = {
+                'starts': starts,
+                'count': self._cumulative(np.add.reduceat(day_counts, first_day) if len(first_day) else day_counts),
+                **{c: self._cumulative(np.add.reduceat(day_sums[c], first_day) if len(first_day) else day_sums[c])
+                   for c in self.columns},
+            }
+
+    @staticmethod
+    def _period_keys(days: np.ndarray, level: str) -> np.ndarray:
+        """Start date of the day/week/month period each day falls in."""
+        if level == 'day':
+            return days
+        if level == 'week':
+            # 1970-01-01 was a Thursday; shift so weeks start on Monday
+            return days - (days.astype(np.int64) + 3) % 7
+        return days.astype('datetime64[M]').astype('datetime64[D]')
+
+    @staticmethod
+    def _cumulative(values: np.ndarray) -> np.ndarray:
+        return np.concatenate(([0], np.cumsum(values)))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame):
+        """Build a cube, sorting by 'Date' first if needed."""
+        if not df['Date'].is_monotonic_increasing:
+            df = df.sort_values('Date', kind='stable').reset_index(drop=True)
+        return cls(df)
+
+    def day_span(self, start, end):
+        """Day-level indices [i, j) covering dates start..end inclusive."""
+        i = int(np.searchsorted(self.days, np.datetime64(start, 'D'), side='left'))
+        j = int(np.searchsorted(self.days, np.datetime64(end, 'D'), side='right'))
+        return i, max(i, j)
+
+    def row_span(self, start, end):
+        """Row indices [i, j) of the sorted frame covering dates start..end inclusive."""
+        i, j = self.day_span(start, end)
+        if i == j:
+            return 0, 0
+        return int(self._day_first_row[i]), int(self._day_last_row[j - 1]) + 1
+
+    def totals(self, start, end, level: str = 'day') -> dict:
+        """Row count and column sums over start..end inclusive."""
+        totals = self._raw_totals(start, end, level)
+        for column in self.columns:
+            if self._scale[column] != 1:
+                totals[column] = totals[column] / self._scale[column]
+        return totals
+
+    def _raw_totals(self, start, end, level: str = 'day') -> dict:
+        """Like totals(), but scaled columns stay as exact integer sums."""
+        table = self.levels[level]
+        if level == 'day':
+            i, j = self.day_span(start, end)
+        else:
+            i = int(np.searchsorted(table['starts'], np.datetime64(start, 'D'), side='left'))
+            j = max(i, int(np.searchsorted(table['starts'], np.datetime64(end, 'D'), side='right')))
+        totals = {'count': int(table['count'][j] - table['count'][i])}
+        for column in self.columns:
+            totals[column] = table[column][j] - table[column][i]
+        return totals
+
+    def _mean(self, raw_totals: dict, column: str, rows: tuple) -> float:
+        """
+        Mean of a column over the range (NaN for an empty range, like pandas).
+
+        Integer columns divide their exact cumulative sum, which matches
+        Series.mean() bit for bit. Float columns take Series.mean() over the
+        row span `rows`, because pandas' float summation order can round a
+        mean such as 4.655 to 4.654999... and so change the displayed digits.
+        """
+        count = raw_totals['count']
+        if count == 0:
+            return float('nan')
+        if column in self._float_columns:
+            return float(self._float_columns[column].iloc[rows[0]:rows[1]].mean())
+        return float(raw_totals[column]) / count
+
+    def kpis(self, start, end) -> dict:
+        """
+        The dashboard's KPI card and retention funnel values for start..end inclusive.
+
+        Mirrors the per-row computations on the filtered frame: averages are
+        sum / count, ratios are ratios of sums (or of means), and the DAU change
+        compares the first and last rows of the range. Float-column averages
+        (Average Rating) are the one O(rows) step.
+        """
+        totals = self._raw_totals(start, end)
+        count = totals['count']
+        i, j = self.day_span(start, end)
+        rows = self.row_span(start, end)
+
+        kpis = {'rows': count}
+        kpis['avg_dau'] = self._mean(totals, 'Daily Active Users', rows) if count > 0 else 0
+        if count > 1:
+            first, last = self._dau_first[i], self._dau_last[j - 1]
+            kpis['dau_change'] = (last - first) / first * 100
+        else:
+            kpis['dau_change'] = 0
+        kpis['avg_mau'] = (self._mean(totals, 'Monthly Active Users', rows)
+                           if 'Monthly Active Users' in self.columns else 0)
+
+        feedback = totals['Total Feedback Responses']
+        kpis['satisfaction_rate'] = (totals['Satisfied Responses'] / feedback * 100) if feedback > 0 else 0
+
+        total_users = self._mean(totals, 'Total Users', rows)
+        kpis['voice_adoption'] = (self._mean(totals, 'Users Adopting Voice Features', rows) / total_users * 100
+                                  if total_users > 0 else 0)
+        kpis['avg_rating'] = (self._mean(totals, 'Average Rating', rows)
+                              if 'Average Rating' in self.columns else 0)
+
+        kpis['new_users'] = self._mean(totals, 'New Users (Day 0)', rows)
+        kpis['retained_users'] = self._mean(totals, 'Retained Users (Day 30)', rows)
+        kpis['retention_pct'] = (kpis['retained_users'] / kpis['new_users'] * 100
+                                 if count > 0 else float('nan'))
+        return kpis
+
+    def series(self, column: str, level: str = 'week', start=None, end=None) -> pd.DataFrame:
+        """Per-period mean of a column at the week or month level."""
+        table = self.levels[level]
+        starts = table['starts']
+        i = 0 if start is None else int(np.searchsorted(starts, np.datetime64(start, 'D'), side='left'))
+        j = len(starts) if end is None else int(np.searchsorted(starts, np.datetime64(end, 'D'), side='right'))
+        counts = np.diff(table['count'][i:j + 1])
+        sums = np.diff(table[column][i:j + 1]) / self._scale[column]
+        return pd.DataFrame({'Date': starts[i:j], column: sums / np.maximum(counts, 1), 'Rows': counts})
+
+    def period_sums(self, columns: list, start, end, level: str = 'day') -> pd.DataFrame:
+        """
+        Per-period column sums over start..end inclusive.
+
+        Periods that straddle the range edges only count the days inside it.
+        """
+        i, j = self.day_span(start, end)
+        starts, first_day = np.unique(self._period_keys(self.days[i:j], level), return_index=True)
+        bounds = np.append(first_day + i, j)
+        day = self.levels['day']
+        frame = pd.DataFrame({'Date': starts})
+        for column in columns:
+            sums = np.diff(day[column][bounds])
+            frame[column] = sums / self._scale[column] if self._scale[column] != 1 else sums
+        return frame
@@ -0,0 +1,236 @@
+"""
+Metrics for EA Aura
+Minimal thread-safe counters, gauges and histograms rendered in the
+Prometheus text exposition format for the /api/metrics endpoint.
+"""
+import threading
+from bisect import bisect_left
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from cache hits up to the request deadline
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _add_label(line: str, pair: str) -> str:
+    """Insert one label pair into a rendered sample line."""
+    brace, space = line.find("{"), line.find(" ")
+    if 0 <= brace < space:
+        return f"{line[:brace + 1]}{pair},{line[brace + 1:]}"
+    return f"{line[:space]}{{{pair}}}{line[space:]}"
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Common name/help/label handling; one lock per metric keeps hot paths short."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if not self.labels:
+            return ()
+        return tuple(labels.get(name, "") for name in self.labels)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter, optionally labelled."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        super().__init__(name, documentation, labels)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def total(self) -> float:
+        with self._lock:
+            return sum(self._values.values())
+
+    def render(self) -> list:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+                                for key, value in values]
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram, optionally labelled.
+
+    observe() is one binary search and three additions under the metric's
+    lock; buckets are stored per-bucket and made cumulative only on render.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        with self._lock:
+            series = sorted((key, (list(counts), total, count)) for key, (counts, total, count)
+                            in self._series.items())
+        lines = self.header()
+        for key, (counts, total, count) in series:
+            running = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                running += bucket_count
+                labels = _format_labels(self.labels, key, f'le="{_format_value(float(bound))}"')
+                lines.append(f"{self.name}_bucket{labels} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Gauge or counter whose value is read from a callable at scrape time."""
+
+    def __init__(self, name: str, documentation: str, callback, kind: str = "gauge"):
+        super().__init__(name, documentation)
+        self.kind = kind
+        self.callback = callback
+
+    def render(self) -> list:
+        try:
+            value = self.callback()
+        except Exception as e:
+            print(f"Metrics callback error ({self.name}): {e}")
+            return []
+        if value is None:
+            return []
+        return self.header() + [f"{self.name} {_format_value(value)}"]
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered together on scrape."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._worker_label = ""
+
+    def set_worker(self, worker) -> None:
+        """
+        Label every sample with worker="<worker>". Each preforked worker keeps
+        its own registry, so a scrape covers only the worker that answered it;
+        the label keeps those series apart instead of letting counters jump.
+        """
+        self._worker_label = f'worker="{_escape(worker)}"'
+
+    def register(self, metric):
+        """
+        Add a metric. A callback metric may be registered again under the same
+        name to rebind it (e.g. a session gauge to another server's store).
+
+        Raises:
+            ValueError: If a recorded metric with this name already exists
+        """
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None and not (isinstance(existing, CallbackMetric)
+                                             and isinstance(metric, CallbackMetric)):
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: tuple = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: tuple = (),
+                  buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def gauge_callback(self, name: str, documentation: str, callback) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, callback, "gauge"))
+
+    def counter_callback(self, name: str, documentation: str, callback) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, callback, "counter"))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        if self._worker_label:
+            lines = [line if line.startswith("#") else _add_label(line, self._worker_label) for line in lines]
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry and the metrics recorded outside the web layer
+registry = MetricsRegistry()
+
+upstream_latency = registry.histogram(
+    "aura_upstream_request_duration_seconds",
+    "Azure OpenAI call duration, by outcome (failure for upstream faults, else success).",
+    labels=("outcome",)
+)
+chat_replies = registry.counter(
+    "aura_chat_replies_total",
+    "Chat replies by source (cache, upstream or fallback).",
+    labels=("source",)
+)
+tokens = registry.counter(
+    "aura_tokens_total",
+    "Tokens reported by Azure OpenAI, by kind (prompt, completion, or cached prompt).",
+    labels=("kind",)
+)
+character_prompt_tokens = registry.counter(
+    "aura_character_prompt_tokens_total",
+    "Prompt tokens reported by Azure OpenAI per character, by kind (prompt or cached).",
+    labels=("character", "kind")
+)
+registry.gauge_callback(
+    "aura_chat_fallback_ratio",
+    "Share of chat replies served by the local fallback since start.",
+    lambda: round(chat_replies.value(source="fallback") / chat_replies.total(), 6) if chat_replies.total() else 0
+)
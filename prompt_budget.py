@@ -0,0 +1,152 @@
+"""
+Prompt Budget for EA Aura Wellness Assistant
+Token-aware history windowing with a cached rolling summary of older turns.
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from knowledge_index import estimate_tokens
+
+# Prompt size limits (override via environment)
+AURA_PROMPT_TOKEN_BUDGET = int(os.getenv("AURA_PROMPT_TOKEN_BUDGET", "1500"))
+AURA_SUMMARY_TOKEN_BUDGET = int(os.getenv("AURA_SUMMARY_TOKEN_BUDGET", "200"))
+
+# Chat format overhead per message (role markers and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Use the real tokenizer when tiktoken is installed, otherwise estimate
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _ENCODING = None
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def count_tokens(text: str) -> int:
+    """Token count of `text` (exact with tiktoken, estimated without)."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return estimate_tokens(text)
+
+
+def count_message_tokens(messages: list) -> int:
+    """Token count of a list of chat messages including per-message overhead."""
+    return sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def select_history(history: list, budget: int):
+    """
+    Split history into the newest messages that fit `budget` and the rest.
+
+    Returns:
+        tuple: (window, dropped) where window is the most recent messages whose
+        total tokens fit the budget and dropped is everything older
+    """
+    used = 0
+    start = len(history)
+    for index in range(len(history) - 1, -1, -1):
+        cost = count_tokens(history[index]["content"]) + MESSAGE_OVERHEAD_TOKENS
+        if used + cost > budget:
+            break
+        used += cost
+        start = index
+    return history[start:], history[:start]
+
+
+def _fingerprint(message: dict) -> str:
+    return hashlib.sha1(f"{message['role']}:{message['content']}".encode("utf-8")).hexdigest()
+
+
+def _summary_line(message: dict) -> str:
+    """First sentence of a message, trimmed, as one summary line."""
+    text = " ".join(message["content"].split())
+    text = _SENTENCE_END.split(text, 1)[0]
+    if len(text) > 140:
+        text = text[:137].rstrip() + "..."
+    speaker = "User" if message["role"] == "user" else "Aura"
+    return f"- {speaker}: {text}"
+
+
+class SummaryCache:
+    """
+    Rolling per-session summaries of turns that fell out of the prompt window.
+
+    Each session keeps the summary lines built so far and a fingerprint of the
+    last message they cover, so later calls only summarize newly dropped
+    messages. Lines beyond `token_budget` are dropped oldest first, so a
+    summary never exceeds it.
+
+    Args:
+        max_sessions: Sessions kept before least recently used summaries are evicted
+        token_budget: Maximum tokens in one session's summary
+    """
+
+    def __init__(self, max_sessions: int = 10000, token_budget: int = AURA_SUMMARY_TOKEN_BUDGET):
+        self.max_sessions = max_sessions
+        self.token_budget = token_budget
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.rebuilds = 0
+
+    def summarize(self, session_id: str, dropped: list) -> str:
+        """Return the rolling summary covering `dropped` (oldest messages first)."""
+        if not dropped:
+            return ""
+
+        with self._lock:
+            entry = self._entries.get(session_id) if session_id else None
+            new_messages = dropped
+            lines = []
+
+            if entry is not None:
+                last = entry["last_fingerprint"]
+                for index in range(len(dropped) - 1, -1, -1):
+                    if _fingerprint(dropped[index]) == last:
+                        new_messages = dropped[index + 1:]
+                        lines = list(entry["lines"])
+                        break
+
+            if lines and not new_messages:
+                self.hits += 1
+                self._entries.move_to_end(session_id)
+                return entry["summary"]
+
+            self.rebuilds += 1
+            lines.extend(_summary_line(m) for m in new_messages)
+            while lines and count_tokens("\n".join(lines)) > self.token_budget:
+                lines.pop(0)
+            summary = "\n".join(lines)
+
+            if session_id:
+                self._entries[session_id] = {
+                    "lines": lines,
+                    "summary": summary,
+                    "last_fingerprint": _fingerprint(dropped[-1])
+                }
+                self._entries.move_to_end(session_id)
+                while len(self._entries) > self.max_sessions:
+                    self._entries.popitem(last=False)
+
+            return summary
+
+    def clear(self, session_id: str) -> None:
+        """Forget a session's summary."""
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def stats(self) -> dict:
+        """Cached session count and reuse counters."""
+        with self._lock:
+            return {
+                'sessions': len(self._entries),
+                'hits': self.hits,
+                'rebuilds': self.rebuilds,
+            }
@@ -0,0 +1,113 @@
+"""
+Response Cache for EA Aura Wellness Assistant
+Bounded LRU + TTL cache in front of the Azure OpenAI chat completion call.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.,;:]+$")
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    text = _WHITESPACE.sub(" ", message.strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+def hash_history(history: list) -> str:
+    """Stable digest of a (trimmed) conversation history window."""
+    if not history:
+        return ""
+    payload = json.dumps(
+        [(m.get("role"), m.get("content")) for m in history],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live.
+
+    Args:
+        max_entries: Maximum number of cached responses before LRU eviction
+        ttl_seconds: Seconds an entry stays valid after it is stored
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(message: str, character: str = None, history: list = None) -> str:
+        """Build a cache key from the normalized message, character and history window."""
+        return "|".join((
+            (character or "").lower(),
+            hash_history(history),
+            normalize_message(message)
+        ))
+
+    def get(self, key: str):
+        """Return the cached response for `key`, or None on a miss or expiry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a response, evicting the least recently used entries if full."""
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
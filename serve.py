@@ -0,0 +1,113 @@
+"""
+Production Launcher for EA Aura Wellness Hub
+Runs app.py under gunicorn with preforked workers. The app, prompts, guide
+index and warmed static files are loaded once in the master and shared
+copy-on-write; each worker then reopens its own database handles and opens
+an upstream connection before it accepts traffic.
+
+Usage:
+    python serve.py [--workers 4] [--threads 8] [--bind 0.0.0.0:5000]
+
+With more than one worker, conversation history defaults to the shared
+SQLite backend (AURA_SESSION_BACKEND=sqlite) so any worker can serve any
+session_id; set AURA_SESSION_BACKEND=redis to share it through Redis.
+
+Metrics are per worker: /api/metrics and /api/health describe only the
+worker that answered the request. Every metric sample is labelled
+worker="<pid>", so each worker's counters stay one monotonic series; sum
+across the label, and expect any one scrape to reach only one worker.
+"""
+import argparse
+import gc
+import os
+import sys
+
+AURA_WORKERS = int(os.getenv("AURA_WORKERS", str(min(2 * (os.cpu_count() or 1) + 1, 8))))
+AURA_THREADS = int(os.getenv("AURA_THREADS", "8"))
+AURA_BIND = os.getenv("AURA_BIND", "0.0.0.0:5000")
+
+# Turn sent through build_messages() at preload to fault in prompt structures
+WARMUP_MESSAGE = "How can I sleep better when work is stressful?"
+
+
+def preload():
+    """Import the app in the master and touch lazily built prompt state."""
+    from app import app
+    from config_openAI import build_messages
+
+    build_messages(WARMUP_MESSAGE)
+    return app
+
+
+def when_ready(server):
+    # Everything allocated so far is shared with the workers; keep the
+    # collector from touching (and so copying) those pages after the fork
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import after_fork
+
+    after_fork()
+
+
+def post_worker_init(worker):
+    from config_openAI import warm_up_client
+
+    if warm_up_client():
+        worker.log.info("Upstream connection warmed (pid %s)", worker.pid)
+
+
+def build_options(args) -> dict:
+    """gunicorn settings for the parsed command line."""
+    return {
+        "bind": args.bind,
+        "workers": args.workers,
+        "threads": args.threads,
+        "worker_class": "gthread",
+        "preload_app": True,
+        "timeout": args.timeout,
+        "graceful_timeout": args.timeout,
+        "accesslog": "-" if args.access_log else None,
+        "when_ready": when_ready,
+        "post_fork": post_fork,
+        "post_worker_init": post_worker_init,
+    }
+
+
+def main():
+    """Parse arguments, pick a shared session backend and run gunicorn."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bind", default=AURA_BIND)
+    parser.add_argument("--workers", type=int, default=AURA_WORKERS)
+    parser.add_argument("--threads", type=int, default=AURA_THREADS,
+                        help="Threads per worker (streams and upstream calls block a thread)")
+    parser.add_argument("--timeout", type=int, default=60, help="Seconds before a silent worker is restarted")
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit("serve.py needs gunicorn (pip install gunicorn); on Windows run `python app.py` instead")
+
+    # Must be set before app.py is imported, since the store is built at import
+    if args.workers > 1:
+        backend = os.environ.setdefault("AURA_SESSION_BACKEND", "sqlite")
+        if backend.strip().lower() == "memory":
+            print("Warning: AURA_SESSION_BACKEND=memory keeps a separate history per worker")
+
+    class AuraApplication(BaseApplication):
+        def load_config(self):
+            for key, value in build_options(args).items():
+                if value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            return preload()
+
+    AuraApplication().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,498 @@
+"""
+Session Store for EA Aura Wellness Assistant
+Memory-bounded conversation history with idle expiry and LRU eviction, plus
+SQLite and Redis backends that several worker processes can share.
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from pathlib import Path
+
+# Session store limits (override via environment)
+AURA_SESSION_MAX_MESSAGES = int(os.getenv("AURA_SESSION_MAX_MESSAGES", "20"))
+AURA_SESSION_MAX_BYTES = int(os.getenv("AURA_SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+AURA_SESSION_IDLE_TTL = float(os.getenv("AURA_SESSION_IDLE_TTL", "3600"))
+
+# Where histories live: memory (this process only), sqlite or redis (shared)
+AURA_SESSION_BACKEND = os.getenv("AURA_SESSION_BACKEND", "memory")
+AURA_SESSION_DB = os.getenv("AURA_SESSION_DB", str(Path(__file__).parent / "data" / "sessions.db"))
+AURA_SESSION_REDIS_URL = os.getenv("AURA_SESSION_REDIS_URL", "redis://localhost:6379/0")
+
+# Seconds between sweeps of expired sessions in the SQLite backend
+SQLITE_SWEEP_SECONDS = 60
+
+# Roles are stored as one-character codes to keep each message a small tuple
+_ROLE_CODES = {"user": "u", "assistant": "a", "system": "s"}
+_ROLE_NAMES = {code: role for role, code in _ROLE_CODES.items()}
+
+# Approximate fixed cost of a stored message (tuple + deque slot) and a session
+_MESSAGE_OVERHEAD = 72
+_SESSION_OVERHEAD = 640
+
+
+def _message_size(content: str) -> int:
+    """Approximate in-memory size of one stored message in bytes."""
+    return sys.getsizeof(content) + _MESSAGE_OVERHEAD
+
+
+class _Session:
+    """Compact per-session state: a capped deque of (role_code, content) tuples."""
+
+    __slots__ = ("messages", "nbytes", "last_access")
+
+    def __init__(self, max_messages: int):
+        self.messages = deque(maxlen=max_messages)
+        self.nbytes = _SESSION_OVERHEAD
+        self.last_access = time.monotonic()
+
+
+class SessionStore:
+    """
+    Thread-safe conversation history store keyed by session_id.
+
+    Each session keeps at most `max_messages` messages; the oldest message is
+    dropped as a new one is inserted. Sessions idle for longer than
+    `idle_ttl_seconds` expire, and whole sessions are evicted least recently
+    used first whenever the approximate total size exceeds `max_bytes`.
+
+    Args:
+        max_messages: Per-session message cap enforced at insert time
+        max_bytes: Global approximate memory cap across all sessions
+        idle_ttl_seconds: Seconds without access before a session expires
+    """
+
+    def __init__(self, max_messages: int = AURA_SESSION_MAX_MESSAGES,
+                 max_bytes: int = AURA_SESSION_MAX_BYTES,
+                 idle_ttl_seconds: float = AURA_SESSION_IDLE_TTL):
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_history(self, session_id: str) -> list:
+        """
+        Return a copy of the session's messages as chat completion dicts.
+
+        Returns:
+            list: [{"role": ..., "content": ...}, ...], empty for unknown sessions
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+            return [{"role": _ROLE_NAMES[code], "content": content}
+                    for code, content in session.messages]
+
+    def append(self, session_id: str, role: str, content: str) -> None:
+        """Append one message, creating the session if needed."""
+        self.extend(session_id, [{"role": role, "content": content}])
+
+    def append_turn(self, session_id: str, user_message: str, response: str) -> None:
+        """Append a user message and the assistant's reply."""
+        self.extend(session_id, [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": response}
+        ])
+
+    def extend(self, session_id: str, messages: list) -> None:
+        """Append several messages to a session under a single lock."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = _Session(self.max_messages)
+                self._sessions[session_id] = session
+                self._nbytes += session.nbytes
+            else:
+                self._sessions.move_to_end(session_id)
+
+            for message in messages:
+                content = message["content"] or ""
+                if len(session.messages) == session.messages.maxlen:
+                    dropped = _message_size(session.messages[0][1])
+                    session.nbytes -= dropped
+                    self._nbytes -= dropped
+                session.messages.append((_ROLE_CODES.get(message["role"], "u"), content))
+                added = _message_size(content)
+                session.nbytes += added
+                self._nbytes += added
+
+            session.last_access = now
+            self._enforce_memory_cap(keep=session_id)
+
+    def clear(self, session_id: str) -> bool:
+        """Delete a session's history. Returns True if it existed."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                return False
+            self._nbytes -= session.nbytes
+            return True
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> dict:
+        """Session and message counts plus approximate memory use."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                'backend': 'memory',
+                'sessions': len(self._sessions),
+                'messages': sum(len(s.messages) for s in self._sessions.values()),
+                'approx_bytes': self._nbytes,
+                'max_bytes': self.max_bytes,
+                'utilization': round(self._nbytes / self.max_bytes, 3) if self.max_bytes else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def _expire(self, now: float) -> None:
+        """Drop idle sessions; they sit at the LRU end, so stop at the first fresh one."""
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_access < self.idle_ttl_seconds:
+                break
+            del self._sessions[session_id]
+            self._nbytes -= session.nbytes
+            self.expirations += 1
+
+    def _enforce_memory_cap(self, keep: str) -> None:
+        """Evict least recently used sessions until under the memory cap."""
+        while self._nbytes > self.max_bytes and len(self._sessions) > 1:
+            session_id, session = next(iter(self._sessions.items()))
+            if session_id == keep:
+                break
+            del self._sessions[session_id]
+            self._nbytes -= session.nbytes
+            self.evictions += 1
+
+
+_SESSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id  TEXT PRIMARY KEY,
+    next_seq    INTEGER NOT NULL,
+    last_access REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access);
+CREATE TABLE IF NOT EXISTS session_messages (
+    session_id TEXT NOT NULL,
+    seq        INTEGER NOT NULL,
+    role       TEXT NOT NULL,
+    content    TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteSessionStore:
+    """
+    Conversation history in a SQLite file shared by every worker process.
+
+    Same interface as SessionStore. Messages are keyed by (session_id, seq),
+    so a history read is one primary key range scan; each write runs in an
+    IMMEDIATE transaction so concurrent workers never reuse a sequence
+    number, and trims the session to `max_messages` in the same transaction.
+    Idle time is wall-clock based (processes do not share a monotonic clock)
+    and expired sessions are swept at most every SQLITE_SWEEP_SECONDS.
+
+    Connections are opened per process: a worker forked from a parent that
+    already used the store opens its own on first use.
+
+    Args:
+        db_path: SQLite database file
+        max_messages: Per-session message cap enforced at insert time
+        idle_ttl_seconds: Seconds without access before a session expires
+    """
+
+    def __init__(self, db_path: str = AURA_SESSION_DB,
+                 max_messages: int = AURA_SESSION_MAX_MESSAGES,
+                 idle_ttl_seconds: float = AURA_SESSION_IDLE_TTL):
+        self.db_path = db_path
+        self.max_messages = max_messages
+        self.idle_ttl_seconds = idle_ttl_seconds
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._next_sweep = 0.0
+        self.expirations = 0
+        with self._lock:
+            self._connection().executescript(_SESSION_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """This process's connection, opened on first use after a fork."""
+        if self._pid != os.getpid():
+            # An inherited connection must not be used (or closed) in the child
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                         isolation_level=None, timeout=10)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    def reopen(self) -> None:
+        """Drop this process's connection; the next call opens a fresh one."""
+        with self._lock:
+            self._pid = None
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _sweep(self, conn: sqlite3.Connection, now: float) -> None:
+        """Delete sessions idle past the TTL (called inside a write transaction)."""
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + SQLITE_SWEEP_SECONDS
+        cutoff = now - self.idle_ttl_seconds
+        conn.execute("DELETE FROM session_messages WHERE session_id IN "
+                     "(SELECT session_id FROM sessions WHERE last_access <= ?)", (cutoff,))
+        self.expirations += conn.execute("DELETE FROM sessions WHERE last_access <= ?", (cutoff,)).rowcount
+
+    def get_history(self, session_id: str) -> list:
+        """
+        Return the session's messages as chat completion dicts.
+
+        Returns:
+            list: [{"role": ..., "content": ...}, ...], empty for unknown sessions
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            updated = conn.execute(
+                "UPDATE sessions SET last_access = ? WHERE session_id = ? AND last_access > ?",
+                (now, session_id, now - self.idle_ttl_seconds)
+            ).rowcount
+            if not updated:
+                return []
+            rows = conn.execute(
+                "SELECT role, content FROM session_messages WHERE session_id = ? ORDER BY seq",
+                (session_id,)
+            ).fetchall()
+        return [{"role": _ROLE_NAMES[code], "content": content} for code, content in rows]
+
+    def append(self, session_id: str, role: str, content: str) -> None:
+        """Append one message, creating the session if needed."""
+        self.extend(session_id, [{"role": role, "content": content}])
+
+    def append_turn(self, session_id: str, user_message: str, response: str) -> None:
+        """Append a user message and the assistant's reply."""
+        self.extend(session_id, [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": response}
+        ])
+
+    def extend(self, session_id: str, messages: list) -> None:
+        """Append several messages to a session in one transaction."""
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            self._sweep(conn, now)
+            row = conn.execute("SELECT next_seq, last_access FROM sessions WHERE session_id = ?",
+                               (session_id,)).fetchone()
+            if row is not None and now - row[1] >= self.idle_ttl_seconds:
+                conn.execute("DELETE FROM session_messages WHERE session_id = ?", (session_id,))
+                self.expirations += 1
+                row = None
+            seq = row[0] if row is not None else 0
+            conn.executemany(
+                "INSERT INTO session_messages (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                [(session_id, seq + i, _ROLE_CODES.get(m["role"], "u"), m["content"] or "")
+                 for i, m in enumerate(messages)]
+            )
+            seq += len(messages)
+            conn.execute(
+                "INSERT INTO sessions (session_id, next_seq, last_access) VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET next_seq = excluded.next_seq, "
+                "last_access = excluded.last_access",
+                (session_id, seq, now)
+            )
+            conn.execute("DELETE FROM session_messages WHERE session_id = ? AND seq < ?",
+                         (session_id, seq - self.max_messages))
+
+    def clear(self, session_id: str) -> bool:
+        """Delete a session's history. Returns True if it existed."""
+        with self._lock, self._transaction() as conn:
+            conn.execute("DELETE FROM session_messages WHERE session_id = ?", (session_id,))
+            return conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount > 0
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return self._connection().execute(
+                "SELECT 1 FROM sessions WHERE session_id = ? AND last_access > ?",
+                (session_id, time.time() - self.idle_ttl_seconds)
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute(
+                "SELECT COUNT(*) FROM sessions WHERE last_access > ?",
+                (time.time() - self.idle_ttl_seconds,)
+            ).fetchone()[0]
+
+    def stats(self) -> dict:
+        """Live session and message counts across all workers."""
+        cutoff = time.time() - self.idle_ttl_seconds
+        with self._lock:
+            sessions, messages = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(MIN(next_seq, ?)), 0) "
+                "FROM sessions WHERE last_access > ?",
+                (self.max_messages, cutoff)
+            ).fetchone()
+        return {
+            'backend': 'sqlite',
+            'sessions': sessions,
+            'messages': messages,
+            'expirations': self.expirations,
+        }
+
+
+class RedisSessionStore:
+    """
+    Conversation history in Redis (or anything speaking its protocol).
+
+    Same interface as SessionStore. Each session is a list of JSON-encoded
+    [role_code, content] pairs; a write is one pipelined RPUSH + LTRIM +
+    EXPIRE, so the cap and the idle TTL are enforced by the server. A sorted
+    set of last-access times backs len() and stats().
+
+    Args:
+        url: Redis URL, used when no client is given (needs the redis package)
+        max_messages: Per-session message cap enforced at insert time
+        idle_ttl_seconds: Seconds without access before a session expires
+        client: Ready redis-py compatible client, e.g. a local stand-in
+        prefix: Key prefix for this app's sessions
+    """
+
+    def __init__(self, url: str = AURA_SESSION_REDIS_URL,
+                 max_messages: int = AURA_SESSION_MAX_MESSAGES,
+                 idle_ttl_seconds: float = AURA_SESSION_IDLE_TTL,
+                 client=None, prefix: str = "aura:session:"):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("The redis session backend needs the redis package (pip install redis)") from e
+            client = redis.Redis.from_url(url)
+        self._redis = client
+        self.max_messages = max_messages
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._ttl = max(1, int(idle_ttl_seconds))
+        self._prefix = prefix
+        self._index = prefix + "index"
+
+    def reopen(self) -> None:
+        """Drop pooled connections inherited from a parent process."""
+        pool = getattr(self._redis, "connection_pool", None)
+        if pool is not None:
+            pool.reset()
+
+    def get_history(self, session_id: str) -> list:
+        """
+        Return the session's messages as chat completion dicts.
+
+        Returns:
+            list: [{"role": ..., "content": ...}, ...], empty for unknown sessions
+        """
+        key = self._prefix + session_id
+        items = self._redis.lrange(key, 0, -1)
+        if not items:
+            return []
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.expire(key, self._ttl)
+        pipe.zadd(self._index, {session_id: time.time()})
+        pipe.execute()
+        messages = []
+        for item in items:
+            code, content = json.loads(item)
+            messages.append({"role": _ROLE_NAMES[code], "content": content})
+        return messages
+
+    def append(self, session_id: str, role: str, content: str) -> None:
+        """Append one message, creating the session if needed."""
+        self.extend(session_id, [{"role": role, "content": content}])
+
+    def append_turn(self, session_id: str, user_message: str, response: str) -> None:
+        """Append a user message and the assistant's reply."""
+        self.extend(session_id, [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": response}
+        ])
+
+    def extend(self, session_id: str, messages: list) -> None:
+        """Append several messages to a session in one atomic pipeline."""
+        if not messages:
+            return
+        key = self._prefix + session_id
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.rpush(key, *[json.dumps([_ROLE_CODES.get(m["role"], "u"), m["content"] or ""])
+                          for m in messages])
+        pipe.ltrim(key, -self.max_messages, -1)
+        pipe.expire(key, self._ttl)
+        pipe.zadd(self._index, {session_id: time.time()})
+        pipe.execute()
+
+    def clear(self, session_id: str) -> bool:
+        """Delete a session's history. Returns True if it existed."""
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.delete(self._prefix + session_id)
+        pipe.zrem(self._index, session_id)
+        return pipe.execute()[0] > 0
+
+    def __contains__(self, session_id: str) -> bool:
+        return bool(self._redis.exists(self._prefix + session_id))
+
+    def __len__(self) -> int:
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.zremrangebyscore(self._index, "-inf", time.time() - self.idle_ttl_seconds)
+        pipe.zcard(self._index)
+        return pipe.execute()[1]
+
+    def stats(self) -> dict:
+        """Live session count across all workers."""
+        return {
+            'backend': 'redis',
+            'sessions': len(self),
+        }
+
+
+def create_session_store(backend: str = None):
+    """
+    The session store selected by AURA_SESSION_BACKEND (or `backend`).
+
+    Raises:
+        ValueError: For an unknown backend name
+    """
+    backend = (backend or AURA_SESSION_BACKEND).strip().lower()
+    if backend == "memory":
+        return SessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    if backend == "redis":
+        return RedisSessionStore()
+    raise ValueError(f"Unknown AURA_SESSION_BACKEND: {backend} (expected memory, sqlite or redis)")
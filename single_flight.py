@@ -0,0 +1,120 @@
+"""
+Single-Flight Request Coalescing for EA Aura Wellness Assistant
+Concurrent identical requests share one upstream call and its result.
+"""
+import asyncio
+import threading
+
+
+class _Call:
+    """One in-flight call that followers wait on."""
+
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait for and return the same result, or
+    re-raise the same exception. Nothing is cached once the call finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._async_calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn, timeout: float = None):
+        """
+        Run `fn()` once per key across concurrent threads.
+
+        Args:
+            key: Identity of the request
+            fn: Zero-argument callable run by the leader
+            timeout: Seconds a follower waits before giving up
+
+        Raises:
+            TimeoutError: If a follower's wait exceeds `timeout`
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+                leader = True
+            else:
+                call.followers += 1
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError("Timed out waiting for coalesced request")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: str, coro_fn, timeout: float = None):
+        """
+        Async counterpart of do(): await `coro_fn()` once per key on this loop.
+
+        Raises:
+            asyncio.TimeoutError: If a follower's wait exceeds `timeout`
+        """
+        future = self._async_calls.get(key)
+        if future is not None:
+            with self._lock:
+                self.coalesced += 1
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_calls[key] = future
+        with self._lock:
+            self.leaders += 1
+        try:
+            result = await coro_fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Followers should fail like an upstream error, not be cancelled themselves
+            future.set_exception(RuntimeError("Coalesced request was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            del self._async_calls[key]
+
+    def stats(self) -> dict:
+        """Leader/coalesced counters and calls currently in flight."""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls) + len(self._async_calls),
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+            }
@@ -0,0 +1,303 @@
+"""
+Static File Cache for EA Aura Wellness Hub
+In-memory, mtime-invalidated cache of static files with precompressed gzip and
+brotli bodies, strong ETags, conditional (304) and Range (206) responses.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Cache limits (override via environment)
+AURA_STATIC_CACHE_MAX_BYTES = int(os.getenv("AURA_STATIC_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+AURA_STATIC_MAX_FILE_BYTES = int(os.getenv("AURA_STATIC_MAX_FILE_BYTES", str(4 * 1024 * 1024)))
+AURA_STATIC_MAX_AGE = int(os.getenv("AURA_STATIC_MAX_AGE", "0"))
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+
+COMPRESSIBLE_TYPES = frozenset({
+    'application/javascript', 'application/json', 'application/xml',
+    'image/svg+xml', 'text/css', 'text/csv', 'text/html', 'text/javascript',
+    'text/markdown', 'text/plain', 'text/xml',
+})
+
+# Content-hashed names, e.g. "Jar-640w.3f9a2c1b7e4d.webp" from asset_pipeline.py
+_HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.\w+$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Never served from the site root, whatever the route: runtime data (wellness
+# history, session transcripts, telemetry), dotfiles such as .env and .cache/,
+# and server source
+PRIVATE_DIRS = frozenset({'data', 'var', '__pycache__'})
+_PRIVATE_NAME = re.compile(r"\.(db|sqlite3?)(-wal|-shm|-journal)?$|\.(csv|py|pyc)$", re.IGNORECASE)
+
+mimetypes.add_type('image/avif', '.avif')
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('text/markdown', '.md')
+
+
+def parse_accept_encoding(header: str) -> set:
+    """Encodings the client accepts (q > 0) from an Accept-Encoding header."""
+    accepted = set()
+    for part in (header or '').lower().split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q=') and q[2:].strip() in ('0', '0.0', '0.00', '0.000'):
+            continue
+        if coding:
+            accepted.add(coding.strip())
+    return accepted
+
+
+def is_private(filename: str) -> bool:
+    """True if a requested relative path must not be served as a static file."""
+    parts = [part for part in posixpath.normpath(filename.replace('\\', '/')).split('/') if part]
+    if any(part.startswith('.') or part.lower() in PRIVATE_DIRS for part in parts):
+        return True
+    return bool(parts) and _PRIVATE_NAME.search(parts[-1]) is not None
+
+
+def parse_range(header: str, length: int):
+    """
+    Parse a single-range "bytes=" header.
+
+    Returns:
+        tuple: (start, end) inclusive, "unsatisfiable", or None to ignore the
+        header and send the full body (malformed or multi-range requests)
+    """
+    match = _RANGE.match((header or '').strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            return "unsatisfiable"
+        return max(0, length - suffix), length - 1
+    start = int(first)
+    end = min(int(last), length - 1) if last else length - 1
+    if start >= length or end < start:
+        return "unsatisfiable"
+    return start, end
+
+
+class _StaticFile:
+    """Cached metadata and (for small files) bodies of one static file."""
+
+    __slots__ = ("path", "mtime_ns", "size", "mimetype", "etag", "last_modified",
+                 "body", "encodings", "immutable")
+
+    def __init__(self, path: Path, stat, max_file_bytes: int):
+        self.path = path
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.mimetype = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.immutable = bool(_HASHED_NAME.search(path.name))
+        self.encodings = {}
+
+        digest = hashlib.sha256()
+        if self.size <= max_file_bytes:
+            self.body = path.read_bytes()
+            digest.update(self.body)
+            self._precompress()
+        else:
+            # Too large to hold in memory: hash once, serve slices from disk
+            self.body = None
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+        self.etag = digest.hexdigest()[:32]
+
+    def _precompress(self) -> None:
+        mimetype = self.mimetype.split(';')[0]
+        if mimetype not in COMPRESSIBLE_TYPES or self.size < MIN_COMPRESS_BYTES:
+            return
+        compressed = {'gzip': gzip.compress(self.body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed['br'] = brotli.compress(self.body, quality=11)
+        self.encodings = {name: data for name, data in compressed.items() if len(data) < self.size}
+
+    @property
+    def memory(self) -> int:
+        return len(self.body or b'') + sum(len(data) for data in self.encodings.values())
+
+    def read(self, start: int, end: int) -> bytes:
+        """Bytes start..end (inclusive) of the identity body."""
+        if self.body is not None:
+            return self.body[start:end + 1]
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+
+class StaticFileCache:
+    """
+    Thread-safe LRU cache of static files keyed by absolute path.
+
+    Each lookup stats the file and rebuilds the entry if its mtime or size
+    changed, so edits are picked up without a restart. Files larger than
+    `max_file_bytes` keep only metadata (ETag) and are read from disk per request.
+
+    Args:
+        max_bytes: Total body bytes (identity + compressed) kept in memory
+        max_file_bytes: Largest file whose body is cached and precompressed
+        max_age: Cache-Control max-age for files without a content hash in the name
+    """
+
+    def __init__(self, max_bytes: int = AURA_STATIC_CACHE_MAX_BYTES,
+                 max_file_bytes: int = AURA_STATIC_MAX_FILE_BYTES,
+                 max_age: int = AURA_STATIC_MAX_AGE):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._memory = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+
+    def get(self, path: Path):
+        """Return the cached file for `path`, or None if it does not exist."""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        if not path.is_file():
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        try:
+            entry = _StaticFile(path, stat, self.max_file_bytes)
+        except OSError:
+            return None
+
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._memory -= old.memory
+            self._entries[path] = entry
+            self._memory += entry.memory
+            while self._memory > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._memory -= evicted.memory
+        return entry
+
+    def warm(self, directory: Path, pattern: str = '*') -> int:
+        """Load and precompress matching files under `directory`; returns the count."""
+        count = 0
+        for path in directory.glob(pattern):
+            if path.is_file() and self.get(path.resolve()) is not None:
+                count += 1
+        return count
+
+    def respond(self, entry: _StaticFile, headers, mimetype: str = None, immutable: bool = None):
+        """
+        Build a response for a cached file.
+
+        Args:
+            entry: File from get()
+            headers: Request headers (mapping with .get())
+            mimetype: Override for the guessed Content-Type
+            immutable: Override the content-hashed filename check, e.g. False
+                when a hashed file is served under an unhashed URL
+
+        Returns:
+            tuple: (status, headers dict, body bytes)
+        """
+        mimetype = mimetype or entry.mimetype
+        accepted = parse_accept_encoding(headers.get('Accept-Encoding'))
+        encoding = next((name for name in ('br', 'gzip') if name in entry.encodings and name in accepted), None)
+        etag = f'"{entry.etag}-{encoding}"' if encoding else f'"{entry.etag}"'
+
+        response_headers = {
+            'ETag': etag,
+            'Last-Modified': entry.last_modified,
+            'Cache-Control': ('public, max-age=31536000, immutable'
+                              if (entry.immutable if immutable is None else immutable)
+                              else f'public, max-age={self.max_age}, must-revalidate'),
+            'Accept-Ranges': 'bytes',
+        }
+        if entry.encodings:
+            response_headers['Vary'] = 'Accept-Encoding'
+
+        if self._not_modified(headers, etag, entry):
+            with self._lock:
+                self.not_modified += 1
+            return 304, response_headers, b''
+
+        response_headers['Content-Type'] = mimetype
+        status = 200
+        if encoding:
+            body = entry.encodings[encoding]
+            response_headers['Content-Encoding'] = encoding
+        else:
+            start, end = 0, entry.size - 1
+            byte_range = self._requested_range(headers, etag, entry)
+            if byte_range == "unsatisfiable":
+                response_headers['Content-Range'] = f'bytes */{entry.size}'
+                return 416, response_headers, b''
+            if byte_range is not None:
+                start, end = byte_range
+                status = 206
+                response_headers['Content-Range'] = f'bytes {start}-{end}/{entry.size}'
+            body = entry.read(start, end) if entry.size else b''
+
+        with self._lock:
+            self.bytes_sent += len(body)
+        return status, response_headers, body
+
+    @staticmethod
+    def _not_modified(headers, etag: str, entry: _StaticFile) -> bool:
+        if_none_match = headers.get('If-None-Match')
+        if if_none_match:
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            return '*' in tags or etag in tags
+        return headers.get('If-Modified-Since') == entry.last_modified
+
+    @staticmethod
+    def _requested_range(headers, etag: str, entry: _StaticFile):
+        range_header = headers.get('Range')
+        if not range_header:
+            return None
+        if_range = headers.get('If-Range')
+        if if_range and if_range not in (etag, entry.last_modified):
+            return None
+        return parse_range(range_header, entry.size)
+
+    def stats(self) -> dict:
+        """Entry count, memory use and hit/304 counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'memory_bytes': self._memory,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'bytes_sent': self.bytes_sent,
+                'brotli': brotli is not None,
+            }
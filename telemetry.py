@@ -0,0 +1,303 @@
+"""
+Chat Telemetry for EA Aura
+Records one compact event per chat turn into an in-memory ring buffer. A
+background thread flushes the buffer in batches to append-only CSV files
+partitioned by day, which the KPI dashboard aggregates incrementally.
+"""
+import atexit
+import csv
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+AURA_TELEMETRY_ENABLED = os.getenv("AURA_TELEMETRY_ENABLED", "1") == "1"
+AURA_TELEMETRY_DIR = Path(os.getenv(
+    "AURA_TELEMETRY_DIR",
+    str(Path(__file__).parent / "data" / "telemetry")
+))
+AURA_TELEMETRY_BUFFER = int(os.getenv("AURA_TELEMETRY_BUFFER", "65536"))
+AURA_TELEMETRY_FLUSH_SECONDS = float(os.getenv("AURA_TELEMETRY_FLUSH_SECONDS", "5"))
+# Buffered events that wake the flusher before its interval is up
+AURA_TELEMETRY_FLUSH_EVENTS = int(os.getenv("AURA_TELEMETRY_FLUSH_EVENTS", "4096"))
+
+# Column order of the partition files (they have no header row)
+FIELDS = (
+    "ts",                 # Unix time of the turn's end
+    "endpoint",           # "chat", "chat_stream" or "chat_batch"
+    "character",
+    "session",            # Short hash of the session id, never the id itself
+    "latency_ms",
+    "source",             # "cache", "upstream", "fallback" or "error"
+    "response_chars",
+    "prompt_tokens",
+    "completion_tokens",
+)
+
+# Latency histogram bucket upper bounds (ms) kept by the aggregator for percentiles
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, float("inf"))
+
+
+def session_hash(session_id: str) -> str:
+    """Stable 16-hex-digit pseudonym for a session id."""
+    return hashlib.blake2b(str(session_id).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def partition_path(directory: Path, ts: float, pid: int = None) -> Path:
+    """Day partition file for an event time, one file per writing process."""
+    day = datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+    return directory / f"date={day}" / f"chat-{pid or os.getpid()}.csv"
+
+
+class TelemetryRecorder:
+    """
+    Bounded ring buffer of chat-turn events with a background batch flusher.
+
+    record() only builds a tuple and appends it to a deque, which is atomic
+    under the GIL, so the request path takes no lock and does no I/O. When
+    the buffer is full the oldest unflushed events are overwritten and
+    counted as dropped. The flusher thread starts on the first record() and
+    drains the buffer every `flush_seconds`, or as soon as `flush_events`
+    events are waiting, appending each day's events to that day's partition
+    file with a single write.
+
+    Args:
+        directory: Root of the date=YYYY-MM-DD partitions
+        capacity: Ring buffer size in events
+        flush_seconds: Interval between background flushes
+        flush_events: Buffered events that trigger a flush before the interval
+        enabled: Set False to make record() a no-op
+    """
+
+    def __init__(self, directory: Path = AURA_TELEMETRY_DIR, capacity: int = AURA_TELEMETRY_BUFFER,
+                 flush_seconds: float = AURA_TELEMETRY_FLUSH_SECONDS,
+                 flush_events: int = AURA_TELEMETRY_FLUSH_EVENTS, enabled: bool = AURA_TELEMETRY_ENABLED):
+        self.directory = Path(directory)
+        self.capacity = capacity
+        self.flush_seconds = flush_seconds
+        self.flush_events = flush_events
+        self.enabled = enabled
+        self._buffer = deque(maxlen=capacity)
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.recorded = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.flush_errors = 0
+
+    def record(self, endpoint: str, character: str, session_id: str, latency_ms: float,
+               source: str, response_chars: int, prompt_tokens: int = None,
+               completion_tokens: int = None) -> None:
+        """Buffer one chat-turn event."""
+        if not self.enabled:
+            return
+        if len(self._buffer) >= self.capacity:
+            self.dropped += 1
+        self._buffer.append((
+            round(time.time(), 3), endpoint, character, session_hash(session_id),
+            round(latency_ms, 1), source, response_chars,
+            "" if prompt_tokens is None else prompt_tokens,
+            "" if completion_tokens is None else completion_tokens,
+        ))
+        self.recorded += 1
+        if self._thread is None:
+            self._start()
+        if len(self._buffer) >= self.flush_events:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Write all buffered events to their partitions.
+
+        Returns:
+            int: Number of events written
+        """
+        with self._flush_lock:
+            events = []
+            try:
+                while True:
+                    events.append(self._buffer.popleft())
+            except IndexError:
+                pass
+            if not events:
+                return 0
+
+            days = {}
+            for event in events:
+                days.setdefault(int(event[0] // 86400), []).append(event)
+            for rows in days.values():
+                path = partition_path(self.directory, rows[0][0])
+                text = io.StringIO()
+                csv.writer(text, lineterminator="\n").writerows(rows)
+                try:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(path, "a", encoding="utf-8", newline="") as f:
+                        f.write(text.getvalue())
+                except OSError as e:
+                    print(f"Telemetry flush error: {e}")
+                    self.flush_errors += 1
+                    continue
+                self.flushed += len(rows)
+            return len(events)
+
+    def stats(self) -> dict:
+        """Buffer occupancy and event counters."""
+        return {
+            'enabled': self.enabled,
+            'buffered': len(self._buffer),
+            'capacity': self.capacity,
+            'recorded': self.recorded,
+            'flushed': self.flushed,
+            'dropped': self.dropped,
+            'flush_errors': self.flush_errors,
+        }
+
+    def close(self) -> None:
+        """Stop the flusher thread and write what is left."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_seconds + 1)
+        self.flush()
+
+    def _start(self) -> None:
+        with self._flush_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="aura-telemetry", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Telemetry flush error: {e}")
+                self.flush_errors += 1
+
+
+class TelemetryAggregator:
+    """
+    Incremental per-day, per-character rollup of the telemetry partitions.
+
+    Keeps a byte offset per partition file and, on refresh(), parses only
+    bytes appended since the last call (up to the last complete line), so
+    each event is read once no matter how often the dashboard reruns.
+
+    Args:
+        directory: Root of the date=YYYY-MM-DD partitions
+    """
+
+    _SUM_COLUMNS = ("turns", "cache", "upstream", "fallback", "error",
+                    "latency_ms", "response_chars", "prompt_tokens", "completion_tokens")
+
+    def __init__(self, directory: Path = AURA_TELEMETRY_DIR):
+        self.directory = Path(directory)
+        self._offsets = {}
+        self._lock = threading.Lock()
+        self._daily = None
+        self._latency_hist = {}
+        self._sessions = {}
+        self.events = 0
+
+    def refresh(self) -> int:
+        """
+        Fold newly appended events into the rollup.
+
+        Returns:
+            int: Number of new events read
+        """
+        with self._lock:
+            frames = []
+            for path in sorted(self.directory.glob("date=*/*.csv")):
+                offset = self._offsets.get(path, 0)
+                try:
+                    if path.stat().st_size <= offset:
+                        continue
+                    with open(path, "rb") as f:
+                        f.seek(offset)
+                        data = f.read()
+                except OSError:
+                    continue
+                end = data.rfind(b"\n") + 1
+                if end == 0:
+                    continue
+                self._offsets[path] = offset + end
+                frames.append(pd.read_csv(io.BytesIO(data[:end]), names=FIELDS, header=None,
+                                          dtype={"character": str, "session": str, "source": str}))
+            if not frames:
+                return 0
+            events = pd.concat(frames, ignore_index=True)
+            self._fold(events)
+            self.events += len(events)
+            return len(events)
+
+    def daily(self) -> pd.DataFrame:
+        """
+        Per-day, per-character totals plus derived rates.
+
+        Returns:
+            DataFrame: date, character, turns, sessions, fallback_rate,
+            cache_rate, avg_latency_ms, p95_latency_ms and the summed columns
+        """
+        with self._lock:
+            if self._daily is None:
+                return pd.DataFrame(columns=["date", "character", *self._SUM_COLUMNS])
+            frame = self._daily.reset_index()
+            sessions = {key: len(ids) for key, ids in self._sessions.items()}
+            p95 = {key: self._percentile(hist, 0.95) for key, hist in self._latency_hist.items()}
+        keys = list(zip(frame["date"], frame["character"]))
+        frame["sessions"] = [sessions.get(key, 0) for key in keys]
+        turns = frame["turns"].where(frame["turns"] > 0)
+        frame["fallback_rate"] = frame["fallback"] / turns * 100
+        frame["cache_rate"] = frame["cache"] / turns * 100
+        frame["avg_latency_ms"] = frame["latency_ms"] / turns
+        frame["p95_latency_ms"] = [p95.get(key) for key in keys]
+        frame["date"] = pd.to_datetime(frame["date"])
+        return frame.sort_values(["date", "character"]).reset_index(drop=True)
+
+    def _fold(self, events: pd.DataFrame) -> None:
+        events["date"] = pd.to_datetime(events["ts"], unit="s", utc=True).dt.strftime("%Y-%m-%d")
+        events["character"] = events["character"].fillna("unknown")
+        events["turns"] = 1
+        for source in ("cache", "upstream", "fallback", "error"):
+            events[source] = (events["source"] == source).astype("int64")
+        events["bucket"] = pd.cut(events["latency_ms"], [-float("inf"), *LATENCY_BUCKETS_MS],
+                                  labels=False, right=True)
+
+        grouped = events.groupby(["date", "character"])
+        sums = grouped[list(self._SUM_COLUMNS)].sum()
+        self._daily = sums if self._daily is None else self._daily.add(sums, fill_value=0)
+
+        for key, buckets in grouped["bucket"]:
+            hist = self._latency_hist.setdefault(key, [0] * len(LATENCY_BUCKETS_MS))
+            for index, count in buckets.value_counts().items():
+                hist[int(index)] += int(count)
+        for key, ids in grouped["session"]:
+            self._sessions.setdefault(key, set()).update(ids.dropna())
+
+    @staticmethod
+    def _percentile(hist: list, q: float):
+        """Upper bound of the latency bucket holding the q-th quantile."""
+        total = sum(hist)
+        if not total:
+            return None
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, hist):
+            running += count
+            if running >= q * total:
+                return bound
+        return LATENCY_BUCKETS_MS[-1]
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Let tests import the top-level modules (app, static_cache, ...) from the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
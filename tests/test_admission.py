@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from admission import BATCH, INTERACTIVE, AdmissionController, AdmissionRejected
+
+
+def deadline_in(seconds):
+    return time.monotonic() + seconds
+
+
+def wait_until(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "condition not reached"
+        time.sleep(0.001)
+
+
+def test_interactive_request_is_admitted_ahead_of_queued_batch_work():
+    # One request of burst, refilled every 0.5s
+    admission = AdmissionController(global_rpm=120, burst_seconds=0.5)
+    admission.admit(None, 0, deadline_in(5))
+    order = []
+
+    def request(name, priority):
+        admission.admit(None, 0, deadline_in(5), priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=request, args=("batch-1", BATCH)),
+               threading.Thread(target=request, args=("batch-2", BATCH)),
+               threading.Thread(target=request, args=("interactive", INTERACTIVE))]
+    for queued, thread in enumerate(threads, 1):
+        thread.start()
+        wait_until(lambda: admission.stats()["queued"] == queued)
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["interactive", "batch-1", "batch-2"]
+    stats = admission.stats()
+    assert stats["admitted"] == {"interactive": 2, "batch": 2}
+    assert stats["queued"] == 0
+
+
+def test_rejects_at_once_when_capacity_returns_after_the_deadline():
+    admission = AdmissionController(global_rpm=6, burst_seconds=1)
+    admission.admit(None, 0, deadline_in(5))
+
+    started = time.monotonic()
+    with pytest.raises(AdmissionRejected):
+        admission.admit(None, 0, deadline_in(1))
+
+    assert time.monotonic() - started < 0.5
+    assert admission.stats()["rejected"] == {"interactive": 1, "batch": 0}
+    assert admission.stats()["queued"] == 0
+
+
+def test_session_limit_rejects_only_that_session():
+    admission = AdmissionController(session_rpm=6, burst_seconds=1)
+    admission.admit("a", 0, deadline_in(5))
+
+    with pytest.raises(AdmissionRejected):
+        admission.admit("a", 0, deadline_in(1))
+    admission.admit("b", 0, deadline_in(1))
+
+
+def test_retry_after_past_the_deadline_rejects_at_once():
+    admission = AdmissionController(global_rpm=6000)
+    admission.throttle(30)
+
+    started = time.monotonic()
+    with pytest.raises(AdmissionRejected):
+        admission.admit(None, 0, deadline_in(1))
+
+    assert time.monotonic() - started < 0.5
+    assert admission.stats()["throttled"] == 1
+
+
+def test_retry_after_within_the_deadline_delays_admission():
+    admission = AdmissionController(global_rpm=6000)
+    admission.throttle(0.2)
+
+    started = time.monotonic()
+    admission.admit(None, 0, deadline_in(2))
+
+    assert time.monotonic() - started >= 0.19
+
+
+def test_settle_refunds_unused_tokens():
+    # 100 tokens of burst refilled at 10 tokens a second
+    admission = AdmissionController(global_tpm=600, burst_seconds=10)
+    admission.admit(None, 100, deadline_in(1))
+    with pytest.raises(AdmissionRejected):
+        admission.admit(None, 60, deadline_in(0.5))
+
+    admission.settle(None, 100, 40)
+
+    admission.admit(None, 60, deadline_in(0.5))
+
+
+def test_settle_charges_usage_over_the_estimate():
+    admission = AdmissionController(global_tpm=600, burst_seconds=10)
+    admission.admit(None, 50, deadline_in(1))
+
+    admission.settle(None, 50, 100)
+
+    with pytest.raises(AdmissionRejected):
+        admission.admit(None, 10, deadline_in(0.5))
+
+
+def test_settle_corrects_the_session_bucket_too():
+    admission = AdmissionController(session_tpm=600, burst_seconds=10)
+    admission.admit("s", 100, deadline_in(1))
+    with pytest.raises(AdmissionRejected):
+        admission.admit("s", 60, deadline_in(0.5))
+
+    admission.settle("s", 100, 40)
+
+    admission.admit("s", 60, deadline_in(0.5))
+
+
+def test_async_admission_rejects_and_admits_like_the_sync_path():
+    admission = AdmissionController(global_rpm=6, burst_seconds=1)
+
+    async def main():
+        await admission.admit_async(None, 0, deadline_in(5))
+        with pytest.raises(AdmissionRejected):
+            await admission.admit_async(None, 0, deadline_in(1))
+
+    asyncio.run(main())
+    stats = admission.stats()
+    assert stats["admitted"]["interactive"] == 1
+    assert stats["rejected"]["interactive"] == 1
+    assert stats["queued"] == 0
+
+
+def test_disabled_controller_admits_everything():
+    admission = AdmissionController(global_rpm=1, enabled=False)
+    for _ in range(5):
+        admission.admit(None, 10**6, deadline_in(0.01))
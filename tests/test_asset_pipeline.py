@@ -0,0 +1,42 @@
+import pytest
+
+from asset_pipeline import AssetManifest, accept_quality, parse_accept
+
+
+@pytest.fixture
+def manifest():
+    variants = [{"format": fmt, "width": width, "path": f"Jar-{width}w.{fmt}"}
+                for fmt in ("avif", "webp", "png") for width in (320, 640)]
+    return AssetManifest({"Jar.png": {"variants": variants}})
+
+
+def test_parse_accept():
+    ranges = parse_accept("image/avif;q=0, image/webp;q=0.8,image/*; q=0.5,*/*")
+    assert ranges == {"image/avif": 0.0, "image/webp": 0.8, "image/*": 0.5, "*/*": 1.0}
+    assert accept_quality(ranges, "image/png") == 0.5
+    assert accept_quality(ranges, "image/jxl", wildcards=False) == 0.0
+
+
+@pytest.mark.parametrize("accept, width, expected", [
+    ("image/avif,image/webp,*/*", None, ("Jar-640w.avif", "image/avif")),
+    ("image/avif;q=0,image/webp,*/*", None, ("Jar-640w.webp", "image/webp")),
+    ("image/avif;q=0.5,image/webp;q=0.9", 300, ("Jar-320w.webp", "image/webp")),
+    ("image/*", None, None),
+    ("image/png,image/*;q=0.8,*/*;q=0.5", None, None),
+    ("", None, None),
+    ("image/*", 320, ("Jar-320w.png", "image/png")),
+    ("image/png;q=0,text/html", 320, None),
+])
+def test_pick(manifest, accept, width, expected):
+    assert manifest.pick("Jar.png", accept, width) == expected
+
+
+def test_source_is_served_and_varied_without_modern_formats():
+    from app import app, asset_manifest
+
+    if "Jar.png" not in asset_manifest.images:
+        pytest.skip("image variants not generated (python asset_pipeline.py)")
+    response = app.test_client().get("/Jar.png", headers={"Accept": "image/*"})
+    assert response.status_code == 200
+    assert response.content_type == "image/png"
+    assert "Accept" in response.headers.get("Vary", "")
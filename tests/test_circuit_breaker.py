@@ -0,0 +1,67 @@
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, percentile
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    (list(range(1, 11)), 50, 5),
+    (list(range(1, 11)), 95, 10),
+    (list(range(1, 11)), 10, 1),
+    (list(range(1, 21)), 95, 19),
+    (list(range(1, 101)), 7, 7),
+    (list(range(1, 5)), 99, 4),
+    ([3.0], 50, 3.0),
+    ([], 95, 0.0),
+])
+def test_nearest_rank_percentile(values, pct, expected):
+    assert percentile(values, pct) == expected
+
+
+def tripped_breaker(**kwargs):
+    """A breaker that has just gone half-open, plus a ticket from while it was closed."""
+    breaker = CircuitBreaker(min_requests=2, open_seconds=0, half_open_probes=1, **kwargs)
+    straggler = breaker.allow_request()
+    for _ in range(2):
+        breaker.record_failure(breaker.allow_request(), 0.1)
+    assert breaker.state == HALF_OPEN
+    return breaker, straggler
+
+
+def test_probe_successes_close_and_a_probe_failure_reopens():
+    breaker, _ = tripped_breaker()
+    breaker.record_success(breaker.allow_request(), 0.1)
+    assert breaker.state == CLOSED
+
+    breaker, _ = tripped_breaker(latency_threshold=10)
+    breaker.open_seconds = 60
+    breaker.record_failure(breaker.allow_request(), 0.1)
+    assert breaker.state == OPEN
+    assert breaker.allow_request() is None
+
+
+@pytest.mark.parametrize("record", ["record_success", "record_failure", "release"])
+def test_result_from_before_the_trip_is_not_taken_as_a_probe(record):
+    breaker, straggler = tripped_breaker()
+    probe = breaker.allow_request()
+    assert breaker.allow_request() is None
+
+    args = (straggler,) if record == "release" else (straggler, 0.1)
+    getattr(breaker, record)(*args)
+
+    # Neither closed nor re-opened, and the probe slot is still taken
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request() is None
+    breaker.record_success(probe, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_result_from_an_earlier_closed_period_does_not_count():
+    breaker, straggler = tripped_breaker()
+    breaker.record_success(breaker.allow_request(), 0.1)
+    assert breaker.state == CLOSED
+
+    breaker.record_failure(straggler, 0.1)
+    breaker.record_failure(breaker.allow_request(), 0.1)
+
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["stale_results"] == 1
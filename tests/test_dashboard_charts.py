@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard_charts import downsample, lttb_indices
+
+
+def reference_lttb(x, y, threshold):
+    """Textbook LTTB, one point at a time."""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    kept = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(x[end:next_end]) / (next_end - end)
+        avg_y = sum(y[end:next_end]) / (next_end - end)
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+@pytest.mark.parametrize("n, threshold", [(10, 3), (100, 7), (1000, 100), (1001, 999), (5000, 1000), (37, 36)])
+def test_keeps_endpoints_and_exactly_threshold_points(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.arange(n, dtype=float)
+    y = rng.normal(size=n).cumsum()
+
+    kept = lttb_indices(x, y, threshold)
+
+    assert len(kept) == threshold
+    assert kept[0] == 0 and kept[-1] == n - 1
+    assert np.all(np.diff(kept) > 0)
+
+
+@pytest.mark.parametrize("n, threshold", [(50, 10), (1000, 97)])
+def test_matches_reference_implementation(n, threshold):
+    rng = np.random.default_rng(7)
+    x = np.sort(rng.uniform(0, 100, n))
+    y = rng.normal(size=n)
+
+    assert lttb_indices(x, y, threshold).tolist() == reference_lttb(x.tolist(), y.tolist(), threshold)
+
+
+def test_keeps_an_isolated_spike():
+    y = np.zeros(1000)
+    y[437] = 50.0
+
+    assert 437 in lttb_indices(np.arange(1000), y, 20)
+
+
+def test_accepts_datetimes_and_nans():
+    x = pd.date_range("2025-01-01", periods=500, freq="h").to_numpy()
+    y = np.linspace(0, 1, 500)
+    y[10] = np.nan
+
+    kept = lttb_indices(x, y, 50)
+
+    assert len(kept) == 50
+    assert kept[0] == 0 and kept[-1] == 499
+
+
+@pytest.mark.parametrize("threshold", [0, 1, 2, 500, 600])
+def test_small_inputs_and_thresholds_keep_every_point(threshold):
+    assert lttb_indices(np.arange(500), np.arange(500), threshold).tolist() == list(range(500))
+
+
+def test_downsample_returns_small_frames_unchanged():
+    df = pd.DataFrame({"x": range(10), "y": range(10)})
+    assert downsample(df, "x", "y", 10) is df
+    assert len(downsample(pd.DataFrame({"x": range(100), "y": range(100)}), "x", "y", 10)) == 10
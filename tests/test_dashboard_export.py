@@ -0,0 +1,93 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dashboard_cache
+import dashboard_export
+from dashboard_export import ChunkReader, export_file, export_rows_file, write_export_source
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    n = 257
+    return pd.DataFrame({
+        'Date': pd.date_range('2025-01-01', periods=n, freq='h'),
+        'Daily Active Users': rng.integers(0, 10_000, n),
+        'Average Rating': rng.uniform(1, 5, n),
+        'Feature Name': rng.choice(['Voice, chat', 'Games "beta"', 'Journal'], n),
+    })
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 100, 257, 1000])
+def test_chunked_csv_is_byte_identical(frame, chunk_rows):
+    data = export_file(frame, 'csv', chunk_rows=chunk_rows).read()
+    assert data == frame.to_csv(index=False).encode('utf-8')
+
+
+@pytest.mark.parametrize("values, unit", [
+    (['2025-01-01', '2025-01-02 06:30', None], 'us'),
+    (['2025-01-01', '2025-01-01 00:00:00.250'], 'ms'),
+    (['2025-01-01', '2025-01-01 00:00:00.000120'], 'us'),
+    (['2025-01-01', '2025-01-01 00:00:00.000000007'], 'ns'),
+    (['2025-01-01', None, '2025-01-03'], 'us'),
+])
+def test_chunked_csv_prints_datetimes_in_one_format(values, unit):
+    frame = pd.DataFrame({'When': pd.to_datetime(values, format='ISO8601').as_unit(unit), 'N': range(len(values))})
+    data = export_file(frame, 'csv', chunk_rows=1).read()
+    assert data == frame.to_csv(index=False).encode('utf-8')
+
+
+def test_empty_csv_keeps_the_header(frame):
+    empty = frame.iloc[0:0]
+    assert export_file(empty, 'csv').read() == empty.to_csv(index=False).encode('utf-8')
+
+
+@pytest.mark.skipif(dashboard_export.pq is None, reason="pyarrow not installed")
+@pytest.mark.parametrize("fmt", ["feather", "parquet"])
+@pytest.mark.parametrize("row_start, row_end", [(0, 257), (13, 200), (50, 50)])
+def test_columnar_rows_csv_matches_the_frame_slice(frame, tmp_path, monkeypatch, fmt, row_start, row_end):
+    monkeypatch.setattr(dashboard_export, 'CACHE_DIR', tmp_path)
+    source = write_export_source(frame, 'rows', fmt)
+
+    data = export_rows_file(source, row_start, row_end, 'csv', chunk_rows=16, source_fmt=fmt).read()
+
+    assert data == frame.iloc[row_start:row_end].to_csv(index=False).encode('utf-8')
+
+
+@pytest.mark.skipif(dashboard_export.pq is None, reason="pyarrow not installed")
+def test_columnar_rows_parquet_round_trips(frame, tmp_path, monkeypatch):
+    monkeypatch.setattr(dashboard_export, 'CACHE_DIR', tmp_path)
+    source = write_export_source(frame, 'rows', 'feather')
+
+    buffer = export_rows_file(source, 10, 100, 'parquet', chunk_rows=16, source_fmt='feather')
+
+    result = pd.read_parquet(buffer)
+    pd.testing.assert_frame_equal(result, frame.iloc[10:100].reset_index(drop=True), check_dtype=False)
+
+
+def test_chunk_reader_reads_across_chunk_boundaries():
+    reader = ChunkReader(iter([b'ab', b'', b'cde', b'f']))
+    reader.seek(0)
+    assert reader.read(4) == b'ab'
+    assert reader.read(1) == b'c'
+    assert reader.read() == b'def'
+    assert reader.read() == b''
+    with pytest.raises(io.UnsupportedOperation):
+        reader.seek(0)
+
+
+def test_chunk_reader_pulls_chunks_lazily():
+    pulled = []
+
+    def chunks():
+        for piece in (b'one', b'two'):
+            pulled.append(piece)
+            yield piece
+
+    reader = ChunkReader(chunks())
+    assert pulled == []
+    reader.read(2)
+    assert pulled == [b'one']
@@ -0,0 +1,68 @@
+import itertools
+
+import pytest
+
+from intent_matcher import DEFAULT_FALLBACK_RESPONSE, FALLBACK_INTENTS, IntentMatcher
+
+
+def legacy_get_fallback_response(user_input: str) -> str:
+    """The original get_fallback_response chain from config_openAI.py."""
+    lower_input = user_input.lower()
+
+    if any(word in lower_input for word in ['stress', 'anxious', 'anxiety', 'worried']):
+        return "🧘 I understand you're feeling stressed. Try the 4-7-8 breathing technique: inhale for 4 counts, hold for 7, exhale for 8. This activates your parasympathetic nervous system for instant calm."
+
+    elif any(word in lower_input for word in ['sleep', 'tired', 'exhausted', 'fatigue']):
+        return "😴 Sleep is crucial for recovery! Aim for 7-9 hours. Try creating a wind-down ritual: dim lights 1 hour before bed, no screens 30 minutes prior, and practice gratitude breathing."
+
+    elif any(word in lower_input for word in ['focus', 'concentrate', 'distracted']):
+        return "🎯 Let's optimize your focus! Try the Pomodoro Technique: 25-minute deep work blocks with 5-minute breaks. Eliminate distractions and single-task for better quality output."
+
+    elif any(word in lower_input for word in ['exercise', 'movement', 'workout', 'steps']):
+        return "🏃 Movement is medicine! Aim for 8,000-10,000 steps daily. For game developers, take desk breaks every 30 minutes and try the 20-20-20 rule for eye health."
+
+    elif any(word in lower_input for word in ['goal', 'motivation', 'motivated']):
+        return "🎯 Let's set SMART goals! Make them Specific, Measurable, Achievable, Relevant, and Time-bound. Break big goals into daily actions and celebrate small wins!"
+
+    elif any(word in lower_input for word in ['food', 'nutrition', 'eat', 'diet']):
+        return "🥗 Fuel your body right! Aim for 50% vegetables/fruits, 25% lean proteins, 25% whole grains. Stay hydrated with 8-10 glasses of water daily!"
+
+    else:
+        return "✨ I'm here to support your wellness journey! What specific area would you like to focus on - physical health, mental wellness, productivity, social connections, or finding purpose?"
+
+
+KEYWORDS = [keyword for intent in FALLBACK_INTENTS for keyword in intent["keywords"]]
+
+
+def keyword_corpus() -> list:
+    """Every keyword alone, inside longer words, capitalised, and in ordered pairs."""
+    messages = ["", "hello", "What can you do?", "great day, I ate well", "I am unmotivated",
+                "I am so tired and cannot sleep, a bit stressed", "Steps? Goals! FOOD."]
+    for keyword in KEYWORDS:
+        messages += [keyword, keyword.upper(), f"un{keyword}ed", f"I feel {keyword}, help", f"x{keyword}"]
+    for first, second in itertools.permutations(KEYWORDS, 2):
+        messages += [f"{first} and {second}", f"{first}{second}"]
+    return messages
+
+
+@pytest.mark.parametrize("matcher", [IntentMatcher(FALLBACK_INTENTS), IntentMatcher.from_file()],
+                         ids=["built-in", "with-intents-file"])
+def test_same_replies_as_the_legacy_chain(matcher):
+    for message in keyword_corpus():
+        expected = legacy_get_fallback_response(message)
+        if expected == DEFAULT_FALLBACK_RESPONSE and matcher.match(message) is not None:
+            continue  # only intents from the data file can answer these
+        assert matcher.respond(message) == expected, message
+
+
+def test_file_intents_match_at_word_starts(tmp_path):
+    path = tmp_path / "intents.json"
+    path.write_text('[{"name": "social", "keywords": ["friend", "burn out"], "response": "Reach out."}]')
+    matcher = IntentMatcher.from_file(str(path))
+    assert matcher.respond("missing my friend") == "Reach out."
+    assert matcher.respond("no friends at work") == "Reach out."
+    assert matcher.respond("about to burn out") == "Reach out."
+    assert matcher.match("unfriended") is None
+    # Built-in intents still take priority over appended ones
+    assert matcher.match("friends are stressed")["name"] == "stress"
+    assert matcher.scores("friends are stressed") == {"stress": 1, "social": 1}
@@ -0,0 +1,63 @@
+import math
+import random
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kpi_cube import KPICube
+
+DATA = Path(__file__).resolve().parent.parent / "dashboard_dummy_data.xlsx"
+
+
+@pytest.fixture(scope="module")
+def df():
+    """The frame as dashboard_app.load_data() prepares it."""
+    df = pd.read_excel(DATA).sort_values('Date').reset_index(drop=True)
+    df['Daily Active Users'] = df['Daily Active Users'] * (1 + np.arange(len(df)) * 0.02)
+    return df.astype({'Daily Active Users': 'int64'})
+
+
+def per_row_kpis(df_filtered: pd.DataFrame) -> dict:
+    """The dashboard's original per-row KPI code over the filtered frame."""
+    avg_dau = df_filtered['Daily Active Users'].mean() if len(df_filtered) > 0 else 0
+    dau_change = ((df_filtered['Daily Active Users'].iloc[-1] - df_filtered['Daily Active Users'].iloc[0]) / df_filtered['Daily Active Users'].iloc[0] * 100) if len(df_filtered) > 1 else 0
+    avg_mau = df_filtered['Monthly Active Users'].mean() if 'Monthly Active Users' in df_filtered.columns else 0
+    satisfaction_rate = (df_filtered['Satisfied Responses'].sum() / df_filtered['Total Feedback Responses'].sum() * 100) if df_filtered['Total Feedback Responses'].sum() > 0 else 0
+    voice_adoption = (df_filtered['Users Adopting Voice Features'].mean() / df_filtered['Total Users'].mean() * 100) if df_filtered['Total Users'].mean() > 0 else 0
+    avg_rating = df_filtered['Average Rating'].mean() if 'Average Rating' in df_filtered.columns else 0
+    retention_data = df_filtered[['New Users (Day 0)', 'Retained Users (Day 30)']].mean()
+    retention_pct = (retention_data['Retained Users (Day 30)'] / retention_data['New Users (Day 0)'] * 100)
+    return {
+        'avg_dau': avg_dau, 'dau_change': dau_change, 'avg_mau': avg_mau,
+        'satisfaction_rate': satisfaction_rate, 'voice_adoption': voice_adoption, 'avg_rating': avg_rating,
+        'new_users': retention_data['New Users (Day 0)'],
+        'retained_users': retention_data['Retained Users (Day 30)'], 'retention_pct': retention_pct,
+    }
+
+
+def same(a, b) -> bool:
+    a, b = float(a), float(b)
+    return (math.isnan(a) and math.isnan(b)) or a == b
+
+
+def test_kpis_match_the_per_row_code(df):
+    cube = KPICube(df)
+    rng = random.Random(15)
+    first, last = df['Date'].min().date(), df['Date'].max().date()
+    days = (last - first).days
+    ranges = [(first, last), (first, first), (last + timedelta(days=1), last + timedelta(days=5))]
+    for _ in range(3000):
+        start = first + timedelta(days=rng.randint(-3, days))
+        ranges.append((start, start + timedelta(days=rng.randint(0, 60))))
+
+    for start, end in ranges:
+        dates = df['Date'].dt.date
+        expected = per_row_kpis(df[(dates >= start) & (dates <= end)])
+        actual = cube.kpis(start, end)
+        for name, value in expected.items():
+            assert same(actual[name], value), (start, end, name, actual[name], value)
+        # What the Avg Rating card shows
+        assert f"{actual['avg_rating']:.2f}" == f"{expected['avg_rating']:.2f}"
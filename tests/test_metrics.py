@@ -0,0 +1,93 @@
+import pytest
+
+from metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry()
+    replies = registry.counter("aura_replies_total", "Replies by source.", labels=("source",))
+    replies.inc(source="cache")
+    replies.inc(2, source="upstream")
+    latency = registry.histogram("aura_latency_seconds", "Call duration.", buckets=(0.1, 1))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(3)
+    registry.gauge_callback("aura_queue_depth", "Queued requests.", lambda: 4)
+    return registry
+
+
+def test_renders_prometheus_text_format(registry):
+    assert registry.render() == (
+        "# HELP aura_replies_total Replies by source.\n"
+        "# TYPE aura_replies_total counter\n"
+        'aura_replies_total{source="cache"} 1\n'
+        'aura_replies_total{source="upstream"} 2\n'
+        "# HELP aura_latency_seconds Call duration.\n"
+        "# TYPE aura_latency_seconds histogram\n"
+        'aura_latency_seconds_bucket{le="0.1"} 1\n'
+        'aura_latency_seconds_bucket{le="1"} 2\n'
+        'aura_latency_seconds_bucket{le="+Inf"} 3\n'
+        "aura_latency_seconds_sum 3.55\n"
+        "aura_latency_seconds_count 3\n"
+        "# HELP aura_queue_depth Queued requests.\n"
+        "# TYPE aura_queue_depth gauge\n"
+        "aura_queue_depth 4\n"
+    )
+
+
+def test_worker_label_is_added_to_every_sample(registry):
+    registry.set_worker(12345)
+
+    lines = registry.render().splitlines()
+
+    samples = [line for line in lines if not line.startswith("#")]
+    assert samples == [
+        'aura_replies_total{worker="12345",source="cache"} 1',
+        'aura_replies_total{worker="12345",source="upstream"} 2',
+        'aura_latency_seconds_bucket{worker="12345",le="0.1"} 1',
+        'aura_latency_seconds_bucket{worker="12345",le="1"} 2',
+        'aura_latency_seconds_bucket{worker="12345",le="+Inf"} 3',
+        'aura_latency_seconds_sum{worker="12345"} 3.55',
+        'aura_latency_seconds_count{worker="12345"} 3',
+        'aura_queue_depth{worker="12345"} 4',
+    ]
+    assert "# TYPE aura_replies_total counter" in lines
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.counter("aura_things_total", "Things.", labels=("name",))
+    counter.inc(name='say "hi"\\\n')
+
+    assert 'aura_things_total{name="say \\"hi\\"\\\\\\n"} 1' in registry.render()
+
+
+def test_recorded_metric_names_are_unique_but_callbacks_can_be_rebound():
+    registry = MetricsRegistry()
+    registry.counter("aura_a_total", "A.")
+    with pytest.raises(ValueError):
+        registry.counter("aura_a_total", "A again.")
+
+    registry.gauge_callback("aura_b", "B.", lambda: 1)
+    registry.gauge_callback("aura_b", "B rebound.", lambda: 2)
+    assert "aura_b 2\n" in registry.render()
+
+
+def test_failing_or_empty_callback_is_left_out():
+    registry = MetricsRegistry()
+    registry.gauge_callback("aura_none", "Nothing yet.", lambda: None)
+    registry.gauge_callback("aura_broken", "Raises.", lambda: 1 / 0)
+
+    assert registry.render() == "\n"
+
+
+def test_output_parses_with_prometheus_client(registry):
+    parser = pytest.importorskip("prometheus_client.parser")
+    registry.set_worker("w1")
+
+    families = {family.name: family for family in parser.text_string_to_metric_families(registry.render())}
+
+    assert families["aura_replies"].type == "counter"
+    assert families["aura_latency_seconds"].type == "histogram"
+    assert all(sample.labels["worker"] == "w1" for family in families.values() for sample in family.samples)
@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+import config_openAI
+from config_openAI import build_messages
+from prompt_budget import SummaryCache, count_message_tokens, count_tokens, select_history
+
+WORDS = ("sleep stress focus walk water breathing meeting deadline energy coffee lunch team "
+         "weekend habit streak reminder stretch calm anxious tired").split()
+
+
+def random_message(rng, role):
+    sentences = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 25))).capitalize() + "."
+                 for _ in range(rng.randint(1, 6))]
+    return {"role": role, "content": " ".join(sentences)}
+
+
+def conversation(rng, turns):
+    history = []
+    for _ in range(turns):
+        history.append(random_message(rng, "user"))
+        history.append(random_message(rng, "assistant"))
+    return history
+
+
+@pytest.mark.parametrize("budget", [0, 10, 100, 1000])
+def test_selected_window_fits_the_budget_and_is_the_newest_suffix(budget):
+    history = conversation(random.Random(budget), 30)
+
+    window, dropped = select_history(history, budget)
+
+    assert count_message_tokens(window) <= budget
+    assert dropped + window == history
+    if dropped:
+        assert count_message_tokens(dropped[-1:] + window) > budget
+
+
+@pytest.mark.parametrize("prompt_budget, summary_budget", [(1500, 200), (1200, 120), (1000, 60)])
+def test_prompt_never_exceeds_the_budget(monkeypatch, prompt_budget, summary_budget):
+    monkeypatch.setattr(config_openAI, "AURA_PROMPT_TOKEN_BUDGET", prompt_budget)
+    monkeypatch.setattr(config_openAI, "AURA_SUMMARY_TOKEN_BUDGET", summary_budget)
+    monkeypatch.setattr(config_openAI, "history_summaries", SummaryCache(token_budget=summary_budget))
+    rng = random.Random(prompt_budget)
+    history = []
+
+    for turn in range(40):
+        user_message = random_message(rng, "user")["content"]
+        messages = build_messages(user_message, history, session_id="s", character="nova")
+
+        # The system prompt, guide notes and user message are sent whatever the budget
+        fixed = [messages[0], messages[-1]] + [
+            m for m in messages if m["content"].startswith(config_openAI.KNOWLEDGE_NOTES_HEADER)]
+        assert count_message_tokens(messages) <= max(prompt_budget, count_message_tokens(fixed)), f"turn {turn}"
+        history += [{"role": "user", "content": user_message}, random_message(rng, "assistant")]
+
+
+def test_summary_stays_within_its_budget():
+    cache = SummaryCache(token_budget=30)
+    dropped = conversation(random.Random(1), 20)
+
+    for end in range(1, len(dropped) + 1):
+        assert count_tokens(cache.summarize("s", dropped[:end])) <= 30
+
+
+def test_summary_is_stable_across_turns():
+    rng = random.Random(2)
+    history = conversation(rng, 40)
+    rolling = SummaryCache(token_budget=120)
+
+    previous = None
+    for end in range(2, len(history) + 1, 2):
+        dropped = history[:end]
+        summary = rolling.summarize("s", dropped)
+
+        # Built incrementally, it matches a summary built from scratch
+        assert summary == SummaryCache(token_budget=120).summarize("s", dropped)
+        # Asking again for the same turns reuses it
+        assert rolling.summarize("s", dropped) == summary
+        # Lines kept from the previous turn are unchanged and stay in order
+        if previous is not None:
+            kept = [line for line in previous.splitlines() if line in summary.splitlines()]
+            assert summary.startswith("\n".join(kept))
+        previous = summary
+
+    assert rolling.stats()["hits"] == len(history) // 2
+
+
+def test_sessions_do_not_share_summaries():
+    cache = SummaryCache()
+    a = [{"role": "user", "content": "I slept badly."}]
+    b = [{"role": "user", "content": "Work is busy."}]
+
+    assert cache.summarize("a", a) == "- User: I slept badly."
+    assert cache.summarize("b", b) == "- User: Work is busy."
+    assert cache.summarize("a", a) == "- User: I slept badly."
@@ -0,0 +1,76 @@
+import pytest
+
+import response_cache
+from response_cache import ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_evicts_least_recently_used_entry():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"
+
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_overwriting_a_key_refreshes_it_without_eviction():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    cache.set("a", "A2")
+
+    cache.set("c", "C")
+
+    assert cache.get("a") == "A2"
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = ResponseCache(ttl_seconds=60)
+    cache.set("a", "A")
+
+    clock[0] += 59.9
+    assert cache.get("a") == "A"
+    clock[0] += 0.1
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert len(cache) == 0
+
+
+def test_ttl_counts_from_the_last_set_not_the_last_get(clock):
+    cache = ResponseCache(ttl_seconds=60)
+    cache.set("a", "A")
+    clock[0] += 50
+    assert cache.get("a") == "A"
+    clock[0] += 10
+    assert cache.get("a") is None
+
+    cache.set("a", "A")
+    clock[0] += 59
+    assert cache.get("a") == "A"
+
+
+def test_key_normalizes_message_but_keeps_character_and_history_apart():
+    history = [{"role": "user", "content": "hi"}]
+    key = ResponseCache.make_key("  How do I Sleep better?? ", "Nova", history)
+    assert key == ResponseCache.make_key("how do i sleep better", "nova", history)
+    assert key != ResponseCache.make_key("how do i sleep better", "kai", history)
+    assert key != ResponseCache.make_key("how do i sleep better", "nova", [])
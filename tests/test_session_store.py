@@ -0,0 +1,82 @@
+import pytest
+
+from session_store import RedisSessionStore, SQLiteSessionStore, SessionStore
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def make_store(request, tmp_path):
+    """Factory for a store of each backend with the given cap."""
+    def make(max_messages=4, idle_ttl_seconds=3600):
+        if request.param == "memory":
+            return SessionStore(max_messages=max_messages, idle_ttl_seconds=idle_ttl_seconds)
+        if request.param == "sqlite":
+            return SQLiteSessionStore(str(tmp_path / "sessions.db"), max_messages=max_messages,
+                                      idle_ttl_seconds=idle_ttl_seconds)
+        fakeredis = pytest.importorskip("fakeredis")
+        return RedisSessionStore(max_messages=max_messages, idle_ttl_seconds=idle_ttl_seconds,
+                                 client=fakeredis.FakeRedis())
+    return make
+
+
+def test_unknown_session_is_empty(make_store):
+    store = make_store()
+    assert store.get_history("nobody") == []
+    assert "nobody" not in store
+    assert len(store) == 0
+
+
+def test_turns_are_returned_in_order(make_store):
+    store = make_store()
+    store.append_turn("s", "hello", "hi there")
+    store.append("s", "user", "how are you")
+
+    assert store.get_history("s") == [
+        {"role": "user", "content": "hello"},
+        {"role": "assistant", "content": "hi there"},
+        {"role": "user", "content": "how are you"},
+    ]
+    assert "s" in store
+    assert len(store) == 1
+
+
+def test_cap_keeps_the_newest_messages_at_insert_time(make_store):
+    store = make_store(max_messages=4)
+    for turn in range(5):
+        store.append_turn("s", f"q{turn}", f"a{turn}")
+
+    history = store.get_history("s")
+    assert [m["content"] for m in history] == ["q3", "a3", "q4", "a4"]
+    assert [m["role"] for m in history] == ["user", "assistant", "user", "assistant"]
+
+
+def test_one_batch_larger_than_the_cap_is_trimmed(make_store):
+    store = make_store(max_messages=3)
+    store.extend("s", [{"role": "user", "content": str(i)} for i in range(5)])
+
+    assert [m["content"] for m in store.get_history("s")] == ["2", "3", "4"]
+
+
+def test_sessions_are_independent_and_clear_removes_one(make_store):
+    store = make_store()
+    store.append_turn("a", "qa", "aa")
+    store.append_turn("b", "qb", "ab")
+
+    assert store.clear("a") is True
+    assert store.clear("a") is False
+
+    assert store.get_history("a") == []
+    assert [m["content"] for m in store.get_history("b")] == ["qb", "ab"]
+    assert len(store) == 1
+
+
+def test_memory_store_evicts_least_recently_used_session_over_byte_cap():
+    store = SessionStore(max_messages=10, max_bytes=4500, idle_ttl_seconds=3600)
+    store.append("old", "user", "x" * 1000)
+    store.append("new", "user", "y" * 1000)
+    store.get_history("old")
+
+    store.append("newest", "user", "z" * 1500)
+
+    assert "new" not in store
+    assert "old" in store and "newest" in store
+    assert store.stats()["evictions"] == 1
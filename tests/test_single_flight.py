@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from single_flight import SingleFlight
+
+WAITERS = 8
+
+
+def run_coalesced(flight, fn):
+    """Start WAITERS threads on one key while fn() blocks, then release it."""
+    release = threading.Event()
+    entered = threading.Event()
+    calls = []
+
+    def upstream():
+        calls.append(1)
+        entered.set()
+        release.wait(5)
+        return fn()
+
+    def caller():
+        try:
+            return "ok", flight.do("key", upstream, timeout=5)
+        except Exception as e:
+            return "error", e
+
+    with ThreadPoolExecutor(WAITERS) as pool:
+        leader = pool.submit(caller)
+        assert entered.wait(5)
+        followers = [pool.submit(caller) for _ in range(WAITERS - 1)]
+        # Every follower has joined the in-flight call before the leader finishes
+        while flight.stats()["coalesced"] < WAITERS - 1:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+    return calls, results
+
+
+def test_concurrent_callers_share_one_upstream_call():
+    flight = SingleFlight()
+    result = object()
+
+    calls, results = run_coalesced(flight, lambda: result)
+
+    assert len(calls) == 1
+    assert results == [("ok", result)] * WAITERS
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": WAITERS - 1}
+
+
+def test_exception_reaches_every_waiter():
+    flight = SingleFlight()
+    error = ValueError("upstream failed")
+
+    def fail():
+        raise error
+
+    calls, results = run_coalesced(flight, fail)
+
+    assert len(calls) == 1
+    assert results == [("error", error)] * WAITERS
+
+
+def test_nothing_is_cached_after_the_call_finishes():
+    flight = SingleFlight()
+    values = iter([1, 2])
+
+    assert flight.do("key", lambda: next(values)) == 1
+    assert flight.do("key", lambda: next(values)) == 2
+    assert flight.stats()["leaders"] == 2
+
+
+def test_follower_times_out_while_leader_is_still_running():
+    flight = SingleFlight()
+    release = threading.Event()
+    entered = threading.Event()
+
+    def slow():
+        entered.set()
+        release.wait(5)
+        return "done"
+
+    with ThreadPoolExecutor(1) as pool:
+        leader = pool.submit(flight.do, "key", slow)
+        assert entered.wait(5)
+        with pytest.raises(TimeoutError):
+            flight.do("key", slow, timeout=0.01)
+        release.set()
+        assert leader.result() == "done"
+
+
+def test_async_callers_share_one_upstream_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "reply"
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("key", upstream) for _ in range(WAITERS)))
+
+    assert asyncio.run(main()) == ["reply"] * WAITERS
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": WAITERS - 1}
+
+
+def test_async_exception_reaches_every_waiter():
+    flight = SingleFlight()
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("key", fail) for _ in range(WAITERS)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len({id(r) for r in results}) == 1
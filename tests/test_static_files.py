@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import pytest
+
+from app import app
+from static_cache import is_private
+from wellness_store import AURA_WELLNESS_DB
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_wellness_database_is_not_served(client):
+    # app.py opens the store at import, so the database is on disk
+    assert Path(AURA_WELLNESS_DB).exists()
+    assert client.get("/data/wellness_history.db").status_code == 404
+
+
+@pytest.mark.parametrize("path", [
+    "/data/sessions.db",
+    "/data/sessions.db-wal",
+    "/data/telemetry/date=2026-01-01/events.csv",
+    "/data/intents.json",
+    "/.env.example",
+    "/.cache/dashboard/dashboard_dummy_data.feather",
+    "/config.py",
+    "/Aura/../data/wellness_history.db",
+])
+def test_private_paths_are_not_served(client, path):
+    assert client.get(path).status_code == 404
+
+
+def test_public_files_are_still_served(client):
+    assert client.get("/index.html").status_code == 200
+    assert client.get("/Jar.png").status_code == 200
+
+
+def test_is_private():
+    assert is_private("data/wellness_history.db")
+    assert is_private("Aura/../data/x.json")
+    assert is_private("games/.hidden")
+    assert is_private("export.CSV")
+    assert not is_private("Aura/aura_wellness_hub.html")
+    assert not is_private("EA_Aura_Financial_Health.xlsx")
@@ -0,0 +1,112 @@
+import csv
+import time
+
+import pytest
+
+from telemetry import FIELDS, TelemetryAggregator, TelemetryRecorder
+
+
+@pytest.fixture
+def make_recorder(tmp_path):
+    recorders = []
+
+    def make(**kwargs):
+        recorder = TelemetryRecorder(directory=tmp_path, **kwargs)
+        recorders.append(recorder)
+        return recorder
+
+    yield make
+    for recorder in recorders:
+        recorder.close()
+
+
+def record(recorder, count, first=0):
+    for i in range(first, first + count):
+        recorder.record("chat", "nova", f"session-{i}", latency_ms=i, source="upstream", response_chars=10)
+
+
+def written_rows(directory):
+    rows = []
+    for path in sorted(directory.glob("date=*/*.csv")):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows.extend(dict(zip(FIELDS, row)) for row in csv.reader(f))
+    return rows
+
+
+def wait_for_flushed(recorder, count, timeout=2.0):
+    end = time.monotonic() + timeout
+    while recorder.stats()["flushed"] < count:
+        assert time.monotonic() < end, f"only {recorder.stats()['flushed']} of {count} events flushed"
+        time.sleep(0.005)
+
+
+def test_full_batch_is_flushed_before_the_interval(make_recorder, tmp_path):
+    recorder = make_recorder(flush_seconds=60, flush_events=5)
+    record(recorder, 4)
+    time.sleep(0.05)
+    assert recorder.stats()["flushed"] == 0
+
+    record(recorder, 1, first=4)
+
+    wait_for_flushed(recorder, 5)
+    assert len(written_rows(tmp_path)) == 5
+
+
+def test_partial_batch_is_flushed_on_the_interval(make_recorder, tmp_path):
+    recorder = make_recorder(flush_seconds=0.05, flush_events=1000)
+    record(recorder, 3)
+
+    wait_for_flushed(recorder, 3)
+    assert len(written_rows(tmp_path)) == 3
+    assert recorder.stats()["buffered"] == 0
+
+
+def test_close_writes_what_is_left(make_recorder, tmp_path):
+    recorder = make_recorder(flush_seconds=60, flush_events=1000)
+    record(recorder, 3)
+
+    recorder.close()
+
+    assert recorder.stats()["flushed"] == 3
+    assert len(written_rows(tmp_path)) == 3
+
+
+def test_full_ring_overwrites_the_oldest_events(make_recorder, tmp_path):
+    recorder = make_recorder(capacity=3, flush_seconds=60, flush_events=1000)
+    record(recorder, 5)
+
+    stats = recorder.stats()
+    assert stats["recorded"] == 5
+    assert stats["dropped"] == 2
+    assert stats["buffered"] == 3
+
+    assert recorder.flush() == 3
+    assert [float(row["latency_ms"]) for row in written_rows(tmp_path)] == [2, 3, 4]
+
+
+def test_session_ids_are_hashed(make_recorder, tmp_path):
+    recorder = make_recorder(flush_seconds=60)
+    record(recorder, 1)
+    recorder.flush()
+
+    (row,) = written_rows(tmp_path)
+    assert row["session"] != "session-0"
+    assert len(row["session"]) == 16
+
+
+def test_aggregator_reads_each_event_once(make_recorder, tmp_path):
+    recorder = make_recorder(flush_seconds=60)
+    aggregator = TelemetryAggregator(tmp_path)
+    record(recorder, 3)
+    recorder.flush()
+
+    assert aggregator.refresh() == 3
+    assert aggregator.refresh() == 0
+
+    record(recorder, 2, first=3)
+    recorder.flush()
+    assert aggregator.refresh() == 2
+
+    daily = aggregator.daily()
+    assert daily["turns"].sum() == 5
+    assert daily["sessions"].sum() == 5
@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from config_openAI import _acquire_within
+
+
+async def contend(rounds: int = 200) -> int:
+    """Release a held permit just as waiters time out; return the permits left."""
+    semaphore = asyncio.Semaphore(1)
+    for index in range(rounds):
+        await semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.001 * (index % 3), semaphore.release)
+        if await _acquire_within(semaphore, 0.001):
+            semaphore.release()
+    return semaphore._value
+
+
+@pytest.mark.parametrize("use_timeout", [True, False], ids=["asyncio.timeout", "asyncio.wait"])
+def test_acquire_within_never_leaks_a_permit(monkeypatch, use_timeout):
+    if not use_timeout:
+        monkeypatch.delattr(asyncio, "timeout", raising=False)
+    elif not hasattr(asyncio, "timeout"):
+        pytest.skip("asyncio.timeout needs Python 3.11")
+
+    async def scenario():
+        semaphore = asyncio.Semaphore(1)
+        await semaphore.acquire()
+        assert not await _acquire_within(semaphore, 0.01)
+        semaphore.release()
+        assert await _acquire_within(semaphore, 0.01)
+        semaphore.release()
+        return await contend()
+
+    assert asyncio.run(scenario()) == 1
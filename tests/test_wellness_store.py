@@ -0,0 +1,145 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from wellness_store import GOALS, METRICS, ROLLUP_WINDOWS, WellnessStore
+
+
+def entry(day, steps=8000, sleep=7.0, mood=7, focus=120):
+    return {"date": day, "steps": steps, "sleep": sleep, "mood": mood, "focus": focus}
+
+
+def expected_rollups(store, user_id):
+    """Rollups recomputed from scratch over the stored entries."""
+    entries = store.history(user_id)
+    latest = date.fromisoformat(entries[0]["date"])
+    rollups = {}
+    for window in ROLLUP_WINDOWS:
+        start = (latest - timedelta(days=window - 1)).isoformat()
+        rows = [e for e in entries if e["date"] >= start]
+        rollups[window] = {
+            "start_date": start,
+            "end_date": latest.isoformat(),
+            "entries": len(rows),
+            "totals": {m: sum(r[m] for r in rows) for m in METRICS},
+            "goal_hits": {m: sum(r[m] >= goal for r in rows) for m, goal in GOALS.items()},
+            "max": {m: max((r[m] for r in rows), default=0) for m in GOALS},
+        }
+    return rollups
+
+
+def assert_rollups_match(store, user_id):
+    actual = store.rollups(user_id)
+    for window, expected in expected_rollups(store, user_id).items():
+        rollup = actual[window]
+        assert rollup["start_date"] == expected["start_date"]
+        assert rollup["end_date"] == expected["end_date"]
+        assert rollup["entries"] == expected["entries"]
+        assert rollup["totals"] == {m: pytest.approx(v) for m, v in expected["totals"].items()}
+        assert rollup["max"] == expected["max"]
+        entries = expected["entries"]
+        rates = {m: round(100 * hits / entries) if entries else 0 for m, hits in expected["goal_hits"].items()}
+        assert rollup["goal_rates"] == rates
+
+
+def test_insert_inside_window_is_applied_as_delta():
+    store = WellnessStore(":memory:")
+    store.upsert("u", [entry("2025-11-10"), entry("2025-11-13", steps=9000)])
+    before = store.stats()
+
+    store.upsert("u", [entry("2025-11-11", steps=12000, mood=9)])
+
+    stats = store.stats()
+    assert stats["delta_updates"] - before["delta_updates"] == len(ROLLUP_WINDOWS)
+    assert stats["reaggregations"] == before["reaggregations"]
+    rollup = store.rollups("u")[7]
+    assert rollup["entries"] == 3
+    assert rollup["totals"]["steps"] == 8000 + 9000 + 12000
+    assert rollup["max"]["steps"] == 12000
+    assert_rollups_match(store, "u")
+
+
+def test_overwrite_replaces_the_old_values():
+    store = WellnessStore(":memory:")
+    store.upsert("u", [entry("2025-11-12", steps=5000), entry("2025-11-13")])
+
+    store.upsert("u", [entry("2025-11-12", steps=9500, sleep=8.5)])
+
+    rollup = store.rollups("u")[7]
+    assert rollup["entries"] == 2
+    assert rollup["totals"]["steps"] == 9500 + 8000
+    assert rollup["goal_rates"]["steps"] == 100
+    assert rollup["max"]["sleep"] == 8.5
+    assert_rollups_match(store, "u")
+
+
+def test_overwrite_lowering_the_maximum_reaggregates():
+    store = WellnessStore(":memory:")
+    store.upsert("u", [entry("2025-11-11", steps=6000), entry("2025-11-12", steps=15000), entry("2025-11-13")])
+    before = store.stats()
+
+    store.upsert("u", [entry("2025-11-12", steps=7000)])
+
+    assert store.stats()["reaggregations"] > before["reaggregations"]
+    assert store.rollups("u")[7]["max"]["steps"] == 8000
+    assert_rollups_match(store, "u")
+
+
+def test_window_covers_exactly_the_days_ending_at_the_latest_entry():
+    store = WellnessStore(":memory:")
+    latest = date(2025, 11, 13)
+    store.upsert("u", [
+        entry(latest.isoformat()),
+        entry((latest - timedelta(days=6)).isoformat(), steps=1000),
+        entry((latest - timedelta(days=7)).isoformat(), steps=2000),
+    ])
+
+    rollup = store.rollups("u")[7]
+    assert rollup["start_date"] == "2025-11-07"
+    assert rollup["end_date"] == "2025-11-13"
+    assert rollup["entries"] == 2
+    assert rollup["totals"]["steps"] == 8000 + 1000
+    assert store.rollups("u")[30]["entries"] == 3
+
+
+def test_later_entry_moves_the_window_forward():
+    store = WellnessStore(":memory:")
+    store.upsert("u", [entry("2025-11-07", steps=20000), entry("2025-11-13")])
+    assert store.rollups("u")[7]["max"]["steps"] == 20000
+
+    store.upsert("u", [entry("2025-11-14")])
+
+    rollup = store.rollups("u")[7]
+    assert rollup["start_date"] == "2025-11-08"
+    assert rollup["entries"] == 2
+    assert rollup["max"]["steps"] == 8000
+    assert_rollups_match(store, "u")
+
+
+def test_entry_before_the_window_leaves_it_unchanged():
+    store = WellnessStore(":memory:")
+    store.upsert("u", [entry("2025-11-13")])
+    before = store.rollups("u")[7]
+
+    store.upsert("u", [entry("2025-10-01", steps=30000)])
+
+    assert store.rollups("u")[7] == before
+    assert store.rollups("u")[90]["max"]["steps"] == 30000
+    assert_rollups_match(store, "u")
+
+
+def test_random_writes_match_a_full_recompute():
+    rng = random.Random(7)
+    store = WellnessStore(":memory:")
+    first = date(2025, 1, 1)
+    for _ in range(200):
+        batch = [
+            entry((first + timedelta(days=rng.randrange(400))).isoformat(),
+                  steps=rng.randrange(0, 15000), sleep=round(rng.uniform(4, 10), 1),
+                  mood=rng.randrange(1, 11), focus=rng.randrange(0, 300))
+            for _ in range(rng.randrange(1, 4))
+        ]
+        store.upsert("u", batch)
+        assert_rollups_match(store, "u")
+    assert store.stats()["delta_updates"] > 0
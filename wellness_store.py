@@ -0,0 +1,295 @@
+"""
+Wellness History Store for EA Aura Wellness Hub
+SQLite-backed daily wellness entries (steps, sleep, mood, focus, coins) per
+user, with 7/30/90/365-day rollups maintained incrementally on write.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+AURA_WELLNESS_DB = os.getenv(
+    "AURA_WELLNESS_DB",
+    str(Path(__file__).parent / "data" / "wellness_history.db")
+)
+AURA_WELLNESS_MAX_BATCH = int(os.getenv("AURA_WELLNESS_MAX_BATCH", "1000"))
+
+METRICS = ("steps", "sleep", "mood", "focus", "coins")
+
+# Daily goals, matching the hub page's report view
+GOALS = {"steps": 8000, "sleep": 7, "mood": 7, "focus": 120}
+
+# Rollup windows in days, ending at the user's latest entry (one per report filter)
+ROLLUP_WINDOWS = (7, 30, 90, 365)
+
+# SQLite's default limit on bound parameters is 999
+_MAX_IN_PARAMS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wellness_entries (
+    user_id    TEXT NOT NULL,
+    date       TEXT NOT NULL,
+    steps      INTEGER NOT NULL,
+    sleep      REAL NOT NULL,
+    mood       INTEGER NOT NULL,
+    focus      INTEGER NOT NULL,
+    coins      INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (user_id, date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS wellness_rollups (
+    user_id     TEXT NOT NULL,
+    window_days INTEGER NOT NULL,
+    start_date  TEXT NOT NULL,
+    end_date    TEXT NOT NULL,
+    entries     INTEGER NOT NULL,
+    steps_sum   INTEGER NOT NULL,
+    sleep_sum   REAL NOT NULL,
+    mood_sum    INTEGER NOT NULL,
+    focus_sum   INTEGER NOT NULL,
+    coins_sum   INTEGER NOT NULL,
+    steps_goal  INTEGER NOT NULL,
+    sleep_goal  INTEGER NOT NULL,
+    mood_goal   INTEGER NOT NULL,
+    focus_goal  INTEGER NOT NULL,
+    steps_max   INTEGER NOT NULL,
+    sleep_max   REAL NOT NULL,
+    mood_max    INTEGER NOT NULL,
+    focus_max   INTEGER NOT NULL,
+    PRIMARY KEY (user_id, window_days)
+) WITHOUT ROWID;
+"""
+
+_ROLLUP_COLUMNS = (
+    ["start_date", "end_date", "entries"]
+    + [f"{m}_sum" for m in METRICS]
+    + [f"{m}_goal" for m in GOALS]
+    + [f"{m}_max" for m in GOALS]
+)
+
+_AGGREGATE_SQL = (
+    "SELECT COUNT(*), "
+    + ", ".join(f"COALESCE(SUM({m}), 0)" for m in METRICS) + ", "
+    + ", ".join(f"COALESCE(SUM({m} >= {goal}), 0)" for m, goal in GOALS.items()) + ", "
+    + ", ".join(f"COALESCE(MAX({m}), 0)" for m in GOALS)
+    + " FROM wellness_entries WHERE user_id = ? AND date BETWEEN ? AND ?"
+)
+
+
+def normalize_entry(entry: dict) -> dict:
+    """
+    Validate one history entry from the client.
+
+    Raises:
+        ValueError: If the date is not YYYY-MM-DD or a metric is not numeric
+    """
+    if not isinstance(entry, dict):
+        raise ValueError("Each entry must be an object")
+    day = date.fromisoformat(str(entry.get("date", ""))[:10]).isoformat()
+    steps = int(entry.get("steps") or 0)
+    sleep = float(entry.get("sleep") or 0)
+    mood = int(entry.get("mood") or 0)
+    focus = int(entry.get("focus") or 0)
+    coins = entry.get("coins")
+    if coins is None:
+        # Same formula the hub page uses when saving a day
+        coins = int(steps / 1000 + sleep * 5 + mood * 5 + focus / 10)
+    return {"date": day, "steps": steps, "sleep": sleep, "mood": mood,
+            "focus": focus, "coins": int(coins)}
+
+
+class WellnessStore:
+    """
+    Thread-safe per-user wellness history on SQLite.
+
+    Entries are keyed by (user_id, date), so the primary key index serves both
+    upserts and date-range scans. For each user and window in ROLLUP_WINDOWS a
+    rollup row holds counts, sums, goal hits and maxima over the window ending
+    at the user's latest entry. Writes inside a window update its rollup by
+    delta; a write that moves the latest date, or lowers a window maximum,
+    re-aggregates that window with one indexed range query.
+
+    Args:
+        db_path: SQLite database file (":memory:" for a throwaway store)
+    """
+
+    def __init__(self, db_path: str = AURA_WELLNESS_DB):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn = self._connect()
+            self._conn.executescript(_SCHEMA)
+        self.upserts = 0
+        self.delta_updates = 0
+        self.reaggregations = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def reopen(self) -> None:
+        """
+        Open a fresh connection in a forked worker. The inherited one is left
+        unclosed on purpose: closing it could release the parent's locks.
+        """
+        with self._lock:
+            self._conn = self._connect()
+
+    def upsert(self, user_id: str, entries: list) -> int:
+        """
+        Insert or replace a batch of daily entries and update the user's rollups.
+
+        Returns:
+            int: Number of distinct dates written
+
+        Raises:
+            ValueError: On an invalid entry or a batch over AURA_WELLNESS_MAX_BATCH
+        """
+        if len(entries) > AURA_WELLNESS_MAX_BATCH:
+            raise ValueError(f"At most {AURA_WELLNESS_MAX_BATCH} entries per request")
+        rows = {}
+        for entry in entries:
+            row = normalize_entry(entry)
+            rows[row["date"]] = row
+        if not rows:
+            return 0
+
+        now = time.time()
+        with self._lock, self._conn:
+            previous = self._existing(user_id, list(rows))
+            self._conn.executemany(
+                "INSERT INTO wellness_entries (user_id, date, steps, sleep, mood, focus, coins, updated_at) "
+                "VALUES (:user_id, :date, :steps, :sleep, :mood, :focus, :coins, :updated_at) "
+                "ON CONFLICT (user_id, date) DO UPDATE SET steps = excluded.steps, sleep = excluded.sleep, "
+                "mood = excluded.mood, focus = excluded.focus, coins = excluded.coins, "
+                "updated_at = excluded.updated_at",
+                [dict(row, user_id=user_id, updated_at=now) for row in rows.values()]
+            )
+            self._update_rollups(user_id, rows, previous)
+            self.upserts += len(rows)
+        return len(rows)
+
+    def history(self, user_id: str, start: str = None, end: str = None, limit: int = None) -> list:
+        """Entries for a user between `start` and `end` (inclusive), newest first."""
+        sql = ("SELECT date, steps, sleep, mood, focus, coins FROM wellness_entries "
+               "WHERE user_id = ? AND date BETWEEN ? AND ? ORDER BY date DESC")
+        params = [user_id, start or "0000-01-01", end or "9999-12-31"]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def rollups(self, user_id: str) -> dict:
+        """
+        Report summaries per window, read straight from the rollup rows.
+
+        Returns:
+            dict: {window_days: {"start_date", "end_date", "entries", "totals",
+            "averages", "goal_rates", "max"}}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM wellness_rollups WHERE user_id = ? ORDER BY window_days", (user_id,)
+            ).fetchall()
+        return {row["window_days"]: self._format_rollup(row) for row in rows}
+
+    def stats(self) -> dict:
+        """Row counts and write counters."""
+        with self._lock:
+            users, entries = self._conn.execute(
+                "SELECT COUNT(DISTINCT user_id), COUNT(*) FROM wellness_entries"
+            ).fetchone()
+        return {
+            'users': users,
+            'entries': entries,
+            'upserts': self.upserts,
+            'delta_updates': self.delta_updates,
+            'reaggregations': self.reaggregations,
+        }
+
+    def _existing(self, user_id: str, dates: list) -> dict:
+        previous = {}
+        for i in range(0, len(dates), _MAX_IN_PARAMS):
+            chunk = dates[i:i + _MAX_IN_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self._conn.execute(
+                f"SELECT date, steps, sleep, mood, focus, coins FROM wellness_entries "
+                f"WHERE user_id = ? AND date IN ({placeholders})", [user_id, *chunk]
+            ):
+                previous[row["date"]] = dict(row)
+        return previous
+
+    def _update_rollups(self, user_id: str, rows: dict, previous: dict) -> None:
+        current = {
+            row["window_days"]: dict(row)
+            for row in self._conn.execute("SELECT * FROM wellness_rollups WHERE user_id = ?", (user_id,))
+        }
+        latest = max(rows)
+        if current:
+            latest = max(latest, next(iter(current.values()))["end_date"])
+
+        for window in ROLLUP_WINDOWS:
+            start = (date.fromisoformat(latest) - timedelta(days=window - 1)).isoformat()
+            rollup = current.get(window)
+            if rollup is None or rollup["end_date"] != latest or not self._apply_deltas(rollup, start, rows, previous):
+                rollup = self._aggregate(user_id, start, latest)
+                self.reaggregations += 1
+            else:
+                self.delta_updates += 1
+            columns = ", ".join(["user_id", "window_days", *_ROLLUP_COLUMNS])
+            placeholders = ", ".join("?" * (len(_ROLLUP_COLUMNS) + 2))
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO wellness_rollups ({columns}) VALUES ({placeholders})",
+                [user_id, window, *(rollup[c] for c in _ROLLUP_COLUMNS)]
+            )
+
+    @staticmethod
+    def _apply_deltas(rollup: dict, start: str, rows: dict, previous: dict) -> bool:
+        """
+        Fold changed entries into a rollup in place.
+
+        Returns:
+            bool: False if a maximum may have decreased and the window must be
+            re-aggregated instead
+        """
+        for day, new in rows.items():
+            if not start <= day <= rollup["end_date"]:
+                continue
+            old = previous.get(day)
+            if old is None:
+                rollup["entries"] += 1
+            for metric in METRICS:
+                rollup[f"{metric}_sum"] += new[metric] - (old[metric] if old else 0)
+            for metric, goal in GOALS.items():
+                rollup[f"{metric}_goal"] += (new[metric] >= goal) - (old is not None and old[metric] >= goal)
+                if new[metric] >= rollup[f"{metric}_max"]:
+                    rollup[f"{metric}_max"] = new[metric]
+                elif old is not None and old[metric] >= rollup[f"{metric}_max"]:
+                    return False
+        return True
+
+    def _aggregate(self, user_id: str, start: str, end: str) -> dict:
+        values = self._conn.execute(_AGGREGATE_SQL, (user_id, start, end)).fetchone()
+        return dict(zip(_ROLLUP_COLUMNS, (start, end, *values)))
+
+    @staticmethod
+    def _format_rollup(row) -> dict:
+        entries = row["entries"]
+        return {
+            'start_date': row["start_date"],
+            'end_date': row["end_date"],
+            'entries': entries,
+            'totals': {m: row[f"{m}_sum"] for m in METRICS},
+            'averages': {m: round(row[f"{m}_sum"] / entries, 1) if entries else 0 for m in METRICS},
+            'goal_rates': {m: round(100 * row[f"{m}_goal"] / entries) if entries else 0 for m in GOALS},
+            'max': {m: row[f"{m}_max"] for m in GOALS},
+        }